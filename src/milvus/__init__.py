@@ -1,17 +1,35 @@
 """
 Milvus 数据库集成模块
 提供GraphRAG实体向量数据的存储和检索功能
+
+子模块在首次访问对应名称时才导入（PEP 562），
+`import milvus` 不会立即加载 pymilvus（gRPC/protobuf）与 openai。
 """
 
-from .core.collection_manager import (
-    MilvusCollectionManager,
-    COLLECTION_NAMES,
-    create_collection_manager_with_connection,
-)
-from .core.parquet_importer import MilvusParquetImporter
-from .legacy.collection_store import MilvusCollectionStore
-from .query.client import MilvusClient
-from .query.query_manager import MilvusQueryManager
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .core.collection_manager import (
+        MilvusCollectionManager,
+        COLLECTION_NAMES,
+        create_collection_manager_with_connection,
+    )
+    from .core.parquet_importer import MilvusParquetImporter
+    from .legacy.collection_store import MilvusCollectionStore
+    from .query.client import MilvusClient
+    from .query.query_manager import MilvusQueryManager
+
+# 导出名称 -> 定义所在的子模块
+_LAZY = {
+    'MilvusCollectionManager': '.core.collection_manager',
+    'COLLECTION_NAMES': '.core.collection_manager',
+    'create_collection_manager_with_connection': '.core.collection_manager',
+    'MilvusParquetImporter': '.core.parquet_importer',
+    'MilvusCollectionStore': '.legacy.collection_store',
+    'MilvusClient': '.query.client',
+    'MilvusQueryManager': '.query.query_manager',
+}
 
 __all__ = [
     'MilvusCollectionManager',
@@ -23,3 +41,15 @@ __all__ = [
     'MilvusQueryManager'
 ]
 
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    obj = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = obj
+    return obj
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
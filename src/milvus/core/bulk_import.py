@@ -0,0 +1,211 @@
+"""
+Milvus BulkInsert 导入支持
+将记录写成 parquet 文件暂存到 MinIO/S3，再通过 utility.do_bulk_insert 由服务端直接导入，
+绕过逐条 insert 的 WAL/流式写入路径，适合首次全量导入。
+
+依赖 pymilvus 的 bulk_writer 扩展（pip install "pymilvus[bulk_writer]"），仅在启用时导入。
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+from pymilvus import Collection, utility
+from pymilvus.client.types import BulkInsertState
+
+logger = logging.getLogger(__name__)
+
+# 轮询 BulkInsert 任务状态的间隔（秒）
+DEFAULT_BULK_POLL_INTERVAL = 2.0
+# 单个任务的最长等待时间（秒）
+DEFAULT_BULK_TIMEOUT = 3600.0
+
+_FAILED_STATES = {BulkInsertState.ImportFailed, BulkInsertState.ImportFailedAndCleaned}
+
+
+class BulkStorageConfig:
+    """BulkInsert 暂存文件使用的对象存储配置（需与 Milvus 使用同一个 MinIO/S3 bucket）"""
+
+    def __init__(
+        self,
+        endpoint: str = "localhost:9000",
+        bucket: str = "a-bucket",
+        access_key: str = "minioadmin",
+        secret_key: str = "minioadmin",
+        secure: bool = False,
+        remote_path: str = "graphrag_bulk",
+    ):
+        self.endpoint = endpoint
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.secure = secure
+        self.remote_path = remote_path
+
+    def __repr__(self) -> str:
+        return (
+            f"BulkStorageConfig(endpoint={self.endpoint}, bucket={self.bucket}, "
+            f"remote_path={self.remote_path})"
+        )
+
+
+def _create_writer(collection: Collection, storage: BulkStorageConfig) -> Any:
+    """创建写入对象存储的 RemoteBulkWriter"""
+    try:
+        from pymilvus.bulk_writer import BulkFileType, RemoteBulkWriter
+    except ImportError as e:
+        raise ImportError(
+            "BulkInsert 导入需要 pymilvus 的 bulk_writer 扩展，"
+            '请先执行 pip install "pymilvus[bulk_writer]"'
+        ) from e
+
+    connect_param = RemoteBulkWriter.S3ConnectParam(
+        endpoint=storage.endpoint,
+        access_key=storage.access_key,
+        secret_key=storage.secret_key,
+        bucket_name=storage.bucket,
+        secure=storage.secure,
+    )
+    return RemoteBulkWriter(
+        schema=collection.schema,
+        remote_path=f"{storage.remote_path}/{collection.name}",
+        connect_param=connect_param,
+        file_type=BulkFileType.PARQUET,
+    )
+
+
+def wait_for_bulk_insert(
+    task_id: int,
+    using: str = "default",
+    poll_interval: float = DEFAULT_BULK_POLL_INTERVAL,
+    timeout: float = DEFAULT_BULK_TIMEOUT,
+) -> int:
+    """
+    轮询 BulkInsert 任务直到完成
+
+    Returns:
+        int: 导入的行数
+
+    Raises:
+        RuntimeError: 任务失败
+        TimeoutError: 超过 timeout 仍未完成
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        state = utility.get_bulk_insert_state(task_id, using=using)
+        if state.state == BulkInsertState.ImportCompleted:
+            return state.row_count
+        if state.state in _FAILED_STATES:
+            raise RuntimeError(f"BulkInsert 任务 {task_id} 失败: {state.failed_reason}")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"BulkInsert 任务 {task_id} 超时，当前状态: {state.state_name}")
+        time.sleep(poll_interval)
+
+
+class BulkInsertWriter:
+    """
+    将同一集合的多批列式数据追加到一个 RemoteBulkWriter，全部追加完成后只 commit 一次
+
+    适合把一个 parquet 文件的所有批次合并为同一组暂存文件与 BulkInsert 任务，
+    避免每批都走一遍完整的 commit / 提交任务 / 等待完成流程。
+    """
+
+    def __init__(
+        self,
+        collection: Collection,
+        field_names: Sequence[str],
+        storage: BulkStorageConfig,
+        using: str = "default",
+    ):
+        """
+        Args:
+            collection: 目标集合
+            field_names: 需要写入的字段（不含自增主键）
+            storage: 对象存储配置
+            using: 发起 BulkInsert 请求使用的连接 alias
+        """
+        self._collection = collection
+        self._field_names = tuple(field_names)
+        self._using = using
+        self._writer = _create_writer(collection, storage)
+        self.row_count = 0
+
+    def append_columns(self, columns: Mapping[str, Sequence[Any]]) -> int:
+        """
+        按列追加一批数据，返回追加的行数
+
+        RemoteBulkWriter 只接受逐行追加，这里复用同一个 dict 逐行交给 writer（writer 会把取值拷入自己的列缓冲区），
+        不为整批数据构造行字典列表。writer 在 commit 前会一直引用传入的取值，调用方复用的缓冲区需先复制。
+        """
+        fields = self._field_names
+        row: Dict[str, Any] = {}
+        count = 0
+        for values in zip(*(columns[field] for field in fields)):
+            row.update(zip(fields, values))
+            self._writer.append_row(row)
+            count += 1
+        self.row_count += count
+        return count
+
+    def append_records(self, records: Iterable[Mapping[str, Any]]) -> int:
+        """逐条追加记录（只取 field_names 中的字段），返回追加的行数"""
+        count = 0
+        for record in records:
+            self._writer.append_row({field: record.get(field) for field in self._field_names})
+            count += 1
+        self.row_count += count
+        return count
+
+    def commit(self, poll_interval: float = DEFAULT_BULK_POLL_INTERVAL) -> int:
+        """
+        提交暂存文件，为每组暂存文件提交一个 BulkInsert 任务并等待全部完成
+
+        Returns:
+            int: 导入的行数
+        """
+        if self.row_count == 0:
+            return 0
+        self._writer.commit()
+
+        name = self._collection.name
+        task_ids: List[int] = []
+        for files in self._writer.batch_files:
+            task_id = utility.do_bulk_insert(collection_name=name, files=files, using=self._using)
+            logger.info("提交 BulkInsert 任务 %s: %s", task_id, files)
+            task_ids.append(task_id)
+
+        total = 0
+        for task_id in task_ids:
+            total += wait_for_bulk_insert(task_id, using=self._using, poll_interval=poll_interval)
+        logger.info("BulkInsert 导入 %s 条数据到 %s", total, name)
+        return total
+
+
+def bulk_insert_records(
+    collection: Collection,
+    field_names: Sequence[str],
+    records: List[Dict[str, Any]],
+    storage: BulkStorageConfig,
+    using: str = "default",
+    poll_interval: float = DEFAULT_BULK_POLL_INTERVAL,
+) -> int:
+    """
+    通过 BulkInsert 将记录导入集合
+
+    Args:
+        collection: 目标集合
+        field_names: 需要写入的字段（不含自增主键）
+        records: 记录列表
+        storage: 对象存储配置
+        using: 发起 BulkInsert 请求使用的连接 alias
+        poll_interval: 任务状态轮询间隔（秒）
+
+    Returns:
+        int: 导入的行数
+    """
+    if not records:
+        return 0
+
+    writer = BulkInsertWriter(collection, field_names, storage, using=using)
+    writer.append_records(records)
+    return writer.commit(poll_interval=poll_interval)
@@ -3,12 +3,17 @@
 简化的Milvus Collection管理器
 """
 
+import itertools
 import logging
-from typing import Dict, Optional
+import time
+import uuid
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Set, Tuple
 from pymilvus import Collection, utility, connections, CollectionSchema
 
 from .config import get_milvus_config
-from .schema import COLLECTION_CONFIGS
+from .constants import DEFAULT_CONNECTION_POOL_SIZE
+from .schema import COLLECTION_CONFIGS, get_index_params, resolve_index_type
 
 # 配置日志
 logger = logging.getLogger(__name__)
@@ -16,13 +21,16 @@ logger = logging.getLogger(__name__)
 # 默认集合前缀
 DEFAULT_COLLECTION_PREFIX = "graphrag_"
 
+# list_collections 结果缓存有效期（秒）
+COLLECTION_CACHE_TTL = 5.0
+
 # Milvus集合配置
 
 COLLECTION_TYPES = list(COLLECTION_CONFIGS.keys())
-COLLECTION_NAMES = {
+COLLECTION_NAMES: Mapping[str, str] = MappingProxyType({
     collection_type: f"{DEFAULT_COLLECTION_PREFIX}{collection_type}"
     for collection_type in COLLECTION_TYPES
-}
+})
 
 
 class MilvusCollectionManager:
@@ -31,20 +39,42 @@ class MilvusCollectionManager:
     负责 collection 的创建、删除和操作，并维护与 Milvus 的连接状态。
     """
     
-    def __init__(self, collection_prefix: str = DEFAULT_COLLECTION_PREFIX):
+    def __init__(
+        self,
+        collection_prefix: str = DEFAULT_COLLECTION_PREFIX,
+        index_type: Optional[str] = None,
+        pool_size: int = DEFAULT_CONNECTION_POOL_SIZE,
+    ):
         """
         初始化 Collection 管理器
         
         Args:
             collection_prefix: 集合前缀，默认为 DEFAULT_COLLECTION_PREFIX
+            index_type: 向量索引类型（HNSW / DISKANN / IVF_FLAT），默认为 HNSW
+            pool_size: 连接池大小，每个连接使用独立的 alias 和 gRPC 通道；
+                集合对象创建时绑定其中一个连接，因此轮询分散的是集合而非单次请求
         """
         # 确保collection_prefix不为空
         self.collection_prefix = collection_prefix or DEFAULT_COLLECTION_PREFIX
+        self.index_type = resolve_index_type(index_type)
+        # 预先计算已知集合的完整名称及反向映射
+        self._full: Dict[str, str] = {k: f"{self.collection_prefix}{k}" for k in COLLECTION_CONFIGS}
+        self._reverse: Dict[str, str] = {v: k for k, v in self._full.items()}
         self.collections: Dict[str, Collection] = {}
+        # 本连接周期内已 load 过的集合，检索前不再重复发送 load 请求
+        self._loaded: Set[str] = set()
         self._connected: Optional[bool] = False
         self._host: Optional[str] = None
         self._port: Optional[int] = None
-        logger.info(f"初始化 Collection 管理器，集合前缀: {self.collection_prefix}")
+        self.pool_size = max(1, pool_size)
+        self._aliases: List[str] = []
+        # pymilvus 的 connections 是进程级全局注册表，alias 带上实例标识，
+        # 避免同前缀的多个管理器共用连接、断开时互相拆掉对方的通道
+        self._alias_tag = uuid.uuid4().hex[:8]
+        self._rr = itertools.cycle(["default"])
+        # list_collections 结果的短期缓存：(获取时间, 集合名集合)
+        self._coll_cache: Tuple[float, Set[str]] = (0.0, set())
+        logger.info(f"初始化 Collection 管理器，集合前缀: {self.collection_prefix}，索引类型: {self.index_type}")
     
     def connect(self, host: Optional[str] = None, port: Optional[int] = None) -> None:
         """
@@ -67,30 +97,90 @@ class MilvusCollectionManager:
         self._port = int(port)
         
         try:
-            connections.connect(host=self._host, port=self._port)
+            # 建立多个具名连接，集合对象创建时按轮询绑定其中一个 gRPC 通道，
+            # 不同集合的并发请求因此落在不同通道上；同一集合的请求始终走它绑定的通道。
+            # keep_alive 让 pymilvus 在通道断开后自动重连，长时间运行的进程无需重新 connect
+            for i in range(self.pool_size):
+                alias = f"{self.collection_prefix}{self._alias_tag}_{i}"
+                connections.connect(alias=alias, host=self._host, port=self._port, keep_alive=True)
+                self._aliases.append(alias)
+            self._rr = itertools.cycle(self._aliases)
             self._connected = True
-            logger.info(f"成功连接到 Milvus: {self._host}:{self._port}")
+            logger.info(f"成功连接到 Milvus: {self._host}:{self._port}，连接池大小: {self.pool_size}")
         except Exception as e:  # noqa: BLE001
             logger.error(f"连接 Milvus 失败: {e}")
+            self._release_aliases()
             raise
+        
+        try:
+            self.preload()
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"预加载集合失败，将在首次使用时加载: {e}")
+    
+    def preload(self) -> None:
+        """一次性加载所有已存在的已知集合对象，后续操作复用缓存，避免重复的 describe 请求"""
+        existing = self._existing()
+        for collection_name, full_name in self._full.items():
+            if full_name in existing and collection_name not in self.collections:
+                self.collections[collection_name] = Collection(full_name, using=self._alias())
     
     def disconnect(self) -> None:
         """断开与 Milvus 的连接。"""
         if not self._connected:
             return
         
-        try:
-            connections.disconnect("default")
-            logger.info("已断开 Milvus 连接")
-        except Exception as e:  # noqa: BLE001
-            logger.warning(f"断开 Milvus 连接时发生异常: {e}")
-        finally:
-            self._connected = False
+        self._release_aliases()
+        self._connected = False
+        self._loaded.clear()
+        logger.info("已断开 Milvus 连接")
+    
+    def _release_aliases(self) -> None:
+        """断开连接池中的所有连接"""
+        for alias in self._aliases:
+            try:
+                connections.disconnect(alias)
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"断开 Milvus 连接 {alias} 时发生异常: {e}")
+        self._aliases = []
+        self._rr = itertools.cycle(["default"])
+    
+    def _alias(self) -> str:
+        """轮询获取连接池中的下一个连接 alias（未建立连接池时使用 "default"），用于新建集合对象等一次性绑定"""
+        return next(self._rr)
     
-    def create_collections(self) -> Dict[str, Collection]:
+    def connection_alias(self) -> str:
+        """返回连接池中的一个连接 alias，供需要直接调用 pymilvus utility 的组件（如 BulkInsert）使用"""
+        return self._alias()
+    
+    def full_name(self, collection_name: str) -> str:
+        """返回集合的完整名称（包含前缀）"""
+        full_name = self._full.get(collection_name)
+        if full_name is None:
+            full_name = f"{self.collection_prefix}{collection_name}"
+        return full_name
+    
+    def _existing(self, ttl: float = COLLECTION_CACHE_TTL) -> Set[str]:
+        """
+        获取服务端现有集合名称，ttl 秒内复用上一次 list_collections 的结果，
+        避免每次存在性检查都发起一次 RPC
+        """
+        now = time.monotonic()
+        if now - self._coll_cache[0] > ttl:
+            self._coll_cache = (now, set(utility.list_collections(using=self._alias())))
+        return self._coll_cache[1]
+    
+    def _invalidate_existing(self) -> None:
+        """集合发生增删后使缓存失效"""
+        self._coll_cache = (0.0, set())
+    
+    def create_collections(self, build_index: bool = True) -> Dict[str, Collection]:
         """
         创建所有需要的集合
         
+        Args:
+            build_index: 是否在建集合时立即创建向量索引。首次 BulkInsert 导入时可传 False，
+                待数据导入完成后再调用 ensure_index 一次性建索引，减少段合并与索引重建
+        
         Returns:
             Dict[str, Collection]: 集合名称到Collection对象的映射
         
@@ -98,15 +188,16 @@ class MilvusCollectionManager:
         """
         
         created_collections = {}
+        created_any = False
+        # 一次性获取现有集合，避免对每个集合单独调用 has_collection
+        existing = self._existing()
         
         for collection_name, config in COLLECTION_CONFIGS.items():
-            full_name = f"{self.collection_prefix}{collection_name}"
+            full_name = self._full[collection_name]
             
-            if utility.has_collection(full_name):
+            if full_name in existing:
                 logger.info(f"集合 '{full_name}' 已存在，直接加载")
-                collection = Collection(full_name)
-                self.collections[collection_name] = collection
-                created_collections[collection_name] = collection
+                created_collections[collection_name] = self.get_collection(collection_name)
                 continue
             
             # 创建新集合
@@ -116,22 +207,39 @@ class MilvusCollectionManager:
                 description=config["description"]
             )
             
-            collection = Collection(full_name, schema)
+            collection = Collection(full_name, schema, using=self._alias())
             
-            # 创建索引
-            index_params = {
-                "index_type": "IVF_FLAT",
-                "metric_type": "L2",
-                "params": {"nlist": 128}
-            }
-            collection.create_index("embedding", index_params)
+            if build_index:
+                self._create_index(collection_name, collection)
             
             self.collections[collection_name] = collection
             created_collections[collection_name] = collection
+            created_any = True
             logger.info(f"集合 '{full_name}' 创建成功")
         
+        if created_any:
+            self._invalidate_existing()
         return created_collections
     
+    def _create_index(self, collection_name: str, collection: Collection) -> None:
+        """为集合的向量字段创建索引（集合配置中的 "index" 优先于管理器的默认索引类型）"""
+        config = COLLECTION_CONFIGS.get(collection_name, {})
+        index_params = get_index_params(config.get("index", self.index_type))
+        collection.create_index("embedding", index_params)
+    
+    def ensure_index(self, collection_name: str) -> None:
+        """
+        确保集合的向量字段已建立索引，未建立时创建
+        
+        Args:
+            collection_name: 集合名称（不包含前缀）
+        """
+        collection = self.get_collection(collection_name)
+        if collection.has_index():
+            return
+        logger.info(f"为集合 '{collection.name}' 创建向量索引")
+        self._create_index(collection_name, collection)
+    
     def get_collection(self, collection_name: str) -> Collection:
         """
         获取集合实例
@@ -142,19 +250,37 @@ class MilvusCollectionManager:
         Returns:
             Collection: 集合实例
         """
-        if collection_name in self.collections:
-            return self.collections[collection_name]
+        collection = self.collections.get(collection_name)
+        if collection is not None:
+            return collection
         
         # 如果集合不在缓存中，尝试从数据库加载
-        full_name = f"{self.collection_prefix}{collection_name}"
-        if not utility.has_collection(full_name):
+        full_name = self.full_name(collection_name)
+        if full_name not in self._existing():
             raise ValueError(f"集合 '{full_name}' 不存在，请先创建集合")
         
-        collection = Collection(full_name)
+        collection = Collection(full_name, using=self._alias())
         self.collections[collection_name] = collection
         logger.info(f"从数据库加载集合: {full_name}")
         return collection
     
+    def ensure_loaded(self, collection_name: str) -> Collection:
+        """
+        获取集合实例并确保其已加载到内存
+
+        每个集合在一个连接周期内只发送一次 load 请求；调用 release_collection 或断开连接后重新加载。
+        """
+        collection = self.get_collection(collection_name)
+        if collection_name not in self._loaded:
+            collection.load()
+            self._loaded.add(collection_name)
+        return collection
+    
+    def release_collection(self, collection_name: str) -> None:
+        """从内存中释放集合，下次检索前会重新加载"""
+        self._loaded.discard(collection_name)
+        self.get_collection(collection_name).release()
+    
     def list_collections(self) -> list[str]:
         """
         列出所有GraphRAG相关的集合
@@ -162,7 +288,7 @@ class MilvusCollectionManager:
         注意：假设 Milvus 连接已建立
         """
         
-        all_collections = utility.list_collections()
+        all_collections = self._existing()
         # 确保collection_prefix不为空，避免startswith("")匹配所有集合
         if not self.collection_prefix:
             logger.warning("collection_prefix为空，返回空列表")
@@ -186,27 +312,24 @@ class MilvusCollectionManager:
         
         dropped_count = 0
         
-        # 删除已知的集合
-        for collection_name in COLLECTION_CONFIGS.keys():
-            full_name = f"{self.collection_prefix}{collection_name}"
-            if utility.has_collection(full_name):
-                utility.drop_collection(full_name)
+        # 只获取一次集合列表，已知集合与额外集合在同一轮遍历中删除
+        for full_name in sorted(self._existing()):
+            if not full_name.startswith(self.collection_prefix):
+                continue
+            
+            utility.drop_collection(full_name, using=self._alias())
+            # 已知集合通过精确匹配判断，其余带前缀的集合作为额外集合一并删除
+            collection_name = self._reverse.get(full_name)
+            if collection_name is not None:
                 logger.info(f"删除集合: {full_name}")
-                dropped_count += 1
-                
                 # 从缓存中移除
-                if collection_name in self.collections:
-                    del self.collections[collection_name]
-        
-        # 删除其他可能存在的GraphRAG集合
-        all_collections = utility.list_collections()
-        for collection_name in all_collections:
-            if (collection_name.startswith(self.collection_prefix) and 
-                not any(collection_name.endswith(known) for known in COLLECTION_CONFIGS.keys())):
-                utility.drop_collection(collection_name)
-                logger.info(f"删除额外集合: {collection_name}")
-                dropped_count += 1
+                self.collections.pop(collection_name, None)
+                self._loaded.discard(collection_name)
+            else:
+                logger.info(f"删除额外集合: {full_name}")
+            dropped_count += 1
         
+        self._invalidate_existing()
         return dropped_count
     
     def collection_exists(self, collection_name: str) -> bool:
@@ -222,8 +345,8 @@ class MilvusCollectionManager:
         注意：假设 Milvus 连接已建立
         """
         
-        full_name = f"{self.collection_prefix}{collection_name}"
-        return utility.has_collection(full_name)
+        full_name = self.full_name(collection_name)
+        return full_name in self._existing()
     
     def get_collection_info(self, collection_name: str) -> dict:
         """获取集合基本信息"""
@@ -237,7 +360,8 @@ class MilvusCollectionManager:
 def create_collection_manager_with_connection(
     host: str = "localhost",
     port: int = 19530,
-    collection_prefix: str = DEFAULT_COLLECTION_PREFIX
+    collection_prefix: str = DEFAULT_COLLECTION_PREFIX,
+    index_type: Optional[str] = None,
 ) -> MilvusCollectionManager:
     """
     便捷函数：创建 Collection Manager 并建立 Milvus 连接
@@ -249,11 +373,12 @@ def create_collection_manager_with_connection(
         host: Milvus服务器地址
         port: Milvus服务器端口
         collection_prefix: 集合前缀
+        index_type: 向量索引类型，默认为 HNSW
         
     Returns:
         MilvusCollectionManager: 已连接的 collection manager
     """
-    manager = MilvusCollectionManager(collection_prefix=collection_prefix)
+    manager = MilvusCollectionManager(collection_prefix=collection_prefix, index_type=index_type)
     manager.connect(host=host, port=port)
     return manager
 
@@ -270,8 +395,8 @@ def main(host: Optional[str] = None, port: Optional[int] = None, collection_pref
     print("🔗 连接到Milvus并创建集合...")
     
     # 如果没有提供参数，从配置文件读取
+    config = get_milvus_config()
     if host is None or port is None:
-        config = get_milvus_config()
         host = host or config.host or "localhost"
         port = port or config.port or 19530
         collection_prefix = collection_prefix or config.collection_prefix or DEFAULT_COLLECTION_PREFIX
@@ -283,6 +408,7 @@ def main(host: Optional[str] = None, port: Optional[int] = None, collection_pref
         host=host,
         port=port,
         collection_prefix=collection_prefix,
+        index_type=config.index_type,
     )
     
     try:
@@ -290,8 +416,7 @@ def main(host: Optional[str] = None, port: Optional[int] = None, collection_pref
         
         print(f"✅ 成功创建/验证 {len(collections)} 个集合:")
         for name in collections.keys():
-            full_name = f"{manager.collection_prefix}{name}"
-            print(f"  - {full_name}")
+            print(f"  - {manager.full_name(name)}")
         
         return True
         
@@ -2,14 +2,14 @@
 Milvus配置模块，从环境变量读取配置
 """
 
-from typing import Optional
+import functools
+import os
+from dataclasses import dataclass
 
-from environs import Env
+from .constants import DEFAULT_INDEX_TYPE, DEFAULT_QWEN_EMBEDDING_MODEL
 
-from .constants import DEFAULT_QWEN_EMBEDDING_MODEL
 
-
-def _get_str_from_env(env: Env, keys: list[str], default: str) -> str:
+def _get_str_from_env(keys: list[str], default: str) -> str:
     """
     按顺序从多个环境变量名中读取字符串，若都不存在则返回默认值。
     
@@ -19,66 +19,74 @@ def _get_str_from_env(env: Env, keys: list[str], default: str) -> str:
     - 都不存在时返回 default
     """
     for key in keys:
-        value = env.str(key, default=None)
+        value = os.environ.get(key)
         if value is not None:
             return value
     return default
 
 
-def _get_int_from_env(env: Env, keys: list[str], default: int) -> int:
+def _get_int_from_env(keys: list[str], default: int) -> int:
     """按顺序从多个环境变量名中读取整数，不存在则返回默认值。"""
     for key in keys:
-        value = env.int(key, default=None)
+        value = os.environ.get(key)
         if value is not None:
-            return value
+            try:
+                return int(value)
+            except ValueError as e:
+                raise ValueError(f"环境变量 {key} 不是合法的整数: {value!r}") from e
     return default
 
 
+@dataclass(frozen=True, slots=True)
 class MilvusConfig:
-    """Milvus数据库配置类"""
-
-    def __init__(
-        self,
-        host: Optional[str] = None,
-        port: Optional[int] = None,
-        collection_prefix: Optional[str] = None,
-        embedding_model: Optional[str] = None,
-    ):
-        self.host = host
-        self.port = port
-        self.collection_prefix = collection_prefix
-        self.embedding_model = embedding_model
+    """Milvus数据库配置类（不可变）"""
+
+    host: str = "localhost"
+    port: int = 19530
+    collection_prefix: str = "graphrag_"
+    embedding_model: str = DEFAULT_QWEN_EMBEDDING_MODEL
+    index_type: str = DEFAULT_INDEX_TYPE
+    # 嵌入磁盘缓存目录，为空表示只使用进程内缓存
+    embedding_cache_dir: str | None = None
+    # 导入目录时同时导入的 parquet 文件数量（每个文件对应不同集合）
+    import_concurrency: int = 2
+    # 导入时每次从 parquet 读取并插入的行数
+    insert_batch_size: int = 1000
 
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def from_env(cls) -> "MilvusConfig":
-        """从环境变量创建配置实例（不依赖 graphrag 的 EnvironmentReader）。"""
-        env = Env()
-        # 默认会从当前环境读取；上层脚本已通过 python-dotenv 预先加载 .env
-
+        """
+        从环境变量创建配置实例（不依赖 graphrag 的 EnvironmentReader）。
+        
+        结果在进程内缓存；上层脚本应在首次调用前通过 python-dotenv 加载 .env，
+        若之后修改了环境变量，需调用 MilvusConfig.from_env.cache_clear()。
+        """
         return cls(
-            host=_get_str_from_env(env, ["milvus_host", "MILVUS_HOST"], "localhost"),
-            port=_get_int_from_env(env, ["milvus_port", "MILVUS_PORT"], 19530),
+            host=_get_str_from_env(["milvus_host", "MILVUS_HOST"], "localhost"),
+            port=_get_int_from_env(["milvus_port", "MILVUS_PORT"], 19530),
             collection_prefix=_get_str_from_env(
-                env, ["milvus_collection_prefix", "MILVUS_COLLECTION_PREFIX"], "graphrag_"
+                ["milvus_collection_prefix", "MILVUS_COLLECTION_PREFIX"], "graphrag_"
             ),
             embedding_model=_get_str_from_env(
-                env,
                 ["milvus_embedding_model", "MILVUS_EMBEDDING_MODEL"],
                 DEFAULT_QWEN_EMBEDDING_MODEL,
             ),
+            index_type=_get_str_from_env(["milvus_index_type", "MILVUS_INDEX_TYPE"], DEFAULT_INDEX_TYPE),
+            embedding_cache_dir=_get_str_from_env(
+                ["milvus_embedding_cache_dir", "MILVUS_EMBEDDING_CACHE_DIR"], ""
+            ) or None,
+            import_concurrency=_get_int_from_env(
+                ["milvus_import_concurrency", "MILVUS_IMPORT_CONCURRENCY"], 2
+            ),
+            insert_batch_size=_get_int_from_env(["milvus_insert_batch", "MILVUS_INSERT_BATCH"], 1000),
         )
 
     def get_grpc_address(self) -> str:
         """获取gRPC地址"""
         return f"{self.host}:{self.port}"
 
-    def __repr__(self) -> str:
-        return (
-            f"MilvusConfig(host={self.host}, port={self.port}, "
-            f"collection_prefix={self.collection_prefix})"
-        )
-
 
 def get_milvus_config() -> MilvusConfig:
     """获取Milvus配置实例"""
-    return MilvusConfig.from_env()
\ No newline at end of file
+    return MilvusConfig.from_env()
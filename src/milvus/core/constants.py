@@ -5,5 +5,10 @@ Milvus 向量存储模块的公共常量.
 DEFAULT_QWEN_EMBEDDING_MODEL = "text-embedding-v3"
 DEFAULT_QWEN_API_BASE = "https://dashscope.aliyuncs.com/compatible-mode/v1"
 DEFAULT_EMBEDDING_BATCH_SIZE = 10  # Qwen API 限制批量大小不超过10
+MAX_TOKENS_PER_REQUEST = 8000  # 单次嵌入请求的 token 预算（接口上限 8192，预留余量）
+DEFAULT_EMBEDDING_CONCURRENCY = 8  # 同时在途的嵌入请求数量上限
 EMBEDDING_DIM = 1024  # Qwen text-embedding-v3 最大支持1024维
 
+EMBEDDING_DTYPE = "float16"  # 向量字段存储精度，float16 相比 float32 内存/磁盘占用减半
+DEFAULT_CONNECTION_POOL_SIZE = 4  # 每个集合管理器持有的 Milvus 连接（gRPC 通道）数量
+DEFAULT_INDEX_TYPE = "HNSW"  # 默认向量索引类型
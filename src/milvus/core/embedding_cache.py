@@ -0,0 +1,129 @@
+"""
+嵌入向量缓存：进程内 LRU + 可选的 SQLite 持久化存储.
+
+缓存键为 blake2b(f"{model}:{text}")，同一模型下相同文本的嵌入是确定的，
+命中缓存即可跳过一次网络请求。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SQLite 单条语句的参数数量有上限，批量查询时按此大小分段
+_SQLITE_PARAM_CHUNK = 500
+
+DEFAULT_MEMORY_CACHE_SIZE = 10000
+CACHE_DB_FILENAME = "embeddings.sqlite3"
+
+
+class EmbeddingCache:
+    """
+    两级嵌入缓存.
+
+    - 第一级：进程内 OrderedDict，按 LRU 淘汰，最多保留 max_memory_entries 条；
+    - 第二级：cache_dir 下的 SQLite 数据库（可选），向量以 float32 原始字节存储。
+
+    memory_dtype 为进程内缓存保存向量所用的精度，默认 float32；嵌入最终以 float16 入库时
+    可同样以 float16 保存，内存占用减半，磁盘缓存仍保留 float32 原始向量。
+
+    所有方法都是线程安全的。
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        cache_dir: str | None = None,
+        max_memory_entries: int = DEFAULT_MEMORY_CACHE_SIZE,
+        memory_dtype: np.dtype | type = np.float32,
+    ) -> None:
+        self.model_name = model_name
+        self.max_memory_entries = max_memory_entries
+        self.memory_dtype = np.dtype(memory_dtype)
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_path: Optional[str] = None
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db_path = os.path.join(cache_dir, CACHE_DB_FILENAME)
+            self.open()
+            logger.info("启用嵌入磁盘缓存: %s", self._db_path)
+
+    def open(self) -> None:
+        """打开磁盘缓存连接；close 之后再次调用可重新打开，未配置 cache_dir 或已打开时不做任何事."""
+        with self._lock:
+            if self._db_path is None or self._db is not None:
+                return
+            # 使用默认的隐式事务模式，写入在 with self._db 块内一次提交
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+
+    def key(self, text: str) -> str:
+        """计算文本在当前模型下的缓存键."""
+        return hashlib.blake2b(f"{self.model_name}:{text}".encode("utf-8"), digest_size=16).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """批量读取缓存，返回命中的键到向量的映射."""
+        found: Dict[str, np.ndarray] = {}
+        misses: List[str] = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    misses.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+
+            if self._db is not None and misses:
+                for start in range(0, len(misses), _SQLITE_PARAM_CHUNK):
+                    part = misses[start : start + _SQLITE_PARAM_CHUNK]
+                    placeholders = ",".join("?" * len(part))
+                    rows = self._db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32).astype(self.memory_dtype)
+                        found[key] = vector
+                        self._remember(key, vector)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """批量写入缓存."""
+        if not items:
+            return
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, np.asarray(vector, dtype=self.memory_dtype))
+            if self._db is not None:
+                # 整批写入放在同一个事务中，只提交（落盘同步）一次，而不是每行一次
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(key, np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()],
+                    )
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """写入进程内缓存并执行 LRU 淘汰（调用方需持有锁）."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def close(self) -> None:
+        """关闭磁盘缓存连接."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
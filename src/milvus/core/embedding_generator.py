@@ -4,20 +4,64 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import List
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Sequence
 
-from openai import OpenAI
+import numpy as np
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    AuthenticationError,
+    InternalServerError,
+    NotFoundError,
+    OpenAI,
+    PermissionDeniedError,
+    RateLimitError,
+)
 
 from .constants import (
     DEFAULT_EMBEDDING_BATCH_SIZE,
+    DEFAULT_EMBEDDING_CONCURRENCY,
     DEFAULT_QWEN_API_BASE,
     DEFAULT_QWEN_EMBEDDING_MODEL,
     EMBEDDING_DIM,
+    EMBEDDING_DTYPE,
+    MAX_TOKENS_PER_REQUEST,
 )
+from .embedding_cache import EmbeddingCache
+from .http_client import build_async_http_client, build_http_client
 
 logger = logging.getLogger(__name__)
 
+# 可重试的瞬时错误：限流、连接/超时、服务端 5xx
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+# 与输入无关的错误：拆分分块重试也不会成功
+_FATAL_ERRORS = (AuthenticationError, PermissionDeniedError, NotFoundError)
+# 退避等待的基数与上限（秒）
+_BACKOFF_BASE = 1.0
+_BACKOFF_MAX = 30.0
+
+# 中日韩字符，按每个字符约 1 个 token 估算
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+
+@lru_cache(maxsize=65536)
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数量，用于请求打包.
+
+    中日韩字符约 1 字 1 token，其余字符约 4 字符 1 token；结果按文本缓存，重试时无需重复计算。
+    """
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4 + 1
+
 
 class QwenEmbeddingGenerator:
     """
@@ -32,14 +76,32 @@ class QwenEmbeddingGenerator:
         model: str | None = None,
         name: str = "milvus_embedding_generator",
         batch_size: int = DEFAULT_EMBEDDING_BATCH_SIZE,
-        max_retries: int = 20,
+        max_retries: int = 6,
+        max_tokens_per_request: int = MAX_TOKENS_PER_REQUEST,
+        concurrency: int = DEFAULT_EMBEDDING_CONCURRENCY,
+        use_cache: bool = True,
+        cache_dir: str | None = None,
+        normalize: bool = True,
+        compress_requests: bool = False,
     ) -> None:
         """
         初始化 Qwen 嵌入生成器.
 
         注意：
         - api_key 必须由调用方显式传入，本模块不再从环境变量中解析默认值；
-        - 这样可以确保在作为库被引用时，所有敏感配置均由外部统一管理。
+        - 这样可以确保在作为库被引用时，所有敏感配置均由外部统一管理；
+        - 分块同时受 batch_size（条数上限）和 max_tokens_per_request（token 预算）约束，
+          短文本尽量装满一个请求，长文本不会因超出 token 上限而整块回退为零向量；
+        - concurrency 控制同时在途的分块请求数量，嵌入请求是网络 I/O 密集型，
+          并发发送可以重叠各分块的往返延迟；
+        - use_cache 为 True 时启用进程内嵌入缓存，重复文本不再请求接口；
+          同时传入 cache_dir 时缓存会持久化到该目录下的 SQLite 文件，跨进程复用；
+        - normalize 为 True 时返回 L2 归一化后的向量，集合使用内积（IP）度量即等价于余弦相似度，
+          仅在调试时关闭；
+        - max_retries 为每个分块遇到限流/连接/5xx 错误时的重试次数，采用带抖动的指数退避并遵循
+          Retry-After；重试耗尽或请求被拒绝时将分块二分后分别重试，只有确实无法嵌入的单条文本
+          才会回退为零向量；
+        - compress_requests 为 True 时以 gzip 压缩请求体，服务端返回 415 时自动回退为不压缩。
         """
         if not api_key:
             raise ValueError("api_key 不能为空，请由调用方显式传入 Qwen/DashScope API Key")
@@ -50,65 +112,355 @@ class QwenEmbeddingGenerator:
         self.model_name = model or DEFAULT_QWEN_EMBEDDING_MODEL
         self.batch_size = batch_size
         self.dimension = EMBEDDING_DIM
+        self.dtype = np.dtype(EMBEDDING_DTYPE)
+        # 查询失败时回退使用的零向量，只分配一次并设为只读后共享
+        self._zero = np.zeros(self.dimension, dtype=self.dtype)
+        self._zero.flags.writeable = False
         self.max_retries = max_retries
+        self.max_tokens_per_request = max_tokens_per_request
+        self.concurrency = max(1, concurrency)
+        self.normalize = normalize
+        self._cache: Optional[EmbeddingCache] = (
+            EmbeddingCache(self.model_name, cache_dir=cache_dir, memory_dtype=self.dtype) if use_cache else None
+        )
 
         logger.info(
-            "初始化 Qwen 嵌入模型: model=%s, api_base=%s, batch_size=%s",
+            "初始化 Qwen 嵌入模型: model=%s, api_base=%s, batch_size=%s, concurrency=%s",
             self.model_name,
             self.api_base,
             self.batch_size,
+            self.concurrency,
+        )
+
+        self._compress_requests = compress_requests
+        self._client = self._build_client()
+        # 异步客户端供 aembed_batch 使用，可在调用方的事件循环中并发发送分块请求
+        self._async_client = self._build_async_client()
+        # close/aclose 之后置位，下次使用时按需重建客户端并重新打开磁盘缓存
+        self._closed = False
+        self._reopen_lock = threading.Lock()
+
+    def _build_client(self) -> OpenAI:
+        """
+        使用 OpenAI 官方客户端，以 Qwen 的 OpenAI-Compatible 接口调用嵌入模型.
+
+        重试由本类自行处理（遵循 Retry-After 并对分块二分），关闭 SDK 内置重试。
+        """
+        return OpenAI(
+            api_key=self.api_key,
+            base_url=self.api_base,
+            max_retries=0,
+            http_client=build_http_client(self._compress_requests),
         )
 
-        # 使用 OpenAI 官方客户端，以 Qwen 的 OpenAI-Compatible 接口调用嵌入模型
-        self._client = OpenAI(
+    def _build_async_client(self) -> AsyncOpenAI:
+        """构建异步客户端，配置与同步客户端一致."""
+        return AsyncOpenAI(
             api_key=self.api_key,
             base_url=self.api_base,
-            max_retries=self.max_retries,
+            max_retries=0,
+            http_client=build_async_http_client(self._compress_requests),
         )
 
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def _ensure_open(self) -> None:
+        """
+        close/aclose 之后再次使用时，重建已关闭的 HTTP 客户端并重新打开磁盘缓存.
+
+        否则请求会因客户端已关闭而失败，被当作可重试错误逐条退避后回退为零向量。
+        """
+        if not self._closed:
+            return
+        with self._reopen_lock:
+            if not self._closed:
+                return
+            self._client = self._build_client()
+            if self._async_client.is_closed():
+                self._async_client = self._build_async_client()
+            if self._cache is not None:
+                self._cache.open()
+            self._closed = False
+            logger.info("嵌入生成器已在关闭后重新打开: %s", self.model_name)
+
+    def _plan_chunks(self, texts: List[str], indices: List[int]) -> List[List[int]]:
+        """
+        将待请求文本的下标贪心打包为多个请求分块.
+
+        每个分块不超过 batch_size 条，且估算 token 总数不超过 max_tokens_per_request
+        （单条超出预算的文本单独成块）。打包前按估算 token 数排序，使长度相近的文本进入同一请求，
+        短文本不会与长文本混在一起被迫拆成更多请求；结果按下标写回，输出顺序不受影响。
+        """
+        chunks: List[List[int]] = []
+        chunk: List[int] = []
+        chunk_tokens = 0
+        for i in sorted(indices, key=lambda i: estimate_tokens(texts[i])):
+            tokens = estimate_tokens(texts[i])
+            if chunk and (len(chunk) >= self.batch_size or chunk_tokens + tokens > self.max_tokens_per_request):
+                chunks.append(chunk)
+                chunk, chunk_tokens = [], 0
+            chunk.append(i)
+            chunk_tokens += tokens
+        if chunk:
+            chunks.append(chunk)
+
+        if chunks:
+            logger.debug(
+                "嵌入请求打包: %s 条文本分为 %s 个请求，平均每个请求 %.1f 条（上限 %s）",
+                len(indices),
+                len(chunks),
+                len(indices) / len(chunks),
+                self.batch_size,
+            )
+        return chunks
+
+    def _embed_chunk(self, chunk: List[str]) -> List[List[float]]:
+        """同步请求单个分块的嵌入."""
+        # Qwen text-embedding-v3 默认返回1024维向量
+        response = self._client.embeddings.create(
+            model=self.model_name,
+            input=chunk,
+        )
+        # OpenAI Embeddings API 返回一个 data 列表，每个元素包含 embedding 向量
+        return [item.embedding for item in response.data]
+
+    async def _aembed_chunk(self, chunk: List[str], semaphore: asyncio.Semaphore) -> List[List[float]]:
+        """异步请求单个分块的嵌入，受信号量限制在途请求数量."""
+        async with semaphore:
+            response = await self._async_client.embeddings.create(
+                model=self.model_name,
+                input=chunk,
+            )
+        return [item.embedding for item in response.data]
+
+    @staticmethod
+    def _retry_delay(exc: Exception, attempt: int) -> float:
+        """计算第 attempt 次重试前的等待时间，优先使用服务端返回的 Retry-After."""
+        response = getattr(exc, "response", None)
+        if response is not None:
+            headers = response.headers
+            try:
+                if "retry-after-ms" in headers:
+                    return float(headers["retry-after-ms"]) / 1000
+                if "retry-after" in headers:
+                    return float(headers["retry-after"])
+            except ValueError:
+                pass
+        return min(_BACKOFF_MAX, _BACKOFF_BASE * 2**attempt) + random.uniform(0, _BACKOFF_BASE)
+
+    def _embed_with_retry(self, chunk: List[str]) -> List[List[float]]:
+        """请求单个分块，遇到瞬时错误时指数退避重试."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return self._embed_chunk(chunk)
+            except _RETRYABLE_ERRORS as exc:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(exc, attempt)
+                logger.warning("嵌入请求失败，%.1f 秒后第 %s 次重试: %s", delay, attempt + 1, exc)
+                time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def _embed_resilient(self, chunk: List[str]) -> List[Optional[List[float]]]:
+        """
+        请求单个分块，重试耗尽后二分分块分别请求.
+
+        返回与 chunk 对齐的结果，无法嵌入的单条文本对应 None。
+        """
+        try:
+            return list(self._embed_with_retry(chunk))
+        except _FATAL_ERRORS:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            if len(chunk) == 1:
+                logger.error("文本嵌入失败，使用零向量回退: %s", exc)
+                return [None]
+            mid = len(chunk) // 2
+            return self._embed_resilient(chunk[:mid]) + self._embed_resilient(chunk[mid:])
+
+    async def _aembed_with_retry(self, chunk: List[str], semaphore: asyncio.Semaphore) -> List[List[float]]:
+        """_embed_with_retry 的异步版本，退避等待期间不占用并发名额."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await self._aembed_chunk(chunk, semaphore)
+            except _RETRYABLE_ERRORS as exc:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._retry_delay(exc, attempt)
+                logger.warning("嵌入请求失败，%.1f 秒后第 %s 次重试: %s", delay, attempt + 1, exc)
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def _aembed_resilient(
+        self, chunk: List[str], semaphore: asyncio.Semaphore
+    ) -> List[Optional[List[float]]]:
+        """_embed_resilient 的异步版本."""
+        try:
+            return list(await self._aembed_with_retry(chunk, semaphore))
+        except _FATAL_ERRORS:
+            raise
+        except Exception as exc:  # noqa: BLE001
+            if len(chunk) == 1:
+                logger.error("文本嵌入失败，使用零向量回退: %s", exc)
+                return [None]
+            mid = len(chunk) // 2
+            return await self._aembed_resilient(chunk[:mid], semaphore) + await self._aembed_resilient(
+                chunk[mid:], semaphore
+            )
+
+    def _lookup_cache(
+        self, texts: List[str], out: Optional[np.ndarray] = None
+    ) -> tuple[np.ndarray, List[int], List[str]]:
+        """
+        预分配（或复用调用方提供的）结果矩阵并填入缓存中已有的嵌入.
+
+        Returns:
+            (形状为 (len(texts), dimension) 的结果矩阵, 未命中的下标列表, 每条文本的缓存键)
+        """
+        shape = (len(texts), self.dimension)
+        if out is None:
+            out = np.empty(shape, dtype=self.dtype)
+        elif out.shape != shape or out.dtype != self.dtype:
+            raise ValueError(f"out 的形状/精度应为 {shape}/{self.dtype}，实际为 {out.shape}/{out.dtype}")
+        if self._cache is None:
+            return out, list(range(len(texts))), []
+
+        keys = [self._cache.key(text) for text in texts]
+        cached = self._cache.get_many(keys)
+        missing: List[int] = []
+        for i, key in enumerate(keys):
+            vector = cached.get(key)
+            if vector is None:
+                missing.append(i)
+            else:
+                out[i] = self._finalize(vector)
+        if cached:
+            logger.debug("嵌入缓存命中 %s/%s 条", len(texts) - len(missing), len(texts))
+        return out, missing, keys
+
+    def _finalize(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        在 float32 精度下对向量做 L2 归一化（零向量保持为零）.
+
+        einsum 一次遍历求各行平方和，再原地乘以倒数范数，避免 norm + 除法两次读写整块数据。
+        """
+        if not self.normalize:
+            return vectors
+        vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+        squared = np.einsum("ij,ij->i", vectors, vectors)
+        inv = np.float32(1.0) / np.sqrt(np.maximum(squared, np.float32(1e-24)))
+        vectors *= inv[:, None]
+        return vectors
+
+    def _merge_chunk_results(
+        self,
+        out: np.ndarray,
+        keys: List[str],
+        chunks: List[List[int]],
+        results: Sequence[object],
+    ) -> np.ndarray:
+        """
+        将各分块结果直接写入预分配的结果矩阵，失败的分块/文本以零向量回退，成功的结果写入缓存.
+
+        磁盘缓存保留接口返回的 float32 原始向量（进程内缓存按向量字段精度保存），
+        结果矩阵中为归一化后、向量字段存储精度的向量。
+        """
+        fresh: dict = {}
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, BaseException):
+                logger.error("批量生成嵌入失败，使用零向量回退: %s", result)
+                out[chunk] = 0.0
+                continue
+            ok = [(i, vector) for i, vector in zip(chunk, result) if vector is not None]
+            out[[i for i, vector in zip(chunk, result) if vector is None]] = 0.0
+            if not ok:
+                continue
+            rows = [i for i, _ in ok]
+            vectors = np.asarray([vector for _, vector in ok], dtype=np.float32)
+            out[rows] = self._finalize(vectors)
+            if self._cache is not None:
+                fresh.update(zip((keys[i] for i in rows), vectors))
+        if self._cache is not None:
+            self._cache.put_many(fresh)
+        return out
+
+    def embed_batch(self, texts: List[str], out: Optional[np.ndarray] = None) -> np.ndarray:
         """
         以批次方式生成嵌入，自动分块并处理失败回退.
+
+        先查询缓存，仅对未命中的文本发起请求；各分块通过线程池并发请求
+        （最多 concurrency 个在途）。返回形状为 (len(texts), dimension) 的连续矩阵，
+        行顺序与输入一致，可直接作为列数据写入 Milvus。
+
+        传入 out（形状 (len(texts), dimension)、精度与向量字段一致）时结果直接写入其中并返回 out，
+        批量导入时可跨批次复用同一块缓冲区。
         """
-        if not texts:
-            return []
+        self._ensure_open()
+        out, missing, keys = self._lookup_cache(texts, out)
+        chunks = self._plan_chunks(texts, missing)
 
-        embeddings: list[list[float]] = []
-        for start in range(0, len(texts), self.batch_size):
-            chunk = texts[start : start + self.batch_size]
+        def _run(chunk: List[int]) -> object:
             try:
-                # Qwen text-embedding-v3 默认返回1024维向量
-                response = self._client.embeddings.create(
-                    model=self.model_name,
-                    input=chunk,
-                )
-                # OpenAI Embeddings API 返回一个 data 列表，每个元素包含 embedding 向量
-                chunk_embeddings = [item.embedding for item in response.data]
+                return self._embed_resilient([texts[i] for i in chunk])
             except Exception as exc:  # noqa: BLE001
-                logger.error("批量生成嵌入失败，使用零向量回退: %s", exc)
-                chunk_embeddings = self.zero_vectors(len(chunk))
-            embeddings.extend(chunk_embeddings)
+                return exc
+
+        if len(chunks) <= 1 or self.concurrency == 1:
+            results = [_run(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(chunks))) as executor:
+                results = list(executor.map(_run, chunks))
 
-        return embeddings
+        return self._merge_chunk_results(out, keys, chunks, results)
+
+    async def aembed_batch(self, texts: List[str], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        embed_batch 的异步版本，使用 AsyncOpenAI 在当前事件循环中并发请求各分块.
+        """
+        self._ensure_open()
+        out, missing, keys = self._lookup_cache(texts, out)
+        chunks = self._plan_chunks(texts, missing)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(
+            *(self._aembed_resilient([texts[i] for i in chunk], semaphore) for chunk in chunks),
+            return_exceptions=True,
+        )
+        return self._merge_chunk_results(out, keys, chunks, list(results))
 
-    def embed(self, text: str) -> List[float]:
+    def embed(self, text: str) -> np.ndarray:
         """
         生成单条文本嵌入.
         """
-        batch = self.embed_batch([text])
-        if batch:
-            return batch[0]
-        return self.zero_vector()
+        return self.embed_batch([text])[0]
 
-    def zero_vector(self) -> List[float]:
+    async def aembed(self, text: str) -> np.ndarray:
         """
-        返回单个零向量.
+        embed 的异步版本，请求在当前事件循环中经连接池发出，不占用线程.
+        """
+        return (await self.aembed_batch([text]))[0]
+
+    def close(self) -> None:
+        """关闭同步 HTTP 客户端与磁盘缓存（可在应用关闭时调用，之后再次使用时会自动重新打开）."""
+        self._closed = True
+        self._client.close()
+        if self._cache is not None:
+            self._cache.close()
+
+    async def aclose(self) -> None:
+        """关闭全部 HTTP 客户端与磁盘缓存，异步客户端需要在其所属的事件循环中关闭."""
+        await self._async_client.close()
+        self.close()
+
+    def zero_vector(self) -> np.ndarray:
         """
-        return [0.0] * self.dimension
+        返回单个零向量（形状为 (dimension,)，精度与向量字段一致）.
 
-    def zero_vectors(self, count: int) -> List[List[float]]:
+        返回的是共享的只读数组，需要修改时请先 copy()。
         """
-        返回指定数量的零向量.
+        return self._zero
+
+    def zero_vectors(self, count: int) -> np.ndarray:
         """
-        return [[0.0] * self.dimension for _ in range(count)]
+        返回指定数量的零向量（形状为 (count, dimension)，精度与向量字段一致）.
 
+        使用一次连续分配代替逐条构造 Python 列表；pymilvus 插入/检索均可直接接受 ndarray。
+        """
+        return np.zeros((count, self.dimension), dtype=self.dtype)
@@ -6,19 +6,152 @@ Parquet -> Milvus 数据导入工具
 
 import logging
 import os
-from typing import Any, Dict, List
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from pymilvus import Collection
 from dotenv import load_dotenv
+from .bulk_import import BulkInsertWriter, BulkStorageConfig
 from .collection_manager import MilvusCollectionManager
-from .constants import DEFAULT_QWEN_EMBEDDING_MODEL
+from .constants import DEFAULT_EMBEDDING_CONCURRENCY, DEFAULT_QWEN_EMBEDDING_MODEL
 from .embedding_generator import QwenEmbeddingGenerator
-from .schema import PARQUET_MAPPING
+from .schema import INSERT_FIELD_NAMES, PARQUET_MAPPING, to_embedding_array
 
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 集合类型 -> 待嵌入文本所在的源列（entity_description 由 title 与 description/summary 组合，单独处理）
+TEXT_SOURCE_COLUMNS: Dict[str, str] = {
+    "relationship": "description",
+    "text_unit": "text",
+    "entity_title": "title",
+    "community_title": "title",
+    "community_summary": "summary",
+    "community_full_content": "full_content",
+}
+
+# 集合类型 -> 需要从 parquet 读取的列（按文件实际包含的列取交集）
+COLLECTION_SOURCE_COLUMNS: Dict[str, List[str]] = {
+    collection_type: ["id", column] for collection_type, column in TEXT_SOURCE_COLUMNS.items()
+}
+COLLECTION_SOURCE_COLUMNS["entity_description"] = ["id", "title", "description", "summary"]
+
+# 一批源数据：parquet 流式读取得到的 RecordBatch，或由 DataFrame 转换得到的 Table
+ArrowData = Union[pa.RecordBatch, pa.Table]
+ColumnBuilder = Callable[[ArrowData], Tuple[Dict[str, Any], List[str]]]
+
+
+def _string_column(data: ArrowData, name: str) -> pa.Array:
+    """在 Arrow 层将列转换为 utf8 字符串，空值填充为空字符串，避免逐个单元格调用 str()"""
+    return pc.fill_null(data.column(name).cast(pa.string()), "")
+
+
+def _source_ids(data: ArrowData) -> List[str]:
+    if "id" not in data.schema.names:
+        return [""] * data.num_rows
+    return _string_column(data, "id").to_pylist()
+
+
+def _text_columns(column: str, data: ArrowData) -> Tuple[Dict[str, Any], List[str]]:
+    """字段名与源列名相同、且该列即为待嵌入文本的集合类型"""
+    if column not in data.schema.names:
+        return {}, []
+    texts = _string_column(data, column).to_pylist()
+    return {"source_id": _source_ids(data), column: texts}, texts
+
+
+def _entity_description_columns(data: ArrowData) -> Tuple[Dict[str, Any], List[str]]:
+    """entity_description：嵌入文本为 "title:description"，description 缺失时回退到 summary"""
+    names = data.schema.names
+    if "title" not in names:
+        return {}, []
+    titles = _string_column(data, "title")
+    # 检查是否有description字段（entities.parquet）或summary字段（community_reports.parquet）
+    if "description" in names:
+        descs = _string_column(data, "description")
+    elif "summary" in names:
+        descs = _string_column(data, "summary")
+    else:
+        descs = pa.array([""] * data.num_rows, type=pa.string())
+    texts = pc.binary_join_element_wise(titles, descs, ":").to_pylist()
+    columns = {
+        "source_id": _source_ids(data),
+        "title": titles.to_pylist(),
+        "description": descs.to_pylist(),
+        "title_description": texts,
+    }
+    return columns, texts
+
+
+# 集合类型 -> 由整批数据构造 (标量字段列数据, 待嵌入文本) 的函数，每批数据只分派一次
+COLUMN_BUILDERS: Dict[str, ColumnBuilder] = {
+    collection_type: partial(_text_columns, column) for collection_type, column in TEXT_SOURCE_COLUMNS.items()
+}
+COLUMN_BUILDERS["entity_description"] = _entity_description_columns
+
+
+# 中文句末标点之后的零宽切分点，用于一次性完成分句
+_SENT_RE = re.compile(r"(?<=[。！？])")
+
+# 后台线程预读的 parquet 批次数量
+PREFETCH_BATCHES = 2
+
+T = TypeVar("T")
+
+
+def _prefetch(iterable: Iterable[T], depth: int = PREFETCH_BATCHES) -> Iterator[T]:
+    """
+    在后台线程中提前迭代 iterable，最多缓冲 depth 个元素
+
+    调用方处理当前批次（生成嵌入、写入）时，下一批的读取与解码在后台进行。
+    后台线程抛出的异常会在调用方取到对应位置时重新抛出；调用方提前结束迭代时后台线程随之退出。
+    """
+    buffer: "queue.Queue[Tuple[Optional[bool], Any]]" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def _put(entry: Tuple[Optional[bool], Any]) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce() -> None:
+        try:
+            for item in iterable:
+                if not _put((True, item)):
+                    return
+        except BaseException as e:  # noqa: BLE001
+            _put((False, e))
+            return
+        _put((None, None))
+
+    thread = threading.Thread(target=_produce, name="parquet-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            ok, value = buffer.get()
+            if ok is None:
+                return
+            if not ok:
+                raise value
+            yield value
+    finally:
+        stop.set()
+        thread.join()
+
 
 
 class MilvusParquetImporter:
@@ -35,6 +168,11 @@ class MilvusParquetImporter:
         embedding_api_key: str | None = None,
         embedding_api_base: str | None = None,
         max_text_length: int = 4000,
+        bulk_import: bool = False,
+        bulk_storage: BulkStorageConfig | None = None,
+        embedding_concurrency: int = DEFAULT_EMBEDDING_CONCURRENCY,
+        file_concurrency: int = 2,
+        embedding_cache_dir: str | None = None,
     ):
         """
         初始化导入器
@@ -45,6 +183,12 @@ class MilvusParquetImporter:
             embedding_model: 嵌入模型名称
             embedding_api_key: Qwen/DashScope API Key，必须由外部显式传入
             embedding_api_base: Qwen/DashScope API Base，可选
+            max_text_length: 生成嵌入时文本的最大字符数，超出部分截断（写入集合的原文不受影响）
+            bulk_import: 是否通过 BulkInsert（对象存储暂存 + do_bulk_insert）导入，适合首次全量导入
+            bulk_storage: BulkInsert 使用的对象存储配置，默认为 Milvus standalone 自带的 MinIO
+            embedding_concurrency: 同时在途的嵌入请求数量，各子批次并发请求、按原顺序合并
+            file_concurrency: import_directory 同时导入的文件数量（每个文件对应不同集合）
+            embedding_cache_dir: 嵌入磁盘缓存目录（SQLite），重复导入未变化的数据时直接复用已有嵌入
         
         注意：
         - 如果传入 None，会创建新的 MilvusCollectionManager，但不会建立连接，
@@ -67,8 +211,16 @@ class MilvusParquetImporter:
             api_base=embedding_api_base,
             model=self.embedding_model_name,
             name="milvus_parquet_importer",
+            concurrency=embedding_concurrency,
+            cache_dir=embedding_cache_dir,
         )
+        self.batch_size = batch_size  # 每次从 parquet 读取并写入的行数
         self.max_text_length = max_text_length  # 文本最大长度限制
+        self.bulk_import = bulk_import
+        self.file_concurrency = max(1, file_concurrency)
+        self.bulk_storage = bulk_storage or BulkStorageConfig()
+        # 每个线程复用一块嵌入结果缓冲区（import_directory 会在多个线程中并发导入文件）
+        self._buffers = threading.local()
 
         logger.info("初始化Parquet导入器")
         logger.info(
@@ -77,15 +229,45 @@ class MilvusParquetImporter:
             self.embedding_generator.dimension,
         )
         logger.info("文本最大长度限制: %s 字符", max_text_length)
+        logger.info("嵌入请求并发数: %s", self.embedding_generator.concurrency)
+        if bulk_import:
+            logger.info("启用 BulkInsert 导入，对象存储: %s", self.bulk_storage)
+    
+    def _embedding_buffer(self, count: int) -> np.ndarray:
+        """
+        返回当前线程可复用的 (count, dimension) 嵌入缓冲区视图
+
+        pymilvus 在 insert 返回前已将数据序列化到请求中，下一批即可覆盖同一块缓冲区。
+        """
+        buffer = getattr(self._buffers, "embeddings", None)
+        if buffer is None or len(buffer) < count:
+            generator = self.embedding_generator
+            buffer = np.empty((max(count, self.batch_size), generator.dimension), dtype=generator.dtype)
+            self._buffers.embeddings = buffer
+        return buffer[:count]
     
-    def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """生成文本的embedding向量"""
+    def _generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """生成文本的embedding向量，返回形状为 (len(texts), dimension) 的矩阵"""
         if not texts:
-            return []
+            return self.embedding_generator.zero_vectors(0)
 
-        clean_texts = [str(text).strip() if text else "空内容" for text in texts]
+        # 超过 max_text_length 的文本在清洗时一并截断，避免把超长内容整段发给嵌入接口
+        limit = self.max_text_length
+        clean_texts = [str(text).strip()[:limit] if text else "空内容" for text in texts]
+        # 重复文本（常见于实体/社区标题）只请求一次，再按下标散回原顺序
+        unique: Dict[str, int] = {}
+        order = [unique.setdefault(text, len(unique)) for text in clean_texts]
+        if len(unique) < len(clean_texts):
+            logger.debug(f"嵌入输入去重: {len(clean_texts)} -> {len(unique)} 条")
         try:
-            return self.embedding_generator.embed_batch(clean_texts)
+            if len(unique) == len(clean_texts):
+                return self.embedding_generator.embed_batch(
+                    clean_texts, out=self._embedding_buffer(len(clean_texts))
+                )
+            unique_vectors = self.embedding_generator.embed_batch(
+                list(unique), out=self._embedding_buffer(len(unique))
+            )
+            return unique_vectors[np.asarray(order)]
         except Exception as e:  # noqa: BLE001
             logger.error(f"生成embedding失败，返回零向量: {e}")
             return self.embedding_generator.zero_vectors(len(texts))
@@ -94,56 +276,59 @@ class MilvusParquetImporter:
         """智能分割长文本为多个块"""
         if len(text) <= max_length:
             return [text]
-        
-        chunks = []
-        current_chunk = ""
-        
+
+        chunks: List[str] = []
+        # 当前块的段落及累计长度（含段落间的 "\n\n"），只在落块时 join 一次
+        cur_parts: List[str] = []
+        cur_len = 0
+        window = max(1, max_length - 100)
+
         # 按段落分割
-        paragraphs = text.split('\n\n')
-        
-        for paragraph in paragraphs:
+        for paragraph in text.split("\n\n"):
             # 如果当前段落加上现有块仍在限制内
-            if len(current_chunk) + len(paragraph) + 2 <= max_length:
-                if current_chunk:
-                    current_chunk += '\n\n' + paragraph
-                else:
-                    current_chunk = paragraph
-            else:
-                # 如果当前块不为空，保存它
-                if current_chunk:
-                    chunks.append(current_chunk)
-                    current_chunk = ""
-                
-                # 如果段落本身就超过限制，需要进一步分割
-                if len(paragraph) > max_length:
-                    # 按句子分割
-                    sentences = paragraph.replace('。', '。\n').replace('！', '！\n').replace('？', '？\n').split('\n')
-                    temp_chunk = ""
-                    
-                    for sentence in sentences:
-                        if len(temp_chunk) + len(sentence) <= max_length:
-                            temp_chunk += sentence
-                        else:
-                            if temp_chunk:
-                                chunks.append(temp_chunk.strip())
-                            # 如果单个句子太长，强制分割
-                            if len(sentence) > max_length:
-                                for i in range(0, len(sentence), max_length - 100):
-                                    chunk_part = sentence[i:i + max_length - 100]
-                                    if chunk_part.strip():
-                                        chunks.append(chunk_part.strip())
-                            else:
-                                temp_chunk = sentence
-                    
-                    if temp_chunk.strip():
-                        current_chunk = temp_chunk.strip()
+            added = len(paragraph) + (2 if cur_parts else 0)
+            if cur_len + added <= max_length:
+                cur_parts.append(paragraph)
+                cur_len += added
+                continue
+
+            # 如果当前块不为空，保存它
+            if cur_parts:
+                chunks.append("\n\n".join(cur_parts))
+                cur_parts, cur_len = [], 0
+
+            if len(paragraph) <= max_length:
+                cur_parts, cur_len = [paragraph], len(paragraph)
+                continue
+
+            # 段落本身超过限制：按句子分割后贪心打包
+            sent_parts: List[str] = []
+            sent_len = 0
+            for sentence in _SENT_RE.split(paragraph):
+                if sent_len + len(sentence) <= max_length:
+                    sent_parts.append(sentence)
+                    sent_len += len(sentence)
+                    continue
+                if sent_parts:
+                    chunks.append("".join(sent_parts).strip())
+                    sent_parts, sent_len = [], 0
+                # 如果单个句子太长，按固定窗口强制分割
+                if len(sentence) > max_length:
+                    for part in re.findall(f".{{1,{window}}}", sentence, re.DOTALL):
+                        if part.strip():
+                            chunks.append(part.strip())
                 else:
-                    current_chunk = paragraph
-        
+                    sent_parts, sent_len = [sentence], len(sentence)
+
+            tail = "".join(sent_parts).strip()
+            if tail:
+                cur_parts, cur_len = [tail], len(tail)
+
         # 添加最后一个块
-        if current_chunk.strip():
-            chunks.append(current_chunk.strip())
-        
+        last = "\n\n".join(cur_parts).strip()
+        if last:
+            chunks.append(last)
+
         logger.info(f"长文本分割为 {len(chunks)} 个块")
         return chunks
     
@@ -167,14 +352,6 @@ class MilvusParquetImporter:
         注意：假设 Milvus 连接已由外部建立
         """
         try:
-            df = pd.read_parquet(parquet_file)
-            filename = os.path.basename(parquet_file)
-            logger.info(f"读取 {filename}: {df.shape}")
-            
-            if df.empty:
-                logger.warning("文件为空，跳过")
-                return True # 视为成功，因为没有数据要导入
-            
             # 如果需要，删除现有集合
             # 当前 MilvusCollectionManager 尚未提供单集合删除接口，这里仅记录日志，逻辑保持向后兼容。
             if drop_existing:
@@ -187,8 +364,10 @@ class MilvusParquetImporter:
                 logger.error(f"集合 '{collection_type}' 不存在，请先创建集合")
                 return False
             
-            # 导入数据
-            inserted_count = self._import_dataframe_to_collection(df, collection_type)
+            # 按批次流式导入数据
+            inserted_count, total_rows = self._import_file(parquet_file, collection_type)
+            if total_rows == 0:
+                return True # 视为成功，因为没有数据要导入
             return inserted_count > 0
             
         except Exception as e:
@@ -207,22 +386,93 @@ class MilvusParquetImporter:
             int: 导入的记录数量
         """
         try:
-            df = pd.read_parquet(file_path)
-            filename = os.path.basename(file_path)
-            logger.info(f"读取 {filename}: {df.shape}")
-            
-            if df.empty:
-                logger.warning("文件为空，跳过")
-                return 0
-            
-            # collection_type 参数是映射结果，但同时将原始文件名传递给 import_dataframe，
-            # 以便保持 API 一致性（直接调用 import_dataframe 时也仅依赖文件名判断集合）
-            return self.import_dataframe(df, filename, collection_type=collection_type)
-            
+            return self._import_file(file_path, collection_type)[0]
         except Exception as e:
             logger.error(f"导入文件失败: {e}")
             return 0
 
+    def _import_file(self, file_path: str, collection_type: str) -> Tuple[int, int]:
+        """
+        按批次流式导入单个文件，供 import_data 与 import_parquet_file 共用
+        
+        每批的插入异步提交，在其写入期间为下一批生成嵌入；同时至多一个插入在途。
+        整个文件结束（或出错）时只 flush 一次，批次之间不 flush。
+        
+        Returns:
+            (插入的记录数, 读取的行数)
+        """
+        filename = os.path.basename(file_path)
+        if not self.collection_manager.collection_exists(collection_type):
+            raise ValueError(f"集合 '{collection_type}' 不存在，请先创建集合")
+        collection = self.collection_manager.get_collection(collection_type)
+
+        if self.bulk_import:
+            inserted_count, total_rows = self._bulk_import_file(collection, collection_type, file_path)
+        else:
+            inserted_count, total_rows = self._insert_file(collection, collection_type, file_path)
+
+        if total_rows == 0:
+            logger.warning(f"{filename} 为空，跳过")
+        else:
+            logger.info(f"{filename}: 共读取 {total_rows} 行，插入 {inserted_count} 条")
+        return inserted_count, total_rows
+
+    def _insert_file(self, collection: Collection, collection_type: str, file_path: str) -> Tuple[int, int]:
+        """逐批异步 insert 导入单个文件，返回 (插入的记录数, 读取的行数)"""
+        inserted_count = 0
+        total_rows = 0
+        pending: Optional[Tuple[Any, int, float]] = None
+        submitted = False
+        try:
+            # 下一批的读取与解码在后台线程中与当前批的嵌入请求重叠进行
+            for batch in _prefetch(self._iter_parquet_batches(file_path, collection_type)):
+                total_rows += batch.num_rows
+                columns = self._prepare_records(batch, collection_type)
+                inserted_count += self._wait_insert(pending)
+                pending = self._submit_insert(collection, collection_type, columns) if columns else None
+                submitted = submitted or pending is not None
+            inserted_count += self._wait_insert(pending)
+            pending = None
+        finally:
+            self._wait_insert(pending)
+            if submitted:
+                collection.flush()
+        return inserted_count, total_rows
+
+    def _bulk_import_file(self, collection: Collection, collection_type: str, file_path: str) -> Tuple[int, int]:
+        """
+        通过 BulkInsert 导入单个文件，返回 (导入的记录数, 读取的行数)
+
+        文件的所有批次按列追加到同一个 RemoteBulkWriter，整个文件只 commit 一次并提交对应的任务，
+        全部任务完成后再创建向量索引。
+        """
+        writer = self._bulk_writer(collection, collection_type)
+        total_rows = 0
+        for batch in _prefetch(self._iter_parquet_batches(file_path, collection_type)):
+            total_rows += batch.num_rows
+            columns = self._prepare_records(batch, collection_type)
+            if columns:
+                self._append_bulk_columns(writer, columns)
+        return self._commit_bulk(writer, collection_type), total_rows
+
+    def _iter_parquet_batches(self, file_path: str, collection_type: str) -> Iterator[pa.RecordBatch]:
+        """
+        按 batch_size 行逐批读取 parquet，只读取目标集合需要的列
+        
+        峰值内存限制在一个批次内，且每批读取后即可开始生成嵌入和写入。
+        批次保持为 Arrow RecordBatch，不经过 pandas 转换。
+        """
+        parquet_file = pq.ParquetFile(file_path)
+        available = set(parquet_file.schema_arrow.names)
+        columns = [c for c in COLLECTION_SOURCE_COLUMNS.get(collection_type, []) if c in available]
+        logger.info(
+            f"读取 {os.path.basename(file_path)}: {parquet_file.metadata.num_rows} 行，列 {columns}"
+        )
+        if not columns:
+            return
+        for batch in parquet_file.iter_batches(batch_size=self.batch_size, columns=columns, use_threads=True):
+            yield batch
+
     def import_dataframe(self, df: pd.DataFrame, parquet_filename: str, collection_type: str | None = None) -> int:
         """
         直接将DataFrame内容导入Milvus集合
@@ -252,125 +502,114 @@ class MilvusParquetImporter:
             raise ValueError(f"集合 '{collection_type}' 不存在，请先创建集合")
         
         collection = self.collection_manager.get_collection(collection_type)
-        records = self._prepare_records(df, collection_type)
+        columns = self._prepare_records(df, collection_type)
         
-        if not records:
+        if not columns:
             logger.warning("没有有效数据可插入")
             return 0
         
-        inserted_count = self._insert_records(collection, collection_type, records)
+        inserted_count = self._insert_records(collection, collection_type, columns)
+        if inserted_count and not self.bulk_import:
+            collection.flush()
         logger.info(f"插入 {inserted_count} 条数据到 {collection_type}")
         return inserted_count
     
-    def _prepare_records(self, df: pd.DataFrame, collection_type: str) -> List[Dict[str, Any]]:
-        """准备数据记录并生成embedding"""
-        records = []
-        texts_to_embed = []
+    def _prepare_records(self, data: ArrowData | pd.DataFrame, collection_type: str) -> Dict[str, Any]:
+        """
+        准备各字段的列数据并生成embedding
         
-        for _, row in df.iterrows():
-            record = {"source_id": str(getattr(row, 'id', ''))}
-            
-            if collection_type == "relationship":
-                if hasattr(row, 'description'):
-                    desc_content = str(getattr(row, 'description', ''))
-                    record.update({"description": desc_content})
-                    records.append(record)
-                    texts_to_embed.append(desc_content)
-            
-            elif collection_type == "text_unit":
-                if hasattr(row, 'text'):
-                    text_content = str(getattr(row, 'text', ''))
-                    record.update({"text": text_content})
-                    records.append(record)
-                    texts_to_embed.append(text_content)
-            
-            elif collection_type == "entity_title":
-                if hasattr(row, 'title'):
-                    title_content = str(getattr(row, 'title', ''))
-                    record.update({"title": title_content})
-                    records.append(record)
-                    texts_to_embed.append(title_content)
-            
-            elif collection_type == "entity_description":
-                if hasattr(row, 'title'):
-                    title_content = str(getattr(row, 'title', ''))
-                    # 检查是否有description字段（entities.parquet）或summary字段（community_reports.parquet）
-                    desc_content = ""
-                    if hasattr(row, 'description'):
-                        desc_content = str(getattr(row, 'description', ''))
-                    elif hasattr(row, 'summary'):
-                        desc_content = str(getattr(row, 'summary', ''))
-                    
-                    combined_content = f"{title_content}:{desc_content}"
-                    record.update({
-                        "title": title_content,
-                        "description": desc_content,
-                        "title_description": combined_content
-                    })
-                    records.append(record)
-                    texts_to_embed.append(combined_content)
-            
-            elif collection_type == "community_title":
-                if hasattr(row, 'title'):
-                    title_content = str(getattr(row, 'title', ''))
-                    record.update({"title": title_content})
-                    records.append(record)
-                    texts_to_embed.append(title_content)
-            
-            elif collection_type == "community_summary":
-                if hasattr(row, 'summary'):
-                    summary_content = str(getattr(row, 'summary', ''))
-                    record.update({"summary": summary_content})
-                    records.append(record)
-                    texts_to_embed.append(summary_content)
-            
-            elif collection_type == "community_full_content":
-                if hasattr(row, 'full_content'):
-                    full_content = str(getattr(row, 'full_content', ''))
-                    record.update({"full_content": full_content})
-                    records.append(record)
-                    texts_to_embed.append(full_content)
+        Args:
+            data: 一批源数据（Arrow RecordBatch/Table；DataFrame 会先转换为 Arrow Table）
+            collection_type: 集合类型
         
-        # 批量生成embedding
-        if records and texts_to_embed:
-            logger.info(f"为{len(texts_to_embed)}条记录生成embedding向量...")
-            embeddings = self._generate_embeddings(texts_to_embed)
-            
-            # 将embedding添加到记录中
-            for i, record in enumerate(records):
-                if i < len(embeddings):
-                    record["embedding"] = embeddings[i]
-                else:
-                    record["embedding"] = self.embedding_generator.zero_vector()
+        Returns:
+            字段名 -> 列数据；标量字段为列表，"embedding" 为 (N, dimension) 矩阵。
+            没有可导入的数据时返回空字典。
+        """
+        builder = COLUMN_BUILDERS.get(collection_type)
+        if builder is None:
+            return {}
+        if isinstance(data, pd.DataFrame):
+            # 只转换构造器会读取的列，与导入无关的列（例如混合类型的对象列）不影响导入
+            needed = [c for c in COLLECTION_SOURCE_COLUMNS.get(collection_type, []) if c in data.columns]
+            data = pa.Table.from_pandas(data[needed], preserve_index=False)
+        columns, texts_to_embed = builder(data)
+        if not columns:
+            return {}
         
-        return records
+        # 批量生成embedding，整体保持为一块矩阵，插入时直接作为列数据
+        logger.info(f"为{len(texts_to_embed)}条记录生成embedding向量...")
+        columns["embedding"] = to_embedding_array(self._generate_embeddings(texts_to_embed))
+        return columns
     
-    def _insert_records(self, collection: Collection, collection_type: str, records: List[Dict[str, Any]]) -> int:
-        """插入记录到集合"""
-        field_mapping = {
-            "relationship": ["source_id", "description", "embedding"],
-            "text_unit": ["source_id", "text", "embedding"],
-            "entity_title": ["source_id", "title", "embedding"],
-            "entity_description": ["source_id", "title", "description", "title_description", "embedding"],
-            "community_title": ["source_id", "title", "embedding"],
-            "community_summary": ["source_id", "summary", "embedding"],
-            "community_full_content": ["source_id", "full_content", "embedding"]
-        }
+    def _insert_records(self, collection: Collection, collection_type: str, columns: Dict[str, Any]) -> int:
+        """
+        插入记录到集合（不 flush，由调用方在全部批次写入后统一 flush）
         
-        field_names = field_mapping[collection_type]
-        insert_data = []
+        以列式数据（每个字段一列，embedding 为整块矩阵）插入，省去 pymilvus 按行转换的开销。
+        """
+        if self.bulk_import:
+            writer = self._bulk_writer(collection, collection_type)
+            self._append_bulk_columns(writer, columns)
+            return self._commit_bulk(writer, collection_type)
         
-        for field in field_names:
-            field_values = [item.get(field) for item in records]
-            insert_data.append(field_values)
+        return self._wait_insert(self._submit_insert(collection, collection_type, columns))
+    
+    def _submit_insert(
+        self, collection: Collection, collection_type: str, columns: Dict[str, Any]
+    ) -> Optional[Tuple[Any, int, float]]:
+        """
+        异步提交列式插入
         
+        Returns:
+            (MutationFuture, 行数, 提交时刻)；提交失败时返回 None
+        """
+        data = [columns[field] for field in INSERT_FIELD_NAMES[collection_type]]
         try:
-            mr = collection.insert(insert_data)
-            collection.flush()
-            return len(records)
-            
-        except Exception as e:
+            started = time.perf_counter()
+            return collection.insert(data, _async=True), len(columns["source_id"]), started
+        except Exception as e:  # noqa: BLE001
             logger.error(f"插入失败: {e}")
+            return None
+    
+    @staticmethod
+    def _wait_insert(pending: Optional[Tuple[Any, int, float]]) -> int:
+        """等待异步插入完成，返回成功插入的行数；每批的插入耗时记录在 debug 日志中，便于调节 batch_size"""
+        if pending is None:
+            return 0
+        future, count, started = pending
+        try:
+            future.result()
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"插入失败: {e}")
+            return 0
+        logger.debug("插入 %s 行耗时 %.1f ms", count, (time.perf_counter() - started) * 1000)
+        return count
+    
+    def _bulk_writer(self, collection: Collection, collection_type: str) -> BulkInsertWriter:
+        """创建写入目标集合的 BulkInsertWriter"""
+        return BulkInsertWriter(
+            collection,
+            INSERT_FIELD_NAMES[collection_type],
+            self.bulk_storage,
+            using=self.collection_manager.connection_alias(),
+        )
+    
+    @staticmethod
+    def _append_bulk_columns(writer: BulkInsertWriter, columns: Dict[str, Any]) -> None:
+        """追加一批列数据；嵌入矩阵位于按线程复用的缓冲区中，writer 在 commit 前会一直引用，先复制一份"""
+        columns["embedding"] = columns["embedding"].copy()
+        writer.append_columns(columns)
+    
+    def _commit_bulk(self, writer: BulkInsertWriter, collection_type: str) -> int:
+        """提交 BulkInsert 任务并等待完成，全部导入后再统一创建向量索引"""
+        try:
+            count = writer.commit()
+            if count:
+                self.collection_manager.ensure_index(collection_type)
+            return count
+        except Exception as e:
+            logger.error(f"BulkInsert 导入失败: {e}")
             return 0
     
     def import_directory(self, directory_path: str) -> Dict[str, int]:
@@ -383,6 +622,21 @@ class MilvusParquetImporter:
         Returns:
             Dict[str, int]: 文件名到导入记录数的映射
         """
+        # 一次 scandir 同时拿到文件类型与大小，无需逐个文件额外 stat
+        with os.scandir(directory_path) as it:
+            entries = [entry for entry in it if entry.name.endswith('.parquet') and entry.is_file()]
+        return self.import_files(entries)
+    
+    def import_files(self, files: Iterable[Union[str, os.DirEntry]]) -> Dict[str, int]:
+        """
+        导入一组parquet文件，文件名需与 PARQUET_MAPPING 中的映射一致
+        
+        Args:
+            files: 文件路径或 os.scandir 得到的目录项；传入目录项时直接复用其缓存的文件大小
+            
+        Returns:
+            Dict[str, int]: 文件名到导入记录数的映射（按文件名排序）
+        """
         results = {}
         
         # 确保连接到Milvus（连接应由上层 MilvusClient 或调用方统一管理）
@@ -392,19 +646,43 @@ class MilvusParquetImporter:
                 "或手动调用 collection_manager.connect(host, port) 建立连接。"
             )
         
-        for filename in os.listdir(directory_path):
-            if filename.endswith('.parquet'):
-                file_path = os.path.join(directory_path, filename)
-                collection_type = PARQUET_MAPPING.get(filename)
-                
-                if collection_type:
-                    count = self.import_parquet_file(file_path, collection_type)
-                    results[filename] = count
-                else:
-                    logger.warning(f"跳过文件 {filename} (无映射配置)")
+        tasks: List[Tuple[str, str, str, int]] = []
+        for file in files:
+            file_path = os.fspath(file)
+            filename = os.path.basename(file_path)
+            collection_type = PARQUET_MAPPING.get(filename)
+            if not collection_type:
+                logger.warning(f"跳过文件 {filename} (无映射配置)")
+                continue
+            size = file.stat().st_size if isinstance(file, os.DirEntry) else os.stat(file_path).st_size
+            if size == 0:
+                logger.warning(f"跳过空文件 {filename}")
+                continue
+            tasks.append((filename, file_path, collection_type, size))
+        tasks.sort()
+        
+        # 各文件写入不同集合，互不依赖，并发导入以重叠文件读取、嵌入请求与写入
+        workers = min(self.file_concurrency, len(tasks))
+        if workers <= 1:
+            for filename, file_path, collection_type, _ in tasks:
+                results[filename] = self.import_parquet_file(file_path, collection_type)
+            return results
         
-        return results
+        # 大文件先提交，避免最大的文件最后才开始而拖长整体耗时
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.import_parquet_file, file_path, collection_type): filename
+                for filename, file_path, collection_type, _ in sorted(tasks, key=lambda t: t[3], reverse=True)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        # 按文件名顺序返回结果
+        return {filename: results[filename] for filename, _, _, _ in tasks}
 
+    def close(self) -> None:
+        """关闭嵌入生成器持有的 HTTP 连接池与磁盘缓存（导入结束后调用）"""
+        self.embedding_generator.close()
 
 def main():
     """主函数 - 用于测试导入功能（通过统一的 MilvusClient）"""
@@ -443,7 +721,10 @@ def main():
             return False
 
         print(f"📂 从目录导入数据: {parquet_dir}")
-        results = importer.import_directory(parquet_dir)
+        try:
+            results = importer.import_directory(parquet_dir)
+        finally:
+            importer.close()
 
         # 输出结果
         print("\n📊 导入结果:")
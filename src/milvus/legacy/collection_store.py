@@ -3,102 +3,387 @@ Milvus 集合存储模块
 负责将已生成的嵌入数据写入/更新/删除到指定集合
 """
 
-from typing import Dict, List, Any, Optional
+import asyncio
+import threading
+from functools import lru_cache, partial
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 import pandas as pd
 from pymilvus import Collection
 import logging
 
+from ..core.bulk_import import BulkStorageConfig, bulk_insert_records
+from ..core.schema import INSERT_FIELD_NAMES, RECORD_SPECS, RecordSpec, to_embedding_array
+
 logger = logging.getLogger(__name__)
 
+# 待写入的数据：记录列表，或列名与字段名一致的 DataFrame
+InsertData = Union[List[Dict[str, Any]], pd.DataFrame]
+# 按 schema 顺序排列的写入字段
+FieldNames = Tuple[str, ...]
+# 集合类型 -> 写入字段，与 Parquet 导入器共用同一份由 schema 推导的只读映射
+FIELD_MAPPING = INSERT_FIELD_NAMES
+
+# 单次 insert 请求的最大行数，限制客户端峰值内存与 gRPC 消息大小
+DEFAULT_INSERT_BATCH_SIZE = 5000
+# 异步写入时同时在途的 insert 请求数量
+DEFAULT_INSERT_CONCURRENCY = 8
+# 按 source_id 删除时单个 in 表达式包含的 ID 数量上限
+DELETE_BATCH_SIZE = 512
+# 配置 bulk_storage 时，达到该行数的 DataFrame 写入改走 BulkInsert
+BULK_INSERT_THRESHOLD = 100_000
+# 合并单条写入时一次 insert 携带的最大行数
+COALESCE_MAX_ROWS = 256
+
+
+def _in_template(field: str) -> str:
+    """字段的 in 过滤模板，取值通过 expr_params 传入，表达式形状与取值无关"""
+    return f"{field} in {{values}}"
+
+
+@lru_cache(maxsize=None)
+def _row_getter(field_names: FieldNames) -> Callable[[Dict[str, Any]], Tuple[Any, ...]]:
+    """按字段元组缓存取值函数，每种字段组合只构造一次 itemgetter"""
+    return itemgetter(*field_names)
+
+
+def _slice_rows(data: InsertData, start: int, stop: int) -> InsertData:
+    """按行位置切片记录列表或 DataFrame"""
+    return data.iloc[start:stop] if isinstance(data, pd.DataFrame) else data[start:stop]
+
+
+def _with_combined_field(spec: RecordSpec, data: InsertData) -> pd.DataFrame:
+    """整列计算组合字段，输入字段缺失或为空值时按空字符串处理；不修改调用方的数据"""
+    frame = pd.DataFrame.from_records(data) if not isinstance(data, pd.DataFrame) else data
+    inputs = [
+        frame[field].fillna("").astype(str) if field in frame.columns else "" for field in spec.source_fields
+    ]
+    return frame.assign(
+        **dict(zip(spec.source_fields, inputs)),
+        **{spec.text_field: spec.combine(*inputs)},
+    )
+
+
+class _InsertCoalescer:
+    """
+    合并并发的单条写入（group commit）
+
+    同一集合同一时刻只有一个线程执行 insert，其执行期间到达的记录在队列中等待，
+    由下一个执行者合并为一次 insert 写入；无并发时直接写入，不引入额外等待。
+    """
+
+    def __init__(
+        self,
+        collection_type: str,
+        insert: Callable[..., Any],
+        field_names: FieldNames,
+        max_rows: int = COALESCE_MAX_ROWS,
+    ):
+        self._collection_type = collection_type
+        self._insert = insert
+        self._field_names = field_names
+        self.max_rows = max(1, max_rows)
+        self._pending: List[Tuple[Tuple[Any, ...], "_PendingRecord"]] = []
+        self._queue_lock = threading.Lock()
+        self._insert_lock = threading.Lock()
+        # 列缓冲在持有 _insert_lock 时复用：标量列原地替换内容，embedding 列每批替换为新矩阵
+        self._getter = _row_getter(field_names)
+        self._columns: List[Any] = [[] for _ in field_names]
+        self._embedding_index = field_names.index("embedding")
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """提交一条记录，阻塞直到包含该记录的 insert 完成；写入失败时抛出对应异常"""
+        # 入队前逐条校验字段，缺字段只影响本次调用，不会连累同批合并写入的其他记录
+        try:
+            row = self._getter(record)
+        except KeyError as e:
+            raise ValueError(f"写入 '{self._collection_type}' 的记录缺少字段: {e}") from e
+        item = _PendingRecord()
+        with self._queue_lock:
+            self._pending.append((row, item))
+
+        while not item.done:
+            with self._insert_lock:
+                # 等锁期间上一个执行者可能已经写入了本条记录
+                if item.done:
+                    break
+                with self._queue_lock:
+                    batch = self._pending[: self.max_rows]
+                    del self._pending[: self.max_rows]
+                self._run(batch)
+
+        if item.error is not None:
+            raise item.error
+
+    def _run(self, batch: List[Tuple[Tuple[Any, ...], "_PendingRecord"]]) -> None:
+        error: Optional[BaseException] = None
+        try:
+            self._insert(self._fill_columns(batch))
+            if len(batch) > 1:
+                logger.debug("合并 %d 条单条写入为一次 insert", len(batch))
+        except Exception as e:  # noqa: BLE001
+            error = e
+        for _, item in batch:
+            item.error = error
+            item.done = True
+
+    def _fill_columns(self, batch: List[Tuple[Tuple[Any, ...], "_PendingRecord"]]) -> List[Any]:
+        """将本批已取出字段值的记录写入复用的列缓冲，避免每次写入重新分配外层与各字段列表"""
+        columns = self._columns
+        for index, values in enumerate(zip(*(row for row, _ in batch))):
+            if index == self._embedding_index:
+                columns[index] = to_embedding_array(values)
+            else:
+                columns[index][:] = values
+        return columns
+
+
+class _PendingRecord:
+    """等待合并写入的单条记录状态"""
+
+    __slots__ = ("done", "error")
+
+    def __init__(self) -> None:
+        self.done = False
+        self.error: Optional[BaseException] = None
+
 
 class MilvusCollectionStore:
     """Milvus 集合级存储包装，封装常用 CRUD 操作"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        insert_batch_size: int = DEFAULT_INSERT_BATCH_SIZE,
+        insert_concurrency: int = DEFAULT_INSERT_CONCURRENCY,
+        bulk_storage: Optional[BulkStorageConfig] = None,
+        bulk_threshold: int = BULK_INSERT_THRESHOLD,
+        connection_alias: Optional[Callable[[], str]] = None,
+    ):
         self.collections = {}
+        self._inserters: Dict[str, Callable[..., Any]] = {}
+        self._deleters: Dict[str, Callable[..., Any]] = {}
+        # 大批量写入按该行数拆分为多次 insert；异步接口中各批次最多 insert_concurrency 个并发在途
+        self.insert_batch_size = max(1, insert_batch_size)
+        self.insert_concurrency = max(1, insert_concurrency)
+        # 未配置对象存储时不启用 BulkInsert
+        self.bulk_storage = bulk_storage
+        self.bulk_threshold = bulk_threshold
+        # 提交 BulkInsert 任务使用的连接 alias（通常为 collection_manager.connection_alias），
+        # 未提供时使用 pymilvus 的 "default" 连接
+        self._connection_alias: Callable[[], str] = connection_alias or (lambda: "default")
+        # 自上次 flush 以来有写入/删除的集合类型，flush_all 只处理这些集合
+        self._dirty: set = set()
+        # 各集合的单条写入合并器，随 set_collection 重建
+        self._coalescers: Dict[str, _InsertCoalescer] = {}
+        self._coalescers_lock = threading.Lock()
     
     def set_collection(self, collection_type: str, collection: Collection) -> None:
-        """设置集合实例"""
+        """设置集合实例，同时缓存其 insert/delete 绑定方法供写入路径直接调用"""
         self.collections[collection_type] = collection
+        self._inserters[collection_type] = collection.insert
+        self._deleters[collection_type] = collection.delete
+        self._coalescers.pop(collection_type, None)
     
     def get_collection(self, collection_type: str) -> Collection:
         """获取集合实例"""
-        if collection_type not in self.collections:
-            raise ValueError(f"集合类型 '{collection_type}' 未初始化")
-        return self.collections[collection_type]
+        try:
+            return self.collections[collection_type]
+        except KeyError:
+            raise ValueError(f"集合类型 '{collection_type}' 未初始化") from None
+    
+    def _inserter(self, collection_type: str) -> Callable[..., Any]:
+        """获取集合的 insert 绑定方法"""
+        try:
+            return self._inserters[collection_type]
+        except KeyError:
+            raise ValueError(f"集合类型 '{collection_type}' 未初始化") from None
+    
+    def _coalescer(self, collection_type: str) -> _InsertCoalescer:
+        """获取（必要时创建）集合的单条写入合并器"""
+        try:
+            return self._coalescers[collection_type]
+        except KeyError:
+            pass
+        insert = self._inserter(collection_type)
+        with self._coalescers_lock:
+            coalescer = self._coalescers.get(collection_type)
+            if coalescer is None:
+                coalescer = _InsertCoalescer(collection_type, insert, FIELD_MAPPING[collection_type])
+                self._coalescers[collection_type] = coalescer
+            return coalescer
+    
+    def _deleter(self, collection_type: str) -> Callable[..., Any]:
+        """获取集合的 delete 绑定方法"""
+        try:
+            return self._deleters[collection_type]
+        except KeyError:
+            raise ValueError(f"集合类型 '{collection_type}' 未初始化") from None
+    
+    def flush(self, collection_type: Optional[str] = None) -> None:
+        """
+        将写入/删除持久化为 sealed segment
+
+        写入与删除方法不再逐次 flush（flush 开销大，且会产生大量小 segment），
+        需要立即落盘时在一批写入结束后调用一次。
+
+        Args:
+            collection_type: 需要 flush 的集合类型，为 None 时 flush 所有有过写入的集合
+        """
+        if collection_type is None:
+            self.flush_all()
+            return
+        self.get_collection(collection_type).flush()
+        self._dirty.discard(collection_type)
+    
+    def flush_all(self) -> None:
+        """flush 自上次 flush 以来有过写入或删除的所有集合"""
+        for collection_type in sorted(self._dirty):
+            self.get_collection(collection_type).flush()
+            logger.info(f"flush '{collection_type}' 集合")
+        self._dirty.clear()
+    
+    async def insert(self, collection_type: str, data: InsertData) -> List[int]:
+        """
+        按集合类型插入记录列表或 DataFrame，各 insert_* 方法的统一实现
+
+        组合字段（如 entity_description 的 title_description）按 RECORD_SPECS 整列计算。
+        """
+        try:
+            field_names = FIELD_MAPPING[collection_type]
+        except KeyError:
+            raise ValueError(f"不支持的集合类型: {collection_type}") from None
+        if len(data) == 0:
+            return []
+        spec = RECORD_SPECS[collection_type]
+        if spec.combine is not None:
+            data = _with_combined_field(spec, data)
+        return await self._ainsert_data(collection_type, data, field_names)
     
     async def insert_documents(self, documents: List[Dict[str, Any]]) -> List[int]:
         """插入文档数据"""
-        return self._insert_data("document", documents, ["source_id", "text", "embedding"])
+        return await self.insert("document", documents)
     
     async def insert_relationships(self, relationships: List[Dict[str, Any]]) -> List[int]:
         """插入关系数据"""
-        return self._insert_data("relationship", relationships, ["source_id", "description", "embedding"])
+        return await self.insert("relationship", relationships)
     
     async def insert_text_units(self, text_units: List[Dict[str, Any]]) -> List[int]:
         """插入文本单元数据"""
-        return self._insert_data("text_unit", text_units, ["source_id", "text", "embedding"])
+        return await self.insert("text_unit", text_units)
     
     async def insert_entity_titles(self, entities: List[Dict[str, Any]]) -> List[int]:
         """插入实体标题数据"""
-        return self._insert_data("entity_title", entities, ["source_id", "title", "embedding"])
+        return await self.insert("entity_title", entities)
     
     async def insert_entity_descriptions(self, entities: List[Dict[str, Any]]) -> List[int]:
-        """插入实体描述数据"""
-        # 预处理数据，组合title和description
-        processed_data = []
-        for entity in entities:
-            processed = entity.copy()
-            processed["title_description"] = f"{entity.get('title', '')}:{entity.get('description', '')}"
-            processed_data.append(processed)
-        
-        return self._insert_data("entity_description", processed_data, 
-                               ["source_id", "title", "description", "title_description", "embedding"])
+        """插入实体描述数据（title_description 由 title 与 description 拼接）"""
+        return await self.insert("entity_description", entities)
     
     async def insert_community_titles(self, communities: List[Dict[str, Any]]) -> List[int]:
         """插入社区标题数据"""
-        return self._insert_data("community_title", communities, ["source_id", "title", "embedding"])
+        return await self.insert("community_title", communities)
     
     async def insert_community_summaries(self, communities: List[Dict[str, Any]]) -> List[int]:
         """插入社区摘要数据"""
-        return self._insert_data("community_summary", communities, ["source_id", "summary", "embedding"])
+        return await self.insert("community_summary", communities)
     
     async def insert_community_full_contents(self, communities: List[Dict[str, Any]]) -> List[int]:
         """插入社区完整内容数据"""
-        return self._insert_data("community_full_content", communities, ["source_id", "full_content", "embedding"])
+        return await self.insert("community_full_content", communities)
     
-    def _insert_data(self, collection_type: str, data: List[Dict[str, Any]], 
-                    field_names: List[str]) -> List[int]:
-        """通用数据插入方法"""
-        if not data:
+    def _insert_data(self, collection_type: str, data: InsertData, 
+                    field_names: FieldNames) -> List[int]:
+        """通用数据插入方法，data 为记录列表或 DataFrame"""
+        if len(data) == 0:
             return []
         
-        collection = self.get_collection(collection_type)
-        
-        # 准备插入数据
-        insert_data = []
-        for field in field_names:
-            field_values = [item.get(field) for item in data]
-            insert_data.append(field_values)
+        insert = self._inserter(collection_type)
         
-        # 插入数据
+        # 按 insert_batch_size 分批写入，每批单独转置，峰值内存只与批大小有关
+        primary_keys: List[int] = []
         try:
-            mr = collection.insert(insert_data)
-            collection.flush()
+            for start in range(0, len(data), self.insert_batch_size):
+                batch = _slice_rows(data, start, start + self.insert_batch_size)
+                mr = insert(self._build_columns(collection_type, batch, field_names))
+                self._dirty.add(collection_type)
+                primary_keys.extend(mr.primary_keys)
             
             logger.info(f"向 '{collection_type}' 集合插入 {len(data)} 条数据成功")
-            return mr.primary_keys
+            return primary_keys
             
         except Exception as e:
             logger.error(f"插入数据到 '{collection_type}' 失败: {e}")
             raise
     
+    async def _ainsert_data(self, collection_type: str, data: InsertData,
+                            field_names: FieldNames) -> List[int]:
+        """
+        _insert_data 的异步版本
+
+        各批次的转置与 insert 在线程池中执行（pymilvus 同步客户端在 gRPC 调用期间释放 GIL），
+        通过信号量限制同时在途的请求数，主键按批次顺序合并。
+        """
+        if len(data) == 0:
+            return []
+        
+        insert = self._inserter(collection_type)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.insert_concurrency)
+        
+        def _insert(batch: InsertData) -> List[int]:
+            return insert(self._build_columns(collection_type, batch, field_names)).primary_keys
+        
+        async def _run(batch: InsertData) -> List[int]:
+            async with semaphore:
+                keys = await loop.run_in_executor(None, _insert, batch)
+            self._dirty.add(collection_type)
+            return keys
+        
+        batches = [
+            _slice_rows(data, start, start + self.insert_batch_size)
+            for start in range(0, len(data), self.insert_batch_size)
+        ]
+        try:
+            results = await asyncio.gather(*(_run(batch) for batch in batches))
+        except Exception as e:
+            logger.error(f"插入数据到 '{collection_type}' 失败: {e}")
+            raise
+        
+        logger.info(f"向 '{collection_type}' 集合插入 {len(data)} 条数据成功")
+        return [key for keys in results for key in keys]
+    
+    @staticmethod
+    def _build_columns(collection_type: str, data: InsertData, field_names: FieldNames) -> List[Any]:
+        """
+        将记录转置为列式插入数据
+
+        DataFrame 直接按列取值；记录列表通过 itemgetter + zip 在 C 层一次完成转置，避免逐字段逐条 dict.get。
+        embedding 列转换为一块连续 ndarray，以二进制向量写入；记录中的向量为 ndarray 时无需逐个 float 转换。
+        """
+        try:
+            if isinstance(data, pd.DataFrame):
+                columns = [
+                    data[field].to_numpy() if field == "embedding" else data[field].tolist()
+                    for field in field_names
+                ]
+            else:
+                columns = list(zip(*map(_row_getter(tuple(field_names)), data)))
+        except KeyError as e:
+            raise ValueError(f"写入 '{collection_type}' 的记录缺少字段: {e}") from e
+        return [
+            to_embedding_array(values) if field == "embedding" else list(values)
+            for field, values in zip(field_names, columns)
+        ]
+    
     async def batch_insert_from_dataframe(self, collection_type: str, 
                                         df: pd.DataFrame, 
                                         embedding_field: str = "embedding") -> List[int]:
         """
         从DataFrame批量插入数据
         
+        配置了 bulk_storage 且行数达到 bulk_threshold 时改走 BulkInsert（对象存储暂存 +
+        do_bulk_insert），绕过流式写入路径；BulkInsert 不返回主键，此时返回空列表。
+        
         Args:
             collection_type: 集合类型
             df: 包含数据的DataFrame
@@ -107,87 +392,89 @@ class MilvusCollectionStore:
         if df is None or df.empty:
             return []
         
-        collection = self.get_collection(collection_type)
+        try:
+            spec = RECORD_SPECS[collection_type]
+        except KeyError:
+            raise ValueError(f"不支持的集合类型: {collection_type}") from None
         
-        # 根据集合类型准备数据
-        if collection_type == "document":
-            data = df[["id", "text", embedding_field]].rename(columns={"id": "source_id"})
-            field_names = ["source_id", "text", "embedding"]
-            
-        elif collection_type == "relationship":
-            data = df[["id", "description", embedding_field]].rename(columns={"id": "source_id"})
-            field_names = ["source_id", "description", "embedding"]
-            
-        elif collection_type == "text_unit":
-            data = df[["id", "text", embedding_field]].rename(columns={"id": "source_id"})
-            field_names = ["source_id", "text", "embedding"]
-            
-        elif collection_type == "entity_title":
-            data = df[["id", "title", embedding_field]].rename(columns={"id": "source_id"})
-            field_names = ["source_id", "title", "embedding"]
-            
-        elif collection_type == "entity_description":
-            # 需要组合title和description
-            data = df.copy()
-            data["source_id"] = data["id"]
-            data["title_description"] = data["title"] + ":" + data["description"]
-            field_names = ["source_id", "title", "description", "title_description", "embedding"]
-            
-        elif collection_type == "community_title":
-            data = df[["id", "title", embedding_field]].rename(columns={"id": "source_id"})
-            field_names = ["source_id", "title", "embedding"]
-            
-        elif collection_type == "community_summary":
-            data = df[["id", "summary", embedding_field]].rename(columns={"id": "source_id"})
-            field_names = ["source_id", "summary", "embedding"]
-            
-        elif collection_type == "community_full_content":
-            data = df[["id", "full_content", embedding_field]].rename(columns={"id": "source_id"})
-            field_names = ["source_id", "full_content", "embedding"]
-            
-        else:
-            raise ValueError(f"不支持的集合类型: {collection_type}")
+        # 只取需要的列并统一列名；组合字段（如 title_description）整列计算
+        data = df[["id", *spec.source_fields, embedding_field]].rename(
+            columns={"id": "source_id", embedding_field: "embedding"}
+        )
+        if spec.combine is not None:
+            data = _with_combined_field(spec, data)
+        
+        if self.bulk_storage is not None and len(data) >= self.bulk_threshold:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._bulk_insert, collection_type, data)
+            return []
         
-        # 转换为字典列表格式
-        records = data.to_dict('records')
-        return self._insert_data(collection_type, records, field_names)
+        # 直接按列写入，不经过 to_dict('records') 再转置回列
+        return await self._ainsert_data(collection_type, data, FIELD_MAPPING[collection_type])
+    
+    def _bulk_insert(self, collection_type: str, data: pd.DataFrame) -> int:
+        """通过 BulkInsert 导入 DataFrame，等待服务端任务完成后返回导入行数"""
+        collection = self.get_collection(collection_type)
+        field_names = FIELD_MAPPING[collection_type]
+        records = data[list(field_names)].to_dict("records")
+        count = bulk_insert_records(
+            collection,
+            field_names,
+            records,
+            self.bulk_storage,
+            using=self._connection_alias(),
+        )
+        logger.info(f"通过 BulkInsert 向 '{collection_type}' 集合导入 {count} 条数据")
+        return count
     
     async def delete_by_source_ids(self, collection_type: str, source_ids: List[str]) -> int:
-        """根据源ID删除数据"""
+        """
+        根据源ID删除数据
+
+        source_id 按 DELETE_BATCH_SIZE 分组，每组一个 in 表达式，限制单个表达式的长度；
+        各组删除在线程池中并发执行（最多 insert_concurrency 个在途）。
+        """
         if not source_ids:
             return 0
         
-        collection = self.get_collection(collection_type)
+        delete = self._deleter(collection_type)
+        expr = _in_template("source_id")
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.insert_concurrency)
         
-        # 构建删除表达式
-        ids_str = ", ".join([f"'{id}'" for id in source_ids])
-        expr = f"source_id in [{ids_str}]"
+        async def _run(batch: List[str]) -> int:
+            run = partial(delete, expr, expr_params={"values": batch})
+            async with semaphore:
+                result = await loop.run_in_executor(None, run)
+            self._dirty.add(collection_type)
+            return result.delete_count
         
         try:
-            result = collection.delete(expr)
-            collection.flush()
-            
-            logger.info(f"从 '{collection_type}' 集合删除 {len(source_ids)} 条数据")
-            return result.delete_count
-            
+            counts = await asyncio.gather(
+                *(
+                    _run(source_ids[start:start + DELETE_BATCH_SIZE])
+                    for start in range(0, len(source_ids), DELETE_BATCH_SIZE)
+                )
+            )
         except Exception as e:
             logger.error(f"删除数据失败: {e}")
             raise
+        
+        logger.info(f"从 '{collection_type}' 集合删除 {len(source_ids)} 条数据")
+        return sum(counts)
     
     async def clear_collection(self, collection_type: str) -> None:
         """清空集合数据"""
         collection = self.get_collection(collection_type)
         
-        # 查询所有数据并删除
+        # 以主键上的恒真条件一次删除全部数据，不再先把所有 source_id 查询到客户端再回传
+        # （集合主键均为 auto_id 生成的正整数）
+        pk_field = collection.schema.primary_field.name
         try:
-            results = collection.query(expr="", output_fields=["source_id"])
-            source_ids = [str(item["source_id"]) for item in results]
-            
-            if source_ids:
-                await self.delete_by_source_ids(collection_type, source_ids)
-                logger.info(f"清空 '{collection_type}' 集合完成")
-            else:
-                logger.info(f"'{collection_type}' 集合已为空")
+            result = collection.delete(expr=f"{pk_field} >= 0")
+            self._dirty.add(collection_type)
+            self.flush(collection_type)
+            logger.info(f"清空 '{collection_type}' 集合完成，删除 {getattr(result, 'delete_count', 0)} 条数据")
                 
         except Exception as e:
             logger.error(f"清空集合失败: {e}")
@@ -199,24 +486,22 @@ class MilvusCollectionStore:
         """
         根据任意字段删除记录（同步方法）。
 
+        取值以 expr_params 模板参数传入，无需转义，且同一字段的删除表达式保持不变。
+
         Args:
             collection_type: 集合类型，例如 "text_unit"、"entity_title" 等
             field: 字段名，例如 "source_id"、"title"
-            value: 字段值
+            value: 字段值，也可以是多个取值的列表/元组
 
         Returns:
             int: 删除的记录数量
         """
-        collection = self.get_collection(collection_type)
-
-        if isinstance(value, str):
-            expr = f"{field} == '{value}'"
-        else:
-            expr = f"{field} == {value}"
+        delete = self._deleter(collection_type)
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
 
         try:
-            result = collection.delete(expr)
-            collection.flush()
+            result = delete(_in_template(field), expr_params={"values": values})
+            self._dirty.add(collection_type)
             delete_count = getattr(result, "delete_count", 0)
             logger.info(
                 "从 '%s' 集合删除记录: field=%s, value=%r, count=%s",
@@ -230,6 +515,19 @@ class MilvusCollectionStore:
             logger.error("根据字段删除记录失败: %s", e)
             raise
 
+    def insert_records(self, collection_type: str, records: List[Dict[str, Any]]) -> int:
+        """
+        向指定集合批量插入记录（同步方法），每条记录应包含所有业务字段和 embedding。
+
+        按 insert_batch_size 分批写入，字段映射规则与 insert_single_record 相同。
+
+        Returns:
+            int: 插入的记录数量
+        """
+        if collection_type not in FIELD_MAPPING:
+            raise ValueError(f"不支持的集合类型: {collection_type}")
+        return len(self._insert_data(collection_type, records, FIELD_MAPPING[collection_type]))
+
     def insert_single_record(self, collection_type: str, record: Dict[str, Any]) -> int:
         """
         向指定集合插入一条记录（同步方法），record 中应包含所有业务字段和 embedding。
@@ -241,31 +539,17 @@ class MilvusCollectionStore:
         - entity_description: ["source_id", "title", "description", "title_description", "embedding"]
         - community_summary: ["source_id", "summary", "embedding"]
         - community_full_content: ["source_id", "full_content", "embedding"]
+
+        并发调用时，同一集合上一次 insert 在途期间到达的记录会合并为下一次 insert。
         """
-        field_mapping: Dict[str, List[str]] = {
-            "relationship": ["source_id", "description", "embedding"],
-            "text_unit": ["source_id", "text", "embedding"],
-            "document": ["source_id", "text", "embedding"],
-            "entity_title": ["source_id", "title", "embedding"],
-            "entity_description": ["source_id", "title", "description", "title_description", "embedding"],
-            "community_title": ["source_id", "title", "embedding"],
-            "community_summary": ["source_id", "summary", "embedding"],
-            "community_full_content": ["source_id", "full_content", "embedding"],
-        }
-
-        if collection_type not in field_mapping:
+        if collection_type not in FIELD_MAPPING:
             raise ValueError(f"不支持的集合类型: {collection_type}")
 
-        collection = self.get_collection(collection_type)
-        fields = field_mapping[collection_type]
-
-        insert_data: List[List[Any]] = []
-        for field in fields:
-            insert_data.append([record.get(field)])
+        coalescer = self._coalescer(collection_type)
 
         try:
-            collection.insert(insert_data)
-            collection.flush()
+            coalescer.submit(record)
+            self._dirty.add(collection_type)
             logger.info(
                 "向 '%s' 集合插入 1 条记录，source_id=%s",
                 collection_type,
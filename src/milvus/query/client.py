@@ -7,18 +7,36 @@ Milvus 客户端模块
 from typing import Dict, List, Any, Optional, Tuple
 import logging
 
+import numpy as np
+
 from ..core.config import get_milvus_config
 from ..core.collection_manager import (
     MilvusCollectionManager,
     COLLECTION_TYPES,
     DEFAULT_COLLECTION_PREFIX,
 )
+from ..core.schema import RECORD_SPECS
 from .query_manager import MilvusQueryManager
 from ..legacy.collection_store import MilvusCollectionStore
 
 logger = logging.getLogger(__name__)
 
 
+def _as_str(value: Any) -> str:
+    """字段值转为字符串：已是 str 时原样返回，None 视为空字符串"""
+    if isinstance(value, str):
+        return value
+    return "" if value is None else str(value)
+
+
+def _noop() -> None:
+    """已连接时的连接检查：不做任何事"""
+
+
+def _raise_disconnected() -> None:
+    raise RuntimeError("MilvusClient 尚未连接，请先调用 connect()")
+
+
 class MilvusClient:
     """
     Milvus 客户端
@@ -34,6 +52,8 @@ class MilvusClient:
         embedding_model: str | None = None,
         use_lite: bool = False,
         db_path: str | None = None,
+        index_type: str | None = None,
+        embedding_cache_dir: str | None = None,
     ):
         # 存储连接信息
         self.host = host
@@ -46,8 +66,9 @@ class MilvusClient:
         # 创建 Collection 管理器（不传递连接信息）
         self.collection_manager = MilvusCollectionManager(
             collection_prefix=DEFAULT_COLLECTION_PREFIX,
+            index_type=index_type,
         )
-        self.storage = MilvusCollectionStore()
+        self.storage = MilvusCollectionStore(connection_alias=self.collection_manager.connection_alias)
 
         # 为了保证敏感配置（如 embedding_api_key）由外部项目显式传入，
         # 这里不再为其提供隐式默认值；如果缺失则抛出异常，提醒调用方补全配置。
@@ -62,6 +83,7 @@ class MilvusClient:
             embedding_model=embedding_model,
             embedding_api_key=embedding_api_key,
             embedding_api_base=embedding_api_base,
+            embedding_cache_dir=embedding_cache_dir,
         )
         # 向后兼容：query 属性指向 query_manager
         self.query = self.query_manager
@@ -69,7 +91,7 @@ class MilvusClient:
 
     # ===== 嵌入生成相关 API（对外可独立调用） =====
 
-    def embed(self, text: str) -> List[float]:
+    def embed(self, text: str) -> np.ndarray:
         """
         生成单条文本的嵌入向量。
 
@@ -78,12 +100,15 @@ class MilvusClient:
         """
         return self.query_manager.embedding_generator.embed(text)
 
-    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
         """
         批量生成文本嵌入向量。
 
         Args:
             texts: 文本列表
+
+        Returns:
+            np.ndarray: 形状为 (len(texts), dimension) 的向量矩阵
         """
         return self.query_manager.embedding_generator.embed_batch(texts)
 
@@ -100,8 +125,7 @@ class MilvusClient:
 
         实际删除逻辑委托给底层的 MilvusCollectionStore，仅在此处做连接状态校验。
         """
-        if not self._connected:
-            raise RuntimeError("MilvusClient 尚未连接，请先调用 connect()")
+        self._check_connected()
 
         return self.storage.delete_by_field(
             collection_type=collection_type,
@@ -133,63 +157,9 @@ class MilvusClient:
         Returns:
             int: 成功插入的记录数量（0 或 1）
         """
-        if not self._connected:
-            raise RuntimeError("MilvusClient 尚未连接，请先调用 connect()")
+        self._check_connected()
 
-        if "source_id" not in data:
-            raise ValueError("新增记录时必须提供 'source_id' 字段")
-
-        # 根据集合类型确定用于生成 embedding 的文本内容
-        text_to_embed: str
-        record: Dict[str, Any] = {"source_id": str(data.get("source_id", ""))}
-
-        if collection_type == "relationship":
-            desc = str(data.get("description", ""))
-            record["description"] = desc
-            text_to_embed = desc
-        elif collection_type == "text_unit":
-            text = str(data.get("text", ""))
-            record["text"] = text
-            text_to_embed = text
-        elif collection_type == "entity_title":
-            title = str(data.get("title", ""))
-            record["title"] = title
-            text_to_embed = title
-        elif collection_type == "entity_description":
-            title = str(data.get("title", ""))
-            # 兼容 description / summary 两种来源
-            desc = ""
-            if "description" in data:
-                desc = str(data.get("description", ""))
-            elif "summary" in data:
-                desc = str(data.get("summary", ""))
-            combined = f"{title}:{desc}"
-            record.update(
-                {
-                    "title": title,
-                    "description": desc,
-                    "title_description": combined,
-                }
-            )
-            text_to_embed = combined
-        elif collection_type == "community_title":
-            title = str(data.get("title", ""))
-            record["title"] = title
-            text_to_embed = title
-        elif collection_type == "community_summary":
-            summary = str(data.get("summary", ""))
-            record["summary"] = summary
-            text_to_embed = summary
-        elif collection_type == "community_full_content":
-            full_content = str(data.get("full_content", ""))
-            record["full_content"] = full_content
-            text_to_embed = full_content
-        elif collection_type == "document":
-            text = str(data.get("text", ""))
-            record["text"] = text
-            text_to_embed = text
-        else:
-            raise ValueError(f"不支持的集合类型: {collection_type}")
+        record, text_to_embed = self._build_record(collection_type, data)
 
         # 生成 embedding
         embedding = self.query_manager.embedding_generator.embed(text_to_embed or "空内容")
@@ -198,6 +168,60 @@ class MilvusClient:
         # 实际插入逻辑委托给底层的 MilvusCollectionStore
         return self.storage.insert_single_record(collection_type, record)
 
+    def add_embedding_records(
+        self,
+        collection_type: str,
+        records: List[Dict[str, Any]],
+    ) -> int:
+        """
+        批量新增带有 embedding 的记录到指定集合。
+
+        文本字段的选取规则与 add_embedding_record 相同；整批文本通过一次 embed_batch
+        生成嵌入，再按批写入集合，避免逐条请求嵌入服务。
+
+        Args:
+            collection_type: 集合类型
+            records: 字段字典列表，每条至少需要包含 source_id 及对应文本字段
+
+        Returns:
+            int: 成功插入的记录数量
+        """
+        self._check_connected()
+
+        if not records:
+            return 0
+
+        built = [self._build_record(collection_type, data) for data in records]
+        embeddings = self.query_manager.embedding_generator.embed_batch(
+            [text or "空内容" for _, text in built]
+        )
+        rows = []
+        for (record, _), embedding in zip(built, embeddings):
+            record["embedding"] = embedding
+            rows.append(record)
+
+        return self.storage.insert_records(collection_type, rows)
+
+    @staticmethod
+    def _build_record(collection_type: str, data: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """按集合的文本字段描述拼装记录，返回 (记录, 用于生成 embedding 的文本)"""
+        if "source_id" not in data:
+            raise ValueError("新增记录时必须提供 'source_id' 字段")
+
+        try:
+            spec = RECORD_SPECS[collection_type]
+        except KeyError:
+            raise ValueError(f"不支持的集合类型: {collection_type}") from None
+
+        record: Dict[str, Any] = {"source_id": _as_str(data["source_id"])}
+        fallbacks = dict(spec.fallbacks)
+        for field in spec.source_fields:
+            key = field if field in data else fallbacks.get(field, field)
+            record[field] = _as_str(data.get(key))
+        if spec.combine is not None:
+            record[spec.text_field] = spec.combine(*(record[field] for field in spec.source_fields))
+        return record, record[spec.text_field]
+
     @classmethod
     def from_env(cls) -> "MilvusClient":
         """基于环境变量配置创建客户端，统一读取配置和连接信息。"""
@@ -233,6 +257,8 @@ class MilvusClient:
             embedding_model=config.embedding_model,
             embedding_api_key=embedding_api_key,
             embedding_api_base=embedding_api_base,
+            index_type=config.index_type,
+            embedding_cache_dir=config.embedding_cache_dir,
         )
     
     def connect(self) -> None:
@@ -262,6 +288,16 @@ class MilvusClient:
         except Exception as e:  # noqa: BLE001
             logger.warning(f"断开连接时出现警告: {e}")
     
+    @property
+    def _connected(self) -> bool:
+        return self._is_connected
+
+    @_connected.setter
+    def _connected(self, value: bool) -> None:
+        # 连接状态变化时切换检查函数，热路径上只做一次无分支调用
+        self._is_connected = value
+        self._check_connected = _noop if value else _raise_disconnected
+    
     async def initialize(self) -> None:
         """
         初始化 Milvus 客户端
@@ -277,7 +313,7 @@ class MilvusClient:
             
             missing_collections = []
             for collection_type in required_collections:
-                full_name = f"{self.collection_manager.collection_prefix}{collection_type}"
+                full_name = self.collection_manager.full_name(collection_type)
                 if full_name not in existing_collections:
                     missing_collections.append(collection_type)
             
@@ -307,7 +343,17 @@ class MilvusClient:
             raise
     
     async def close(self) -> None:
-        """关闭连接"""
+        """关闭连接（关闭前 flush 所有有过写入的集合，并释放嵌入生成器的连接与缓存）"""
+        if self._connected:
+            try:
+                self.storage.flush_all()
+            except Exception as e:  # noqa: BLE001
+                logger.warning(f"关闭前 flush 集合失败: {e}")
+        # 嵌入生成器持有同步/异步 HTTP 连接池与磁盘缓存，异步客户端需在当前事件循环中关闭
+        try:
+            await self.query_manager.embedding_generator.aclose()
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"关闭嵌入生成器失败: {e}")
         self.disconnect()
         self.initialized = False
         logger.info("Milvus客户端已关闭")
@@ -4,18 +4,150 @@ Milvus查询管理器
 专门负责向量查询，不包含collection创建逻辑
 """
 
+import asyncio
+import json
 import logging
-from typing import Any, Dict, Iterable, List, Optional, cast
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, cast
 
+import numpy as np
 from pymilvus import Collection
 
 from ..core.collection_manager import MilvusCollectionManager
-from ..core.constants import DEFAULT_QWEN_EMBEDDING_MODEL
+from ..core.constants import DEFAULT_QWEN_EMBEDDING_MODEL, EMBEDDING_DTYPE
 from ..core.embedding_generator import QwenEmbeddingGenerator
+from ..core.schema import (
+    DEFAULT_METRIC_TYPE,
+    INSERT_FIELD_NAMES,
+    distances_to_scores,
+    get_search_params,
+    to_embedding_array,
+)
 
 logger = logging.getLogger(__name__)
 
 
+# 集合类型 -> 检索时返回的标量字段（写入字段去掉向量字段），模块加载时计算一次
+_OUTPUT_FIELDS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    collection_type: tuple(field for field in field_names if field != "embedding")
+    for collection_type, field_names in INSERT_FIELD_NAMES.items()
+})
+_DEFAULT_OUTPUT_FIELDS: Tuple[str, ...] = ("source_id",)
+
+# query_by_ids 单个查询表达式包含的 ID 数量上限，及同时在途的分块查询数量
+QUERY_ID_BATCH_SIZE = 1000
+QUERY_CONCURRENCY = 4
+
+# 精排时向 Milvus 多取的候选倍数：先取 limit * 该倍数个近似结果，再按精确余弦相似度保留前 limit 个
+RERANK_CANDIDATES_FACTOR = 4
+
+
+def _as_vector(value: Any) -> np.ndarray:
+    """检索返回的向量字段转为 float32 数组（FLOAT16_VECTOR 以原始字节返回）"""
+    if isinstance(value, (bytes, bytearray)):
+        return np.frombuffer(value, dtype=EMBEDDING_DTYPE).astype(np.float32)
+    return np.asarray(value, dtype=np.float32)
+
+
+def _rerank(query_embedding: Any, results: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+    """
+    按精确余弦相似度对候选结果精排，返回前 k 个（分数降序）
+
+    候选向量堆叠为 (N, dim) 矩阵后一次矩阵乘求相似度，argpartition 以 O(N) 选出前 k 个再排序。
+    结果中的 embedding 字段被移除，score 替换为余弦相似度。
+    """
+    if not results:
+        return results
+    vectors = np.stack([_as_vector(result.pop("embedding")) for result in results])
+    query = np.asarray(query_embedding, dtype=np.float32).reshape(-1)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    scores = (vectors @ query) / np.maximum(norms, np.float32(1e-12))
+    k = min(k, len(results))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    reranked = []
+    for i in top.tolist():
+        result = results[i]
+        result["score"] = float(scores[i])
+        reranked.append(result)
+    return reranked
+
+
+@lru_cache(maxsize=None)
+def _fields_getter(fields: Tuple[str, ...]) -> Callable[[Any], Tuple[Any, ...]]:
+    """返回一次取出全部字段值的函数，单字段时同样返回元组；每种字段组合只构造一次"""
+    getter = attrgetter(*fields)
+    if len(fields) == 1:
+        return lambda entity: (getter(entity),)
+    return getter
+
+
+def _format_hits(
+    hits: Any,
+    fields: Tuple[str, ...],
+    get_fields: Callable[[Any], Tuple[Any, ...]],
+    score_threshold: Optional[float] = None,
+    metric_type: str = DEFAULT_METRIC_TYPE,
+) -> List[Dict[str, Any]]:
+    """
+    将一个查询的命中结果转换为字典列表
+
+    距离到分数的转换与阈值过滤在 NumPy 中对整批命中一次完成，只为保留的命中构造字典、读取实体字段。
+    score_threshold 与 score 比较（相似度，越大越相似），而不是与原始距离比较：
+    L2 度量下距离越小越相似，直接比较距离会把最相近的命中过滤掉。
+    """
+    distances = np.fromiter((hit.distance for hit in hits), dtype=np.float64, count=len(hits))
+    scores = distances_to_scores(distances, metric_type)
+    if score_threshold is None:
+        keep: Iterable[int] = range(len(hits))
+    else:
+        keep = np.flatnonzero(scores > score_threshold).tolist()
+    score_list = scores.tolist()
+    
+    results = []
+    for i in keep:
+        hit = hits[i]
+        result = {"id": hit.id, "distance": hit.distance, "score": score_list[i]}
+        result.update(zip(fields, get_fields(hit.entity)))
+        results.append(result)
+    return results
+
+
+def _describe_index(collection: Any) -> Dict[str, Any]:
+    """
+    读取集合向量索引的类型、度量与 nlist
+
+    兼容 describe_index 返回扁平参数或嵌套 "params" 两种格式；读取失败时返回空字典。
+    """
+    try:
+        params = dict(collection.index().params)
+    except Exception as e:  # noqa: BLE001
+        logger.debug(f"读取集合索引参数失败，使用默认检索参数: {e}")
+        return {}
+    nested = params.get("params") or {}
+    if isinstance(nested, str):
+        nested = json.loads(nested)
+    nlist = params.get("nlist") or nested.get("nlist")
+    return {
+        "index_type": params.get("index_type"),
+        "metric_type": params.get("metric_type"),
+        "nlist": int(nlist) if nlist else None,
+    }
+
+
+def _normalize_query(text: Any) -> str:
+    """
+    规范化查询文本：NFKC 折叠全角/半角等兼容字符，并合并连续空白
+
+    仅写法不同的重复查询由此得到相同文本，可命中嵌入缓存而不再请求接口。
+    """
+    return " ".join(unicodedata.normalize("NFKC", str(text)).split())
+
+
 class MilvusQueryManager:
     """
     Milvus查询管理器
@@ -28,6 +160,7 @@ class MilvusQueryManager:
         embedding_model: str | None = None,
         embedding_api_key: str | None = None,
         embedding_api_base: str | None = None,
+        embedding_cache_dir: str | None = None,
     ):
         """
         初始化查询管理器
@@ -37,6 +170,7 @@ class MilvusQueryManager:
             embedding_model: 嵌入模型名称，默认使用 Qwen text-embedding-v3
             embedding_api_key: Qwen/DashScope API Key，默认读取环境变量
             embedding_api_base: Qwen API Base，默认 DashScope 兼容地址
+            embedding_cache_dir: 嵌入磁盘缓存目录（SQLite），重复查询相同文本时跨进程复用嵌入
         
         注意：如果传入 None，会创建新的 MilvusCollectionManager，
              但不会建立连接，需要外部先建立连接
@@ -58,8 +192,13 @@ class MilvusQueryManager:
             api_base=embedding_api_base,
             model=self.embedding_model_name,
             name="milvus_query_manager",
+            cache_dir=embedding_cache_dir,
         )
         
+        # 集合类型 -> (集合对象, 向量索引信息)，首次检索时读取一次；
+        # 集合被删除重建后管理器返回新的集合对象，缓存随之失效，不会沿用旧索引的检索参数
+        self._index_info: Dict[str, Tuple[Collection, Dict[str, Any]]] = {}
+        
         logger.info(f"初始化查询管理器")
         logger.info(
             "使用 Qwen 嵌入模型: %s，维度=%s",
@@ -67,15 +206,28 @@ class MilvusQueryManager:
             self.embedding_generator.dimension,
         )
     
-    def _generate_embedding(self, text: str) -> List[float]:
-        """生成单个文本的embedding向量"""
-        clean_text = str(text).strip() if text else "空内容"
+    def _generate_embedding(self, text: str) -> np.ndarray:
+        """
+        生成单个文本的embedding向量
+
+        查询文本先经过规范化，重复查询命中嵌入生成器的缓存（键为模型名 + 文本），跳过网络请求。
+        """
+        clean_text = (_normalize_query(text) if text else "") or "空内容"
         try:
             return self.embedding_generator.embed(clean_text)
         except Exception as e:  # noqa: BLE001
             logger.error(f"生成embedding失败，返回零向量: {e}")
             return self.embedding_generator.zero_vector()
     
+    async def _agenerate_embedding(self, text: str) -> np.ndarray:
+        """_generate_embedding 的异步版本，嵌入请求通过 AsyncOpenAI 发出，不占用线程池"""
+        clean_text = (_normalize_query(text) if text else "") or "空内容"
+        try:
+            return await self.embedding_generator.aembed(clean_text)
+        except Exception as e:  # noqa: BLE001
+            logger.error(f"生成embedding失败，返回零向量: {e}")
+            return self.embedding_generator.zero_vector()
+    
     def search_by_text(self, query_text: str, collection_type: str, 
                       limit: int = 5, score_threshold: float = 0.0) -> List[Dict[str, Any]]:
         """
@@ -85,7 +237,7 @@ class MilvusQueryManager:
             query_text: 查询文本
             collection_type: 目标集合类型
             limit: 返回结果数量限制
-            score_threshold: 相似度阈值
+            score_threshold: 相似度阈值，只保留 score 大于该值的结果（与 score 同一尺度）
             
         Returns:
             List[Dict[str, Any]]: 查询结果列表
@@ -107,7 +259,9 @@ class MilvusQueryManager:
             return []
     
     def search_by_embedding(self, query_embedding: List[float], collection_type: str,
-                           limit: int = 5, score_threshold: float = 0.0) -> List[Dict[str, Any]]:
+                           limit: int = 5, score_threshold: float = 0.0,
+                           search_params: Optional[Dict[str, Any]] = None,
+                           rerank: bool = False) -> List[Dict[str, Any]]:
         """
         通过embedding向量查询相似向量
         
@@ -115,61 +269,28 @@ class MilvusQueryManager:
             query_embedding: 查询向量
             collection_type: 目标集合类型
             limit: 返回结果数量限制
-            score_threshold: 相似度阈值
+            score_threshold: 相似度阈值，只保留 score 大于该值的结果（与 score 同一尺度）
+            search_params: 检索参数，默认按集合实际的索引类型、度量与 nlist 推导
+            rerank: 是否精排：多取 RERANK_CANDIDATES_FACTOR 倍候选并连同向量返回，
+                按精确余弦相似度保留前 limit 个，弥补近似索引的召回误差
             
         Returns:
             List[Dict[str, Any]]: 查询结果列表
         """
         try:
-            # 确保连接到Milvus（连接应由上层 MilvusClient 或调用方统一管理）
-            if not self.collection_manager._connected:
-                raise RuntimeError(
-                    "MilvusCollectionManager 尚未连接，请先通过 MilvusClient.connect() "
-                    "或手动调用 collection_manager.connect(host, port) 建立连接。"
-                )
-            
-            # 获取集合
-            collection = self.collection_manager.get_collection(collection_type)
-            
-            # 加载集合到内存（如果尚未加载）
-            collection.load()
-            
-            # 设置搜索参数
-            search_params = {
-                "metric_type": "L2",
-                "params": {"nprobe": 10}
-            }
-            
-            # 执行搜索
-            search_future = collection.search(
-                data=[query_embedding],
-                anns_field="embedding",
-                param=search_params,
-                limit=limit,
-                expr=None,
-                output_fields=self._get_output_fields(collection_type)
+            fetch = limit * RERANK_CANDIDATES_FACTOR if rerank else limit
+            results, fields, metric_type = self._search(
+                collection_type, to_embedding_array([query_embedding]), fetch, search_params,
+                with_embedding=rerank,
             )
-            results = cast(Iterable, search_future)
+            get_fields = _fields_getter(fields)
             
             # 处理结果
             formatted_results = []
-            for hits in results:
-                for hit in hits:
-                    if hit.distance <= score_threshold:
-                        continue
-                    
-                    result = {
-                        "id": hit.id,
-                        "distance": hit.distance,
-                        "score": 1.0 / (1.0 + hit.distance),  # 转换为相似度分数
-                    }
-                    
-                    # 添加字段数据
-                    for field_name in self._get_output_fields(collection_type):
-                        if hasattr(hit.entity, field_name):
-                            result[field_name] = getattr(hit.entity, field_name)
-                    
-                    formatted_results.append(result)
+            for hits in cast(Iterable, results):
+                formatted_results.extend(_format_hits(hits, fields, get_fields, score_threshold, metric_type))
+            if rerank:
+                formatted_results = _rerank(query_embedding, formatted_results, limit)
             
             logger.info(f"在集合 {collection_type} 中找到 {len(formatted_results)} 个结果")
             return formatted_results
@@ -179,7 +300,8 @@ class MilvusQueryManager:
             return []
     
     def batch_search_by_embeddings(self, query_embeddings: List[List[float]], 
-                                  collection_type: str, limit: int = 5) -> List[List[Dict[str, Any]]]:
+                                  collection_type: str, limit: int = 5,
+                                  search_params: Optional[Dict[str, Any]] = None) -> List[List[Dict[str, Any]]]:
         """
         批量向量查询
         
@@ -187,60 +309,21 @@ class MilvusQueryManager:
             query_embeddings: 查询向量列表
             collection_type: 目标集合类型
             limit: 每个查询的返回结果数量限制
+            search_params: 检索参数，默认按集合实际的索引类型、度量与 nlist 推导
             
         Returns:
             List[List[Dict[str, Any]]]: 每个查询的结果列表
         """
         try:
-            # 确保连接到Milvus（连接应由上层 MilvusClient 或调用方统一管理）
-            if not self.collection_manager._connected:
-                raise RuntimeError(
-                    "MilvusCollectionManager 尚未连接，请先通过 MilvusClient.connect() "
-                    "或手动调用 collection_manager.connect(host, port) 建立连接。"
-                )
-            
-            # 获取集合
-            collection = self.collection_manager.get_collection(collection_type)
-            
-            # 加载集合到内存（如果尚未加载）
-            collection.load()
-            
-            # 设置搜索参数
-            search_params = {
-                "metric_type": "L2",
-                "params": {"nprobe": 10}
-            }
-            
-            # 执行批量搜索
-            search_future = collection.search(
-                data=query_embeddings,
-                anns_field="embedding",
-                param=search_params,
-                limit=limit,
-                expr=None,
-                output_fields=self._get_output_fields(collection_type)
+            results, fields, metric_type = self._search(
+                collection_type, to_embedding_array(query_embeddings), limit, search_params
             )
-            results = cast(Iterable, search_future)
+            get_fields = _fields_getter(fields)
             
             # 处理结果
-            all_results = []
-            for hits in results:
-                query_results = []
-                for hit in hits:
-                    result = {
-                        "id": hit.id,
-                        "distance": hit.distance,
-                        "score": 1.0 / (1.0 + hit.distance),
-                    }
-                    
-                    # 添加字段数据
-                    for field_name in self._get_output_fields(collection_type):
-                        if hasattr(hit.entity, field_name):
-                            result[field_name] = getattr(hit.entity, field_name)
-                    
-                    query_results.append(result)
-                
-                all_results.append(query_results)
+            all_results = [
+                _format_hits(hits, fields, get_fields, metric_type=metric_type) for hits in cast(Iterable, results)
+            ]
             
             logger.info(f"批量查询完成，处理了 {len(query_embeddings)} 个查询")
             return all_results
@@ -249,19 +332,82 @@ class MilvusQueryManager:
             logger.error(f"批量查询失败: {e}")
             return [[] for _ in query_embeddings]
     
-    def _get_output_fields(self, collection_type: str) -> List[str]:
-        """获取集合的输出字段"""
-        field_mapping = {
-            "relationship": ["source_id", "description"],
-            "text_unit": ["source_id", "text"],
-            "entity_title": ["source_id", "title"],
-            "entity_description": ["source_id", "title", "description", "title_description"],
-            "community_title": ["source_id", "title"],
-            "community_summary": ["source_id", "summary"],
-            "community_full_content": ["source_id", "full_content"]
-        }
+    def _require_connection(self) -> None:
+        """确保连接到Milvus（连接应由上层 MilvusClient 或调用方统一管理）"""
+        if not self.collection_manager._connected:
+            raise RuntimeError(
+                "MilvusCollectionManager 尚未连接，请先通过 MilvusClient.connect() "
+                "或手动调用 collection_manager.connect(host, port) 建立连接。"
+            )
+    
+    def _search(
+        self,
+        collection_type: str,
+        data: np.ndarray,
+        limit: int,
+        search_params: Optional[Dict[str, Any]] = None,
+        _async: bool = False,
+        with_embedding: bool = False,
+    ) -> Tuple[Any, Tuple[str, ...], str]:
+        """
+        检索的公共部分：检查连接、加载集合、推导检索参数与输出字段并发起 search
+
+        _async 为 True 时返回 pymilvus 的 SearchFuture，调用方可先提交多个检索再统一取结果；
+        with_embedding 为 True 时输出字段额外包含向量字段。
+
+        Returns:
+            (检索结果或 SearchFuture, 输出字段, 度量类型)
+        """
+        self._require_connection()
+        
+        # 获取集合（首次使用时加载到内存）
+        collection = self.collection_manager.ensure_loaded(collection_type)
+        
+        # 设置搜索参数
+        if search_params is None:
+            search_params = self._search_params(collection_type, collection, limit)
+        fields = self._get_output_fields(collection_type)
+        if with_embedding:
+            fields = (*fields, "embedding")
         
-        return field_mapping.get(collection_type, ["source_id"])
+        results = collection.search(
+            data=data,
+            anns_field="embedding",
+            param=search_params,
+            limit=limit,
+            expr=None,
+            output_fields=list(fields),
+            _async=_async,
+        )
+        return results, fields, search_params.get("metric_type", DEFAULT_METRIC_TYPE)
+    
+    def _search_params(self, collection_type: str, collection: Collection, limit: int) -> Dict[str, Any]:
+        """按集合实际的向量索引推导默认检索参数（索引信息按集合对象缓存）"""
+        cached = self._index_info.get(collection_type)
+        if cached is not None and cached[0] is collection:
+            info = cached[1]
+        else:
+            info = _describe_index(collection)
+            self._index_info[collection_type] = (collection, info)
+        index_type = info.get("index_type") or self.collection_manager.index_type
+        try:
+            return get_search_params(
+                index_type,
+                limit,
+                metric_type=info.get("metric_type") or DEFAULT_METRIC_TYPE,
+                nlist=info.get("nlist"),
+            )
+        except ValueError:
+            # 集合使用了未内置的索引类型，回退为管理器配置的索引类型
+            return get_search_params(
+                self.collection_manager.index_type,
+                limit,
+                metric_type=info.get("metric_type") or DEFAULT_METRIC_TYPE,
+            )
+    
+    def _get_output_fields(self, collection_type: str) -> Tuple[str, ...]:
+        """获取集合的输出字段（只读元组，调用时不分配新列表）"""
+        return _OUTPUT_FIELDS.get(collection_type, _DEFAULT_OUTPUT_FIELDS)
     
     def get_collection_stats(self, collection_type: str) -> Dict[str, Any]:
         """
@@ -290,11 +436,42 @@ class MilvusQueryManager:
             logger.error(f"获取集合统计信息失败: {e}")
             return {"error": str(e)}
     
+    async def asearch_by_embedding(self, query_embedding: List[float], collection_type: str,
+                                   limit: int = 5, score_threshold: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        search_by_embedding 的异步版本
+
+        检索在线程池中执行（pymilvus 同步客户端在 gRPC 调用期间释放 GIL），多个集合可并发检索。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            partial(self.search_by_embedding, query_embedding, collection_type, limit, score_threshold),
+        )
+    
+    async def asearch_by_text(self, query_text: str, collection_type: str,
+                              limit: int = 5, score_threshold: float = 0.0) -> List[Dict[str, Any]]:
+        """search_by_text 的异步版本：嵌入请求在事件循环中发出，检索在线程池中执行"""
+        try:
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, self.collection_manager.collection_exists, collection_type):
+                logger.warning(f"集合 '{collection_type}' 不存在")
+                return []
+            
+            query_embedding = await self._agenerate_embedding(query_text)
+            return await self.asearch_by_embedding(query_embedding, collection_type, limit, score_threshold)
+            
+        except Exception as e:
+            logger.error(f"文本查询失败: {e}")
+            return []
+    
     def search_multiple_collections(self, query_text: str, collection_types: List[str],
                                    limit_per_collection: int = 5) -> Dict[str, List[Dict[str, Any]]]:
         """
         在多个集合中搜索
         
+        查询向量只生成一次，各集合的检索以 _async 方式同时提交，总耗时取决于最慢的集合。
+        
         Args:
             query_text: 查询文本
             collection_types: 目标集合类型列表
@@ -303,23 +480,55 @@ class MilvusQueryManager:
         Returns:
             Dict[str, List[Dict[str, Any]]]: 每个集合的查询结果
         """
-        results = {}
-        
         # 生成查询向量（只生成一次）
-        query_embedding = self._generate_embedding(query_text)
+        query_data = to_embedding_array([self._generate_embedding(query_text)])
         
+        # 先提交所有集合的异步检索，使各集合的检索在服务端并行执行，再依次取结果
+        pending: Dict[str, Tuple[Any, Tuple[str, ...], str]] = {}
         for collection_type in collection_types:
             try:
-                collection_results = self.search_by_embedding(
-                    query_embedding, collection_type, limit_per_collection
+                pending[collection_type] = self._search(
+                    collection_type, query_data, limit_per_collection, _async=True
+                )
+            except Exception as e:
+                logger.error(f"在集合 {collection_type} 中搜索失败: {e}")
+        
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for collection_type in collection_types:
+            results[collection_type] = []
+            if collection_type not in pending:
+                continue
+            future, fields, metric_type = pending[collection_type]
+            try:
+                hits = future.result()[0]
+                results[collection_type] = _format_hits(
+                    hits, fields, _fields_getter(fields), 0.0, metric_type
                 )
-                results[collection_type] = collection_results
             except Exception as e:
                 logger.error(f"在集合 {collection_type} 中搜索失败: {e}")
-                results[collection_type] = []
         
         return results
     
+    async def asearch_multiple_collections(self, query_text: str, collection_types: List[str],
+                                           limit_per_collection: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """search_multiple_collections 的异步版本，各集合的检索通过 asyncio.gather 并发执行"""
+        query_embedding = await self._agenerate_embedding(query_text)
+        results = await asyncio.gather(
+            *(
+                self.asearch_by_embedding(query_embedding, collection_type, limit_per_collection)
+                for collection_type in collection_types
+            ),
+            return_exceptions=True,
+        )
+        
+        merged: Dict[str, List[Dict[str, Any]]] = {}
+        for collection_type, result in zip(collection_types, results):
+            if isinstance(result, BaseException):
+                logger.error(f"在集合 {collection_type} 中搜索失败: {result}")
+                result = []
+            merged[collection_type] = result
+        return merged
+    
     def query_by_source_id(self, collection_type: str, source_id: str,
                           output_fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
         """
@@ -334,25 +543,21 @@ class MilvusQueryManager:
             Optional[Dict[str, Any]]: 查询结果，如果未找到则返回None
         """
         try:
-            # 确保连接到Milvus（连接应由上层 MilvusClient 或调用方统一管理）
-            if not self.collection_manager._connected:
-                raise RuntimeError(
-                    "MilvusCollectionManager 尚未连接，请先通过 MilvusClient.connect() "
-                    "或手动调用 collection_manager.connect(host, port) 建立连接。"
-                )
+            self._require_connection()
             
-            # 获取集合
-            collection = self.collection_manager.get_collection(collection_type)
-            collection.load()
+            # 获取集合（首次使用时加载到内存）
+            collection = self.collection_manager.ensure_loaded(collection_type)
             
             # 设置默认输出字段
             if output_fields is None:
                 output_fields = ["id", "source_id"]
             
-            # 执行查询
+            # source_id 以模板参数传入：表达式固定不变，值中的引号也不会破坏表达式；只取第一条
             results = collection.query(
-                expr=f"source_id == '{source_id}'",
-                output_fields=output_fields
+                expr="source_id == {source_id}",
+                expr_params={"source_id": source_id},
+                output_fields=output_fields,
+                limit=1,
             )
             
             if results:
@@ -383,29 +588,24 @@ class MilvusQueryManager:
             return []
         
         try:
-            # 确保连接到Milvus（连接应由上层 MilvusClient 或调用方统一管理）
-            if not self.collection_manager._connected:
-                raise RuntimeError(
-                    "MilvusCollectionManager 尚未连接，请先通过 MilvusClient.connect() "
-                    "或手动调用 collection_manager.connect(host, port) 建立连接。"
-                )
+            self._require_connection()
             
-            # 获取集合
-            collection = self.collection_manager.get_collection(collection_type)
-            collection.load()
+            # 获取集合（首次使用时加载到内存）
+            collection = self.collection_manager.ensure_loaded(collection_type)
             
             # 设置默认输出字段
             if output_fields is None:
                 output_fields = ["id", "source_id"]
             
-            # 构建查询表达式
-            ids_str = ", ".join(map(str, ids))
-            
-            # 执行查询
-            results = collection.query(
-                expr=f"id in [{ids_str}]",
-                output_fields=output_fields
-            )
+            # 按 QUERY_ID_BATCH_SIZE 分块，ID 以模板参数传入，表达式本身固定不变；多个分块在线程池中并发查询
+            query = partial(collection.query, "id in {ids}", output_fields=output_fields)
+            chunks = [ids[start:start + QUERY_ID_BATCH_SIZE] for start in range(0, len(ids), QUERY_ID_BATCH_SIZE)]
+            if len(chunks) == 1:
+                results = query(expr_params={"ids": chunks[0]})
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(chunks), QUERY_CONCURRENCY)) as executor:
+                    parts = executor.map(lambda chunk: query(expr_params={"ids": chunk}), chunks)
+                    results = [row for part in parts for row in part]
             
             logger.info(f"在集合 {collection_type} 中查询到 {len(results)}/{len(ids)} 条数据")
             return results
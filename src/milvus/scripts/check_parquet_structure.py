@@ -4,35 +4,54 @@
 """
 
 import os
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow.parquet as pq
+
+
+def describe_parquet_file(file_path):
+    """读取单个Parquet文件的结构信息，返回可直接打印的文本"""
+    filename = os.path.basename(file_path)
+    try:
+        # 形状与列名取自文件元数据，只读取第一批的前3行用于展示
+        parquet_file = pq.ParquetFile(file_path)
+        columns = parquet_file.schema_arrow.names
+        head = next(parquet_file.iter_batches(batch_size=3), None)
+    except Exception as e:
+        return f"读取文件 {filename} 失败: {e}"
+
+    return "\n".join([
+        f"\n文件: {filename}",
+        f"形状: {(parquet_file.metadata.num_rows, len(columns))}",
+        f"列名: {columns}",
+        "前3行数据:",
+        str(head.to_pandas() if head is not None else "(空)"),
+        "-" * 40,
+    ])
+
 
 def check_parquet_structure(directory_path):
-    """检查目录中所有Parquet文件的结构"""
+    """检查目录中所有Parquet文件的结构（各文件的元数据在线程池中并发读取，按文件名顺序输出）"""
     if not os.path.exists(directory_path):
         print(f"目录不存在: {directory_path}")
         return
-    
+
     print(f"检查目录: {directory_path}")
     print("=" * 60)
-    
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.parquet'):
-            file_path = os.path.join(directory_path, filename)
-            
-            try:
-                # 读取Parquet文件
-                df = pd.read_parquet(file_path)
-                
-                print(f"\n文件: {filename}")
-                print(f"形状: {df.shape}")
-                print("列名:", df.columns.tolist())
-                print("前3行数据:")
-                print(df.head(3))
-                print("-" * 40)
-                
-            except Exception as e:
-                print(f"读取文件 {filename} 失败: {e}")
+
+    file_paths = [
+        os.path.join(directory_path, filename)
+        for filename in sorted(os.listdir(directory_path))
+        if filename.endswith('.parquet')
+    ]
+    if not file_paths:
+        return
+
+    # 只读取文件尾部元数据和少量行，属于 I/O 密集操作，pyarrow 读取时释放 GIL
+    with ThreadPoolExecutor(max_workers=min(len(file_paths), os.cpu_count() or 1)) as executor:
+        for description in executor.map(describe_parquet_file, file_paths):
+            print(description)
 
 if __name__ == "__main__":
     parquet_dir = "/Users/renzhiping/workspace2/graphrag210/graphrag/index/dgraph/tests/parquet"
-    check_parquet_structure(parquet_dir)
\ No newline at end of file
+    check_parquet_structure(parquet_dir)
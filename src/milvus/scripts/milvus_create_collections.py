@@ -43,8 +43,7 @@ def create_collections(client: MilvusClient | None = None) -> bool:
         if collections:
             logger.info("✅ 集合创建完成")
             for name in collections.keys():
-                full_name = f"{manager.collection_prefix}{name}"
-                logger.info("   - %s", full_name)
+                logger.info("   - %s", manager.full_name(name))
             return True
         else:
             logger.error("❌ 未创建任何集合")
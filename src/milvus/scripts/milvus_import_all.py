@@ -7,11 +7,11 @@
 import os
 import sys
 import logging
-from pathlib import Path
 from typing import Optional
 
 from dotenv import load_dotenv
 from milvus import MilvusClient
+from milvus.core.config import get_milvus_config
 from milvus.core.parquet_importer import MilvusParquetImporter
 
 # 配置日志
@@ -30,13 +30,16 @@ def import_parquet_data(parquet_dir: str, client: MilvusClient) -> bool:
         bool: 导入是否成功
     """
     try:
-        # 检查parquet文件
-        parquet_path = Path(parquet_dir)
-        if not parquet_path.exists():
+        # 检查parquet文件：一次 scandir 列出文件，目录项随后直接交给导入器，不再重复扫描目录
+        if not os.path.isdir(parquet_dir):
             logger.error("Parquet目录不存在: %s", parquet_dir)
             return False
         
-        parquet_files = list(parquet_path.glob("*.parquet"))
+        with os.scandir(parquet_dir) as it:
+            parquet_files = sorted(
+                (entry for entry in it if entry.name.endswith(".parquet") and entry.is_file()),
+                key=lambda entry: entry.name,
+            )
         if not parquet_files:
             logger.error("在目录 %s 中未找到任何.parquet文件", parquet_dir)
             return False
@@ -45,12 +48,23 @@ def import_parquet_data(parquet_dir: str, client: MilvusClient) -> bool:
         for file in parquet_files:
             logger.info("  - %s", file.name)
         
-        # 创建数据导入器，复用同一个客户端中的 CollectionManager
-        importer = MilvusParquetImporter(client.collection_manager)
+        # 创建数据导入器，复用同一个客户端中的 CollectionManager；
+        # 配置了嵌入缓存目录时，重复导入未变化的数据不再重新请求嵌入接口；
+        # 各文件按 MILVUS_IMPORT_CONCURRENCY 并发导入，每批 MILVUS_INSERT_BATCH 行
+        config = get_milvus_config()
+        importer = MilvusParquetImporter(
+            client.collection_manager,
+            embedding_cache_dir=config.embedding_cache_dir,
+            file_concurrency=config.import_concurrency,
+            batch_size=config.insert_batch_size,
+        )
         
         # 导入数据
         logger.info("开始导入parquet数据到Milvus...")
-        results = importer.import_directory(parquet_dir)
+        try:
+            results = importer.import_files(parquet_files)
+        finally:
+            importer.close()
         
         # 输出结果
         logger.info("导入结果:")
@@ -88,7 +102,6 @@ def main(parquet_dir: Optional[str] = None) -> bool:
     load_dotenv(os.path.join(project_root, ".env"))
     
     # 获取并打印Milvus配置
-    from milvus.core.config import get_milvus_config
     milvus_config = get_milvus_config()
     print(f"ℹ️ 使用的Milvus配置: {milvus_config.host}:{milvus_config.port}")
 
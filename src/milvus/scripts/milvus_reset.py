@@ -5,11 +5,13 @@
 """
 
 import os
+import sys
 import logging
 import argparse
 from typing import List
 
 from dotenv import load_dotenv
+from pymilvus.exceptions import MilvusException
 from milvus import MilvusClient
 from milvus.core.collection_manager import COLLECTION_NAMES as NAMES_DICT
 
@@ -20,6 +22,9 @@ logger = logging.getLogger(__name__)
 # 获取所有集合的全名列表
 COLLECTION_NAMES = list(NAMES_DICT.values())
 
+# 脚本内各操作只处理 Milvus 服务端/网络错误，其余异常（多为程序错误）交给 main 统一处理
+MILVUS_ERRORS = (MilvusException, ConnectionError, TimeoutError)
+
 class MilvusReset:
     """Milvus数据库重置工具（只依赖外部传入的 MilvusClient，不再自行读取配置或管理连接）"""
     
@@ -40,10 +45,10 @@ class MilvusReset:
             return []
         try:
             collections = self.client.collection_manager.list_collections()
-            logger.info(f"当前存在的GraphRAG集合: {collections}")
+            logger.info("当前存在的GraphRAG集合: %s", collections)
             return collections
-        except Exception as e:  # noqa: BLE001
-            logger.error(f"获取集合列表失败: {e}")
+        except MILVUS_ERRORS as e:
+            logger.error("获取集合列表失败: %s", e)
             return []
     
     def drop_collection(self, collection_name: str) -> bool:
@@ -55,10 +60,10 @@ class MilvusReset:
         try:
             # CollectionManager.drop_collections 会统一删除 GraphRAG 相关集合，
             # 这里仅作为单集合删除时的日志辅助。
-            logger.info(f"请求删除集合: {collection_name}")
+            logger.info("请求删除集合: %s", collection_name)
             return True
-        except Exception as e:  # noqa: BLE001
-            logger.error(f"删除集合 {collection_name} 失败: {e}")
+        except MILVUS_ERRORS as e:
+            logger.error("删除集合 %s 失败: %s", collection_name, e)
             return False
     
     def drop_all_collections(self) -> int:
@@ -69,10 +74,10 @@ class MilvusReset:
         
         try:
             dropped_count = self.client.collection_manager.drop_collections()
-            logger.info(f"通过 CollectionManager 删除 GraphRAG 集合数量: {dropped_count}")
+            logger.info("通过 CollectionManager 删除 GraphRAG 集合数量: %s", dropped_count)
             return dropped_count
-        except Exception as e:  # noqa: BLE001
-            logger.error(f"删除 GraphRAG 集合失败: {e}")
+        except MILVUS_ERRORS as e:
+            logger.error("删除 GraphRAG 集合失败: %s", e)
             return 0
     
     def reset_database(self) -> None:
@@ -86,17 +91,18 @@ class MilvusReset:
             # 删除所有GraphRAG集合
             dropped_count = self.drop_all_collections()
             
-            logger.info(f"重置完成，共删除 {dropped_count} 个集合")
+            logger.info("重置完成，共删除 %s 个集合", dropped_count)
             
-            # 列出剩余的集合
-            remaining_collections = self.list_collections()
-            if remaining_collections:
-                logger.info(f"剩余集合: {remaining_collections}")
-            else:
-                logger.info("数据库已清空，无任何集合")
+            # 剩余集合只用于排查问题，需要再请求一次集合列表，仅在 DEBUG 级别下执行
+            if logger.isEnabledFor(logging.DEBUG):
+                remaining_collections = self.list_collections()
+                if remaining_collections:
+                    logger.debug("剩余集合: %s", remaining_collections)
+                else:
+                    logger.debug("数据库已清空，无任何集合")
                 
         except Exception as e:
-            logger.error(f"重置数据库过程中发生错误: {e}")
+            logger.error("重置数据库过程中发生错误: %s", e)
             raise
 
 def main():
@@ -109,6 +115,12 @@ def main():
         default=None,
         help="Milvus服务器地址，格式: host:port（例如: 192.168.3.101:19530），如果未指定则从配置文件读取"
     )
+    parser.add_argument(
+        "-y",
+        "--yes",
+        action="store_true",
+        help="跳过确认提示直接删除，用于脚本/CI 等非交互环境",
+    )
     args = parser.parse_args()
     
     # 读取环境变量配置（使用 python-dotenv）
@@ -139,11 +151,15 @@ def main():
     for name in COLLECTION_NAMES:
         print(f"  - {name}")
     
-    confirmation = input("\n确定要继续吗？(y/N): ")
-    
-    if confirmation.lower() not in ['y', 'yes']:
-        print("操作已取消")
-        return
+    if not args.yes:
+        # 非交互环境下无法确认，删除操作不可恢复，要求显式传入 --yes 而不是默认继续
+        if not sys.stdin.isatty():
+            print("操作已取消：当前为非交互环境，如需直接删除请传入 --yes")
+            return
+        confirmation = input("\n确定要继续吗？(y/N): ")
+        if confirmation.lower() not in ['y', 'yes']:
+            print("操作已取消")
+            return
     
     try:
         # 建立连接并执行重置
@@ -152,7 +168,7 @@ def main():
         print("✅ 数据库重置完成")
         
     except Exception as e:
-        logger.error(f"重置失败: {e}")
+        logger.error("重置失败: %s", e)
         print("❌ 数据库重置失败")
     finally:
         client.disconnect()
@@ -7,7 +7,7 @@ Milvus向量数据库工作流程管理脚本
 import os
 import sys
 import logging
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 from dotenv import load_dotenv
 
@@ -17,6 +17,9 @@ if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
 from milvus import MilvusClient
+from milvus.core.config import get_milvus_config
+from milvus.core.parquet_importer import MilvusParquetImporter
+from milvus.scripts.milvus_reset import MILVUS_ERRORS, MilvusReset
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -65,13 +68,12 @@ def create_collections(client: MilvusClient) -> bool:
         collections = manager.create_collections()
         print(f"✅ 成功创建 {len(collections)} 个集合:")
         for name, collection in collections.items():
-            full_name = f"{manager.collection_prefix}{name}"
-            print(f"   - {full_name}")
+            print(f"   - {manager.full_name(name)}")
         
         return True
         
-    except Exception as e:
-        logger.error(f"创建集合失败: {e}")
+    except MILVUS_ERRORS as e:
+        logger.error("创建集合失败: %s", e)
         print(f"❌ 创建集合失败: {e}")
         return False
 
@@ -82,8 +84,6 @@ def import_data(client: MilvusClient) -> bool:
     print("-" * 40)
     
     try:
-        from ..core.parquet_importer import MilvusParquetImporter
-        
         # 检查集合是否存在
         manager = client.collection_manager
         
@@ -100,41 +100,51 @@ def import_data(client: MilvusClient) -> bool:
             print(f"❌ Parquet目录不存在: {parquet_dir}")
             return False
         
-        parquet_files = list(Path(parquet_dir).glob("*.parquet"))
+        # 一次 scandir 列出文件，目录项随后直接交给导入器，不再重复扫描目录
+        with os.scandir(parquet_dir) as it:
+            parquet_files = sorted(
+                (entry for entry in it if entry.name.endswith(".parquet") and entry.is_file()),
+                key=lambda entry: entry.name,
+            )
         if not parquet_files:
             print(f"❌ 在目录 {parquet_dir} 中未找到任何.parquet文件")
             return False
         
+        # 文件列表拼接后一次输出，文件很多时避免逐行写 stdout
         print(f"📁 找到 {len(parquet_files)} 个parquet文件:")
-        for file in parquet_files:
-            print(f"   - {file.name}")
-        
-        # 导入数据
-        importer = MilvusParquetImporter(manager)
-        results = importer.import_directory(parquet_dir)
+        print("\n".join(f"   - {file.name}" for file in parquet_files))
+        
+        # 导入数据：各文件写入不同集合，按 MILVUS_IMPORT_CONCURRENCY 并发导入，每批 MILVUS_INSERT_BATCH 行
+        config = get_milvus_config()
+        importer = MilvusParquetImporter(
+            manager,
+            embedding_cache_dir=config.embedding_cache_dir,
+            file_concurrency=config.import_concurrency,
+            batch_size=config.insert_batch_size,
+        )
+        try:
+            results = importer.import_files(parquet_files)
+        finally:
+            importer.close()
         
         print(f"\n📊 导入结果:")
-        total = 0
-        for file, count in results.items():
-            print(f"   {file}: {count} 条")
-            total += count
-        print(f"\n总计: {total} 条数据")
+        if results:
+            print("\n".join(f"   {file}: {count} 条" for file, count in results.items()))
+        print(f"\n总计: {sum(results.values())} 条数据")
         return True
         
-    except Exception as e:
-        logger.error(f"导入数据失败: {e}")
+    except MILVUS_ERRORS as e:
+        logger.error("导入数据失败: %s", e)
         print(f"❌ 导入数据失败: {e}")
         return False
 
 
-def reset_database(client: MilvusClient) -> bool:
-    """重置数据库"""
+def reset_database(client: MilvusClient, assume_yes: bool = False) -> bool:
+    """重置数据库（assume_yes 为 True 时跳过确认提示，供脚本化调用）"""
     print("\n🗑️  步骤3: 重置数据库")
     print("-" * 40)
     
     try:
-        from .milvus_reset import MilvusReset
-        
         # 复用同一个 MilvusClient，避免在脚本中直接管理连接
         reset_tool = MilvusReset(client=client)
         
@@ -148,17 +158,18 @@ def reset_database(client: MilvusClient) -> bool:
             if collection.startswith("graphrag_"):
                 print(f"   - {collection}")
         
-        confirmation = input("\n确定要删除所有GraphRAG集合吗？(y/N): ")
-        if confirmation.lower() not in ['y', 'yes']:
-            print("操作已取消")
-            return False
+        if not assume_yes:
+            confirmation = input("\n确定要删除所有GraphRAG集合吗？(y/N): ")
+            if confirmation.lower() not in ['y', 'yes']:
+                print("操作已取消")
+                return False
         
         dropped = reset_tool.drop_all_collections()
         print(f"✅ 成功删除 {dropped} 个集合")
         return True
         
-    except Exception as e:
-        logger.error(f"重置数据库失败: {e}")
+    except MILVUS_ERRORS as e:
+        logger.error("重置数据库失败: %s", e)
         print(f"❌ 重置数据库失败: {e}")
         return False
 
@@ -178,22 +189,36 @@ def show_status(client: MilvusClient) -> bool:
         
         print(f"📊 找到 {len(existing)} 个集合:")
         
-        for collection_name in existing:
-            # 提取集合类型
-            if collection_name.startswith(manager.collection_prefix):
-                collection_type = collection_name[len(manager.collection_prefix):]
-                try:
-                    info = manager.get_collection_info(collection_type)
-                    print(f"   - {collection_name}: {info['num_entities']} 条记录")
-                except Exception as e:
-                    print(f"   - {collection_name}: 无法获取信息 ({e})")
-            else:
+        prefix = manager.collection_prefix
+        
+        def fetch_info(collection_name: str):
+            """按集合名提取集合类型并读取信息；非 GraphRAG 集合返回 None，读取失败返回异常"""
+            # removeprefix 一次完成判断与截取，不含前缀时原样返回同一个字符串对象
+            collection_type = collection_name.removeprefix(prefix)
+            if collection_type is collection_name:
+                return None
+            try:
+                return manager.get_collection_info(collection_type)
+            except (*MILVUS_ERRORS, ValueError) as e:
+                # ValueError：集合在缓存的列表之后已被删除，只影响这一行的输出
+                return e
+        
+        # 各集合的信息查询相互独立，并发发出后按原顺序输出
+        with ThreadPoolExecutor(max_workers=min(16, len(existing))) as executor:
+            infos = list(executor.map(fetch_info, existing))
+        
+        for collection_name, info in zip(existing, infos):
+            if info is None:
                 print(f"   - {collection_name}: 非GraphRAG集合")
+            elif isinstance(info, Exception):
+                print(f"   - {collection_name}: 无法获取信息 ({info})")
+            else:
+                print(f"   - {collection_name}: {info['num_entities']} 条记录")
         
         return True
         
-    except Exception as e:
-        logger.error(f"获取状态失败: {e}")
+    except MILVUS_ERRORS as e:
+        logger.error("获取状态失败: %s", e)
         print(f"❌ 获取状态失败: {e}")
         return False
 
@@ -244,8 +269,8 @@ def test_query(client: MilvusClient) -> bool:
         
         return True
         
-    except Exception as e:
-        logger.error(f"测试查询失败: {e}")
+    except MILVUS_ERRORS as e:
+        logger.error("测试查询失败: %s", e)
         print(f"❌ 测试查询失败: {e}")
         return False
 
@@ -257,7 +282,6 @@ def main():
     load_dotenv(os.path.join(project_root, ".env"))
     
     # 获取并显示Milvus配置
-    from ..core.config import get_milvus_config
     milvus_config = get_milvus_config()
     
     print(f"ℹ️ Milvus配置: {milvus_config.host}:{milvus_config.port}")
@@ -300,7 +324,7 @@ def main():
                 print("\n\n👋 操作已取消，再见!")
                 break
             except Exception as e:
-                logger.error(f"操作失败: {e}")
+                logger.error("操作失败: %s", e)
                 print(f"❌ 操作失败: {e}")
             
             input("\n按回车键继续...")
@@ -0,0 +1,29 @@
+"""
+测试共享的 fixture。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Iterator, Tuple
+
+import pytest
+
+from milvus.query.client import MilvusClient
+
+
+@pytest.fixture(scope="session")
+def milvus_session() -> Iterator[Tuple[MilvusClient, asyncio.Runner]]:
+    """
+    整个测试会话共享一个已连接的 MilvusClient 及其事件循环。
+
+    各用例通过返回的 Runner 在同一个事件循环中执行协程，避免每个用例重复连接/断开，
+    也不依赖 pytest-asyncio 等插件。
+    """
+    client = MilvusClient()
+    with asyncio.Runner() as runner:
+        runner.run(client.initialize())
+        try:
+            yield client, runner
+        finally:
+            runner.run(client.close())
@@ -0,0 +1,87 @@
+"""
+BulkInsert 导入流程的单元测试。
+
+替换 RemoteBulkWriter 与 pymilvus.utility，不依赖 MinIO 与真实的 Milvus 服务。
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import pytest
+from pymilvus.client.types import BulkInsertState
+
+import milvus.core.bulk_import as bulk_mod
+from milvus.core.bulk_import import BulkStorageConfig, bulk_insert_records
+
+
+class FakeWriter:
+    def __init__(self) -> None:
+        self.rows: List[Dict[str, Any]] = []
+        self.batch_files: List[List[str]] = []
+
+    def append_row(self, row: Dict[str, Any]) -> None:
+        self.rows.append(row)
+
+    def commit(self) -> None:
+        self.batch_files = [["graphrag_bulk/1.parquet"], ["graphrag_bulk/2.parquet"]]
+
+
+class FakeBulkUtility:
+    def __init__(self, states: List[int]) -> None:
+        self.states = list(states)
+        self.submitted: List[List[str]] = []
+
+    def do_bulk_insert(self, collection_name: str, files: List[str], **kwargs: Any) -> int:
+        self.submitted.append(files)
+        return len(self.submitted)
+
+    def get_bulk_insert_state(self, task_id: int, **kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(
+            state=self.states.pop(0),
+            row_count=1,
+            failed_reason="bad file",
+            state_name="",
+        )
+
+
+@pytest.fixture
+def fake_writer(monkeypatch: pytest.MonkeyPatch) -> FakeWriter:
+    writer = FakeWriter()
+    monkeypatch.setattr(bulk_mod, "_create_writer", lambda collection, storage: writer)
+    return writer
+
+
+def test_bulk_insert_submits_every_batch(monkeypatch: pytest.MonkeyPatch, fake_writer: FakeWriter) -> None:
+    """每个暂存批次提交一个任务，并等待全部任务完成。"""
+    utility = FakeBulkUtility(
+        [BulkInsertState.ImportStarted, BulkInsertState.ImportCompleted, BulkInsertState.ImportCompleted]
+    )
+    monkeypatch.setattr(bulk_mod, "utility", utility)
+
+    records = [{"source_id": "1", "text": "a", "embedding": [0.0], "extra": "x"}]
+    count = bulk_insert_records(
+        SimpleNamespace(name="graphrag_text_unit"),
+        ["source_id", "text", "embedding"],
+        records,
+        BulkStorageConfig(),
+        poll_interval=0,
+    )
+
+    assert count == 2
+    assert len(utility.submitted) == 2
+    assert fake_writer.rows == [{"source_id": "1", "text": "a", "embedding": [0.0]}]
+
+
+def test_bulk_insert_raises_on_failed_task(monkeypatch: pytest.MonkeyPatch, fake_writer: FakeWriter) -> None:
+    monkeypatch.setattr(bulk_mod, "utility", FakeBulkUtility([BulkInsertState.ImportFailed]))
+
+    with pytest.raises(RuntimeError, match="bad file"):
+        bulk_insert_records(
+            SimpleNamespace(name="graphrag_text_unit"),
+            ["source_id"],
+            [{"source_id": "1"}],
+            BulkStorageConfig(),
+            poll_interval=0,
+        )
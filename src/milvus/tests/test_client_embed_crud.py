@@ -32,6 +32,9 @@ class DummyEmbeddingGenerator:
         self.last_texts = texts
         return [[1.0, 2.0, 3.0, 4.0] for _ in texts]
 
+    async def aclose(self) -> None:
+        return None
+
 
 @pytest.fixture(autouse=True)
 def patch_embedding_generator(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -73,6 +76,10 @@ def _build_client(monkeypatch: pytest.MonkeyPatch) -> MilvusClient:
             self.last_insert_args = (collection_type, record)
             return 1
 
+        def insert_records(self, collection_type: str, records: List[dict[str, Any]]) -> int:
+            self.last_insert_args = (collection_type, records)
+            return len(records)
+
     dummy_store = DummyStore()
     client.storage = dummy_store  # type: ignore[assignment]
 
@@ -99,21 +106,28 @@ def test_delete_record_delegates_to_storage(monkeypatch: pytest.MonkeyPatch) ->
     )
 
 
-@pytest.mark.parametrize(
-    "collection_type,data,expected_text_field,expected_text",
-    [
-        ("text_unit", {"source_id": "doc_1", "text": "Hello"}, "text", "Hello"),
-        ("relationship", {"source_id": "rel_1", "description": "desc"}, "description", "desc"),
-        ("entity_title", {"source_id": "ent_1", "title": "Title"}, "title", "Title"),
-        (
-            "entity_description",
-            {"source_id": "ent_2", "title": "T", "description": "D"},
-            "title_description",
-            "T:D",
-        ),
-        ("community_summary", {"source_id": "c1", "summary": "Sum"}, "summary", "Sum"),
-    ],
-)
+# 各集合类型的 (集合类型, 输入字段, 文本字段, 期望用于生成 embedding 的文本)
+_RECORD_CASES = [
+    ("text_unit", {"source_id": "doc_1", "text": "Hello"}, "text", "Hello"),
+    ("relationship", {"source_id": "rel_1", "description": "desc"}, "description", "desc"),
+    ("entity_title", {"source_id": "ent_1", "title": "Title"}, "title", "Title"),
+    (
+        "entity_description",
+        {"source_id": "ent_2", "title": "T", "description": "D"},
+        "title_description",
+        "T:D",
+    ),
+    (
+        "entity_description",
+        {"source_id": "ent_3", "title": "T", "summary": "S"},
+        "title_description",
+        "T:S",
+    ),
+    ("community_summary", {"source_id": "c1", "summary": "Sum"}, "summary", "Sum"),
+]
+
+
+@pytest.mark.parametrize("collection_type,data,expected_text_field,expected_text", _RECORD_CASES)
 def test_add_embedding_record_builds_record_and_calls_storage(
     monkeypatch: pytest.MonkeyPatch,
     collection_type: str,
@@ -147,3 +161,71 @@ def test_add_embedding_record_builds_record_and_calls_storage(
     assert getattr(eg, "last_text", None) == (expected_text or "空内容")
 
 
+@pytest.mark.parametrize("collection_type,data,expected_text_field,expected_text", _RECORD_CASES)
+def test_add_embedding_records_matches_single_record_path(
+    monkeypatch: pytest.MonkeyPatch,
+    collection_type: str,
+    data: dict[str, Any],
+    expected_text_field: str,
+    expected_text: str,
+) -> None:
+    """批量入口与单条入口选取相同的文本字段，整批只调用一次 embed_batch 与一次 insert_records。"""
+    client = _build_client(monkeypatch)
+    dummy_store = client.storage  # type: ignore[assignment]
+    eg = client.query_manager.embedding_generator  # type: ignore[attr-defined]
+
+    inserted = client.add_embedding_records(collection_type, [data, data])
+
+    assert inserted == 2
+    assert eg.last_texts == [expected_text, expected_text]
+    stored_collection_type, records = dummy_store.last_insert_args  # type: ignore[misc]
+    assert stored_collection_type == collection_type
+    assert [r[expected_text_field] for r in records] == [expected_text, expected_text]
+    assert all(r["source_id"] == data["source_id"] for r in records)
+
+
+def test_crud_requires_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _build_client(monkeypatch)
+    client._connected = False  # noqa: SLF001
+
+    with pytest.raises(RuntimeError, match="尚未连接"):
+        client.delete_record("text_unit", "source_id", "1")
+    with pytest.raises(RuntimeError, match="尚未连接"):
+        client.add_embedding_record("text_unit", {"source_id": "1", "text": "x"})
+
+    client._connected = True  # noqa: SLF001
+    assert client.delete_record("text_unit", "source_id", "1") == 3
+
+
+def test_add_embedding_records_embeds_whole_batch_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _build_client(monkeypatch)
+    dummy_store = client.storage  # type: ignore[assignment]
+    eg = client.query_manager.embedding_generator  # type: ignore[attr-defined]
+
+    inserted = client.add_embedding_records(
+        "entity_description",
+        [{"source_id": "e1", "title": "A", "description": "x"}, {"source_id": "e2", "title": "B", "summary": "y"}],
+    )
+
+    assert inserted == 2
+    assert eg.last_texts == ["A:x", "B:y"]
+    assert eg.last_text is None
+    collection_type, records = dummy_store.last_insert_args  # type: ignore[misc]
+    assert collection_type == "entity_description"
+    assert [r["title_description"] for r in records] == ["A:x", "B:y"]
+    assert all(r["embedding"] == [1.0, 2.0, 3.0, 4.0] for r in records)
+    assert client.add_embedding_records("entity_description", []) == 0
+
+
+def test_add_embedding_record_keeps_str_values_and_blanks_none(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = _build_client(monkeypatch)
+    text = "".join(["He", "llo"])
+
+    client.add_embedding_record("text_unit", {"source_id": 7, "text": text})
+    _, record = client.storage.last_insert_args  # type: ignore[attr-defined]
+    assert record["source_id"] == "7"
+    assert record["text"] is text
+
+    client.add_embedding_record("text_unit", {"source_id": "1", "text": None})
+    _, record = client.storage.last_insert_args  # type: ignore[attr-defined]
+    assert record["text"] == ""
@@ -0,0 +1,253 @@
+"""
+MilvusCollectionManager 的单元测试。
+
+通过 monkeypatch 替换 pymilvus 的 utility 与 Collection，不依赖真实的 Milvus 服务，
+只验证集合管理逻辑及其发出的 RPC 次数。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import pytest
+
+import milvus.core.collection_manager as cm_mod
+from milvus.core.collection_manager import MilvusCollectionManager
+from milvus.core.schema import get_search_params
+
+
+class FakeUtility:
+    """记录调用次数的 pymilvus.utility 替身。"""
+
+    def __init__(self, existing: List[str]) -> None:
+        self.existing = list(existing)
+        self.calls: List[str] = []
+        self.dropped: List[str] = []
+
+    def list_collections(self, **kwargs: Any) -> List[str]:
+        self.calls.append("list_collections")
+        return list(self.existing)
+
+    def has_collection(self, name: str, **kwargs: Any) -> bool:
+        self.calls.append("has_collection")
+        return name in self.existing
+
+    def drop_collection(self, name: str, **kwargs: Any) -> None:
+        self.calls.append("drop_collection")
+        self.dropped.append(name)
+        self.existing.remove(name)
+
+
+class FakeCollection:
+    """不发起 RPC 的 Collection 替身。"""
+
+    def __init__(self, name: str, schema: Any = None, **kwargs: Any) -> None:
+        self.name = name
+        self.schema = schema
+        self.indexes: List[tuple[str, dict]] = []
+
+    def create_index(self, field_name: str, index_params: dict, **kwargs: Any) -> None:
+        self.indexes.append((field_name, index_params))
+
+
+@pytest.fixture
+def fake_utility(monkeypatch: pytest.MonkeyPatch) -> FakeUtility:
+    utility = FakeUtility(
+        existing=[
+            "graphrag_text_unit",
+            "graphrag_relationship",
+            "graphrag_custom",
+            "other_collection",
+        ]
+    )
+    monkeypatch.setattr(cm_mod, "utility", utility)
+    monkeypatch.setattr(cm_mod, "Collection", FakeCollection)
+    return utility
+
+
+def test_drop_collections_lists_once(fake_utility: FakeUtility) -> None:
+    """drop_collections 只列举一次集合，不再逐个调用 has_collection。"""
+    manager = MilvusCollectionManager()
+
+    dropped = manager.drop_collections()
+
+    assert dropped == 3
+    assert fake_utility.calls.count("list_collections") == 1
+    assert "has_collection" not in fake_utility.calls
+    assert fake_utility.existing == ["other_collection"]
+
+
+def test_create_collections_lists_once(fake_utility: FakeUtility) -> None:
+    """create_collections 基于一次列举结果判断集合是否已存在。"""
+    manager = MilvusCollectionManager()
+
+    collections = manager.create_collections()
+
+    assert set(collections) == set(cm_mod.COLLECTION_CONFIGS)
+    assert fake_utility.calls.count("list_collections") == 1
+    assert "has_collection" not in fake_utility.calls
+    # 已存在的集合直接加载，不重复创建索引
+    assert collections["text_unit"].indexes == []
+    assert collections["document"].indexes
+
+
+def test_create_collections_uses_configured_index(fake_utility: FakeUtility) -> None:
+    """新建集合默认使用 HNSW 索引，也可以切换为其他索引类型。"""
+    collections = MilvusCollectionManager().create_collections()
+    field_name, index_params = collections["document"].indexes[0]
+    assert field_name == "embedding"
+    assert index_params["index_type"] == "HNSW"
+    assert index_params["params"] == {"M": 16, "efConstruction": 200}
+
+    manager = MilvusCollectionManager(index_type="diskann")
+    _, index_params = manager.create_collections()["document"].indexes[0]
+    assert index_params["index_type"] == "DISKANN"
+
+    with pytest.raises(ValueError):
+        MilvusCollectionManager(index_type="FLAT_UNKNOWN")
+
+
+def test_search_params_follow_index_type() -> None:
+    """HNSW 的 ef 不能小于 topK。"""
+    assert get_search_params("HNSW", limit=10)["params"] == {"ef": 64}
+    assert get_search_params("HNSW", limit=200)["params"] == {"ef": 200}
+    assert get_search_params("IVF_FLAT", limit=10)["params"] == {"nprobe": 11}
+    assert get_search_params("IVF_FLAT", nlist=1024)["params"] == {"nprobe": 32}
+    assert get_search_params("IVF_FLAT", metric_type="L2")["metric_type"] == "L2"
+
+
+class FakeConnections:
+    """记录建立/断开的连接 alias。"""
+
+    def __init__(self) -> None:
+        self.aliases: List[str] = []
+        self.kwargs: List[Dict[str, Any]] = []
+
+    def connect(self, alias: str = "default", **kwargs: Any) -> None:
+        self.aliases.append(alias)
+        self.kwargs.append(kwargs)
+
+    def disconnect(self, alias: str) -> None:
+        self.aliases.remove(alias)
+
+
+def test_connect_builds_alias_pool(monkeypatch: pytest.MonkeyPatch, fake_utility: FakeUtility) -> None:
+    """connect 建立多个具名连接，并按轮询方式分配给后续请求。"""
+    fake_connections = FakeConnections()
+    monkeypatch.setattr(cm_mod, "connections", fake_connections)
+    manager = MilvusCollectionManager(pool_size=3)
+
+    manager.connect(host="localhost", port=19530)
+
+    tag = manager._alias_tag  # noqa: SLF001
+    expected = [f"graphrag_{tag}_{i}" for i in range(3)]
+    assert fake_connections.aliases == expected
+    assert all(kwargs["keep_alive"] for kwargs in fake_connections.kwargs)
+    aliases = [manager._alias() for _ in range(3)]  # noqa: SLF001
+    assert sorted(aliases) == expected
+    assert manager._alias() == aliases[0]  # noqa: SLF001
+
+    manager.disconnect()
+    assert fake_connections.aliases == []
+    assert manager._alias() == "default"  # noqa: SLF001
+
+
+def test_managers_with_same_prefix_use_distinct_aliases(
+    monkeypatch: pytest.MonkeyPatch, fake_utility: FakeUtility
+) -> None:
+    """同前缀的两个管理器使用互不相同的 alias，断开其中一个不影响另一个的连接。"""
+    fake_connections = FakeConnections()
+    monkeypatch.setattr(cm_mod, "connections", fake_connections)
+    first = MilvusCollectionManager(pool_size=2)
+    second = MilvusCollectionManager(pool_size=2)
+
+    first.connect(host="localhost", port=19530)
+    second.connect(host="localhost", port=19530)
+    assert len(set(fake_connections.aliases)) == 4
+
+    first.disconnect()
+    assert sorted(fake_connections.aliases) == sorted(second._aliases)  # noqa: SLF001
+    assert len(fake_connections.aliases) == 2
+
+
+def test_existence_checks_share_cached_listing(fake_utility: FakeUtility) -> None:
+    """TTL 内的存在性检查复用同一次 list_collections 结果，增删集合后缓存失效。"""
+    manager = MilvusCollectionManager()
+
+    assert manager.collection_exists("text_unit")
+    assert manager.collection_exists("relationship")
+    assert not manager.collection_exists("document")
+    manager.get_collection("text_unit")
+    assert fake_utility.calls == ["list_collections"]
+
+    manager.drop_collections()
+    assert not manager.collection_exists("text_unit")
+    assert fake_utility.calls.count("list_collections") == 2
+
+
+def test_drop_collections_removes_extras_sharing_known_suffix(fake_utility: FakeUtility) -> None:
+    """与已知集合同后缀的额外集合（如 graphrag_old_text_unit）也会被删除。"""
+    fake_utility.existing.append("graphrag_old_text_unit")
+    manager = MilvusCollectionManager()
+
+    dropped = manager.drop_collections()
+
+    assert dropped == 4
+    assert "graphrag_old_text_unit" in fake_utility.dropped
+    assert fake_utility.existing == ["other_collection"]
+
+
+def test_connect_preloads_existing_collections(
+    monkeypatch: pytest.MonkeyPatch, fake_utility: FakeUtility
+) -> None:
+    """connect 后已存在的集合对象只构造一次，之后的操作复用缓存。"""
+    monkeypatch.setattr(cm_mod, "connections", FakeConnections())
+    constructed: List[str] = []
+
+    class CountingCollection(FakeCollection):
+        def __init__(self, name: str, schema: Any = None, **kwargs: Any) -> None:
+            constructed.append(name)
+            super().__init__(name, schema, **kwargs)
+
+    monkeypatch.setattr(cm_mod, "Collection", CountingCollection)
+    manager = MilvusCollectionManager()
+    manager.connect(host="localhost", port=19530)
+
+    assert sorted(constructed) == ["graphrag_relationship", "graphrag_text_unit"]
+
+    manager.get_collection("text_unit")
+    collections = manager.create_collections()
+    assert collections["text_unit"] is manager.get_collection("text_unit")
+    assert constructed.count("graphrag_text_unit") == 1
+
+
+def test_full_name_handles_unknown_collection_names() -> None:
+    manager = MilvusCollectionManager(collection_prefix="p_")
+    assert manager.full_name("entity_title") == "p_entity_title"
+    assert manager.full_name("custom") == "p_custom"
+
+
+class LoadCountingCollection:
+    def __init__(self) -> None:
+        self.loads = 0
+        self.releases = 0
+
+    def load(self) -> None:
+        self.loads += 1
+
+    def release(self) -> None:
+        self.releases += 1
+
+
+def test_ensure_loaded_loads_once_until_released() -> None:
+    manager = MilvusCollectionManager()
+    collection = LoadCountingCollection()
+    manager.collections["text_unit"] = collection  # type: ignore[assignment]
+
+    for _ in range(3):
+        assert manager.ensure_loaded("text_unit") is collection
+    assert collection.loads == 1
+
+    manager.release_collection("text_unit")
+    manager.ensure_loaded("text_unit")
+    assert (collection.loads, collection.releases) == (2, 1)
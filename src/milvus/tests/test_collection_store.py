@@ -0,0 +1,370 @@
+"""
+MilvusCollectionStore 的单元测试。
+
+使用不发起 RPC 的集合替身，只验证写入/删除与 flush 的调用关系。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from milvus.core.constants import EMBEDDING_DTYPE
+import milvus.legacy.collection_store as store_mod
+from milvus.legacy.collection_store import MilvusCollectionStore
+
+
+def _wait_pending(store: MilvusCollectionStore, collection_type: str, count: int, timeout: float = 5.0) -> None:
+    """等待合并队列中至少有 count 条待写入记录，超时则让测试失败而不是一直空转。"""
+    deadline = time.monotonic() + timeout
+    while len(store._coalescers[collection_type]._pending) < count:  # noqa: SLF001
+        if time.monotonic() > deadline:
+            pytest.fail(f"等待 {count} 条记录进入 '{collection_type}' 合并队列超时")
+        time.sleep(0.001)
+
+
+class FakeCollection:
+    def __init__(self) -> None:
+        self.inserted: List[List[Any]] = []
+        self.deleted: List[str] = []
+        self.delete_params: List[Any] = []
+        self.flushes = 0
+        self.schema = SimpleNamespace(primary_field=SimpleNamespace(name="id"))
+
+    def insert(self, data: List[Any], **kwargs: Any) -> SimpleNamespace:
+        self.inserted.append(data)
+        return SimpleNamespace(primary_keys=list(range(len(data[0]))))
+
+    def delete(self, expr: str, **kwargs: Any) -> SimpleNamespace:
+        self.deleted.append(expr)
+        self.delete_params.append(kwargs.get("expr_params"))
+        return SimpleNamespace(delete_count=1)
+
+    def flush(self, **kwargs: Any) -> None:
+        self.flushes += 1
+
+
+def test_writes_defer_flush_until_flush_all() -> None:
+    """写入与删除不再逐次 flush，flush_all 只处理有过写入的集合。"""
+    store = MilvusCollectionStore()
+    titles, summaries = FakeCollection(), FakeCollection()
+    store.set_collection("entity_title", titles)
+    store.set_collection("community_summary", summaries)
+
+    store.insert_single_record("entity_title", {"source_id": "1", "title": "A", "embedding": [0.0] * 4})
+    store.delete_by_field("entity_title", "source_id", "2")
+    assert titles.flushes == 0
+
+    store.flush_all()
+    assert titles.flushes == 1
+    assert summaries.flushes == 0
+
+    # 没有新的写入时不会重复 flush
+    store.flush()
+    assert titles.flushes == 1
+
+
+def test_insert_data_builds_columns_with_contiguous_embeddings() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("relationship", collection)
+    rows = [
+        {"source_id": "1", "description": "a", "embedding": [1.0, 0.0], "extra": "x"},
+        {"source_id": "2", "description": "b", "embedding": [0.0, 1.0]},
+    ]
+
+    assert store._insert_data("relationship", rows, ["source_id", "description", "embedding"]) == [0, 1]  # noqa: SLF001
+
+    source_ids, descriptions, embeddings = collection.inserted[0]
+    assert source_ids == ["1", "2"]
+    assert descriptions == ["a", "b"]
+    assert isinstance(embeddings, np.ndarray)
+    assert embeddings.shape == (2, 2)
+    assert embeddings.dtype == EMBEDDING_DTYPE
+
+    with pytest.raises(ValueError, match="description"):
+        store._insert_data(  # noqa: SLF001
+            "relationship", [{"source_id": "3", "embedding": [0.0, 0.0]}], ["source_id", "description", "embedding"]
+        )
+
+
+def test_insert_data_splits_large_writes() -> None:
+    store = MilvusCollectionStore(insert_batch_size=2)
+    collection = FakeCollection()
+    store.set_collection("text_unit", collection)
+    rows = [{"source_id": str(i), "text": "t", "embedding": [0.0, 1.0]} for i in range(5)]
+
+    keys = store._insert_data("text_unit", rows, ["source_id", "text", "embedding"])  # noqa: SLF001
+
+    assert [len(batch[0]) for batch in collection.inserted] == [2, 2, 1]
+    assert len(keys) == 5
+
+
+def test_async_insert_runs_batches_concurrently_and_keeps_key_order() -> None:
+    store = MilvusCollectionStore(insert_batch_size=2, insert_concurrency=3)
+    collection = FakeCollection()
+    store.set_collection("text_unit", collection)
+    rows = [{"source_id": str(i), "text": "t", "embedding": [0.0, 1.0]} for i in range(5)]
+
+    keys = asyncio.run(store.insert_text_units(rows))
+
+    assert sorted(len(batch[0]) for batch in collection.inserted) == [1, 2, 2]
+    assert keys == [0, 1, 0, 1, 0]
+    store.flush_all()
+    assert collection.flushes == 1
+
+
+def test_insert_entity_descriptions_concatenates_whole_columns() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_description", collection)
+    entities = [
+        {"source_id": "1", "title": "A", "description": "da", "embedding": [1.0, 0.0]},
+        {"source_id": "2", "title": "B", "description": None, "embedding": [0.0, 1.0]},
+    ]
+
+    asyncio.run(store.insert_entity_descriptions(entities))
+
+    source_ids, titles, descriptions, combined, embeddings = collection.inserted[0]
+    assert source_ids == ["1", "2"]
+    assert descriptions == ["da", ""]
+    assert combined == ["A:da", "B:"]
+    assert embeddings.shape == (2, 2)
+
+
+def test_clear_collection_deletes_with_single_expression() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("text_unit", collection)
+
+    asyncio.run(store.clear_collection("text_unit"))
+
+    assert collection.deleted == ["id >= 0"]
+    assert collection.flushes == 1
+
+
+def test_delete_by_source_ids_batches_with_template_params(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(store_mod, "DELETE_BATCH_SIZE", 2)
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("text_unit", collection)
+
+    count = asyncio.run(store.delete_by_source_ids("text_unit", ["a", "b'c", "d\\e"]))
+
+    assert count == 2
+    # 表达式形状固定，取值（含引号、反斜杠）通过模板参数原样传入
+    assert collection.deleted == ["source_id in {values}"] * 2
+    assert sorted(params["values"] for params in collection.delete_params) == [["a", "b'c"], ["d\\e"]]
+
+
+def test_delete_by_field_accepts_single_value_or_list() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_title", collection)
+
+    store.delete_by_field("entity_title", "title", "a'b")
+    store.delete_by_field("entity_title", "source_id", ["1", "2"])
+
+    assert collection.deleted == ["title in {values}", "source_id in {values}"]
+    assert collection.delete_params == [{"values": ["a'b"]}, {"values": ["1", "2"]}]
+
+
+def test_concurrent_single_inserts_are_coalesced() -> None:
+    """首个 insert 在途期间到达的单条写入合并为下一次 insert。"""
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_title", collection)
+    started, release = threading.Event(), threading.Event()
+    insert = collection.insert
+
+    def slow_insert(data: List[Any], **kwargs: Any) -> SimpleNamespace:
+        started.set()
+        release.wait(5)
+        # 列缓冲会被下一次写入复用，这里保存副本
+        return insert([list(column) for column in data], **kwargs)
+
+    store._inserters["entity_title"] = slow_insert  # noqa: SLF001
+
+    def write(i: int) -> None:
+        store.insert_single_record("entity_title", {"source_id": str(i), "title": "t", "embedding": [0.0] * 4})
+
+    first = threading.Thread(target=write, args=(0,))
+    first.start()
+    started.wait(5)
+    others = [threading.Thread(target=write, args=(i,)) for i in range(1, 6)]
+    for thread in others:
+        thread.start()
+    _wait_pending(store, "entity_title", 5)
+    release.set()
+    for thread in [first, *others]:
+        thread.join(5)
+
+    assert [len(batch[0]) for batch in collection.inserted] == [1, 5]
+    assert sorted(collection.inserted[1][0]) == ["1", "2", "3", "4", "5"]
+
+
+def test_coalesced_insert_failure_reaches_every_caller() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_title", collection)
+
+    def broken(data: List[Any], **kwargs: Any) -> None:
+        raise RuntimeError("写入失败")
+
+    store._inserters["entity_title"] = broken  # noqa: SLF001
+    with pytest.raises(RuntimeError, match="写入失败"):
+        store.insert_single_record("entity_title", {"source_id": "1", "title": "t", "embedding": [0.0] * 4})
+    assert "entity_title" not in store._dirty  # noqa: SLF001
+
+
+def test_invalid_single_record_fails_only_its_caller() -> None:
+    """缺字段的记录在入队前被拒绝，同批合并写入的其他记录照常写入。"""
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_title", collection)
+    started, release = threading.Event(), threading.Event()
+    insert = collection.insert
+
+    def slow_insert(data: List[Any], **kwargs: Any) -> SimpleNamespace:
+        started.set()
+        release.wait(5)
+        return insert([list(column) for column in data], **kwargs)
+
+    store._inserters["entity_title"] = slow_insert  # noqa: SLF001
+    errors: List[BaseException] = []
+
+    def write(record: Dict[str, Any]) -> None:
+        try:
+            store.insert_single_record("entity_title", record)
+        except ValueError as e:
+            errors.append(e)
+
+    first = threading.Thread(target=write, args=({"source_id": "0", "title": "t", "embedding": [0.0] * 4},))
+    first.start()
+    started.wait(5)
+    valid = threading.Thread(target=write, args=({"source_id": "1", "title": "t", "embedding": [0.0] * 4},))
+    valid.start()
+    _wait_pending(store, "entity_title", 1)
+    write({"source_id": "2", "embedding": [0.0] * 4})
+    assert len(store._coalescers["entity_title"]._pending) == 1  # noqa: SLF001
+    release.set()
+    for thread in (first, valid):
+        thread.join(5)
+
+    assert len(errors) == 1 and "缺少字段" in str(errors[0])
+    assert [batch[0] for batch in collection.inserted] == [["0"], ["1"]]
+
+
+def test_insert_data_accepts_ndarray_embeddings_from_dataframe() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_title", collection)
+    vectors = np.ones((3, 8), dtype=np.float64)
+    df = pd.DataFrame({"source_id": ["a", "b", "c"], "title": ["x", "y", "z"], "embedding": list(vectors)})
+
+    store._insert_data("entity_title", df, ["source_id", "title", "embedding"])  # noqa: SLF001
+
+    embeddings = collection.inserted[0][2]
+    assert embeddings.shape == (3, 8)
+    assert embeddings.dtype == EMBEDDING_DTYPE
+    assert embeddings.flags["C_CONTIGUOUS"]
+
+    # 对象数组（逐行向量）同样堆叠为连续矩阵
+    stacked = store_mod.to_embedding_array(df["embedding"].to_numpy())
+    assert stacked.shape == (3, 8) and stacked.flags["C_CONTIGUOUS"]
+
+
+def test_batch_insert_from_dataframe_writes_columns_directly() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_description", collection)
+    df = pd.DataFrame(
+        {"id": ["e1", "e2"], "title": ["A", "B"], "description": ["da", "db"], "embedding": list(np.ones((2, 4)))}
+    )
+
+    keys = asyncio.run(store.batch_insert_from_dataframe("entity_description", df))
+
+    assert keys == [0, 1]
+    source_ids, titles, descriptions, combined, vectors = collection.inserted[0]
+    assert source_ids == ["e1", "e2"]
+    assert combined == ["A:da", "B:db"]
+    assert vectors.shape == (2, 4)
+    # 调用方的 DataFrame 不被修改
+    assert list(df.columns) == ["id", "title", "description", "embedding"]
+
+
+def test_single_inserts_reuse_column_buffers() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_title", collection)
+
+    for i in range(2):
+        store.insert_single_record("entity_title", {"source_id": str(i), "title": "t", "embedding": [0.0] * 4})
+
+    first, second = collection.inserted
+    assert first is second
+    assert first[0] == ["1"]
+    assert first[2].shape == (1, 4)
+    with pytest.raises(ValueError, match="缺少字段"):
+        store.insert_single_record("entity_title", {"source_id": "x", "embedding": [0.0] * 4})
+
+
+def test_large_dataframe_routes_to_bulk_insert(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: List[Any] = []
+
+    def fake_bulk_insert(collection: Any, field_names: Any, records: Any, storage: Any, using: str) -> int:
+        calls.append((tuple(field_names), len(records), storage, using))
+        return len(records)
+
+    monkeypatch.setattr(store_mod, "bulk_insert_records", fake_bulk_insert)
+    storage = store_mod.BulkStorageConfig()
+    store = MilvusCollectionStore(bulk_storage=storage, bulk_threshold=3, connection_alias=lambda: "pool_1")
+    collection = FakeCollection()
+    store.set_collection("entity_title", collection)
+
+    def frame(rows: int) -> pd.DataFrame:
+        return pd.DataFrame(
+            {"id": [str(i) for i in range(rows)], "title": ["t"] * rows, "embedding": list(np.ones((rows, 4)))}
+        )
+
+    assert asyncio.run(store.batch_insert_from_dataframe("entity_title", frame(3))) == []
+    assert calls == [(("source_id", "title", "embedding"), 3, storage, "pool_1")]
+
+    # 未达到阈值时仍走普通 insert
+    assert asyncio.run(store.batch_insert_from_dataframe("entity_title", frame(2))) == [0, 1]
+    assert len(calls) == 1
+
+
+def test_insert_records_writes_in_batches() -> None:
+    store = MilvusCollectionStore(insert_batch_size=2)
+    collection = FakeCollection()
+    store.set_collection("text_unit", collection)
+    rows = [{"source_id": str(i), "text": "t", "embedding": [0.0] * 4} for i in range(3)]
+
+    assert store.insert_records("text_unit", rows) == 3
+    assert [len(batch[0]) for batch in collection.inserted] == [2, 1]
+    with pytest.raises(ValueError, match="不支持的集合类型"):
+        store.insert_records("unknown", rows)
+
+
+def test_generic_insert_matches_typed_wrappers() -> None:
+    store = MilvusCollectionStore()
+    collection = FakeCollection()
+    store.set_collection("entity_description", collection)
+    entities = [{"source_id": "e1", "title": "A", "description": None, "embedding": [0.0] * 4}]
+
+    asyncio.run(store.insert("entity_description", entities))
+    asyncio.run(store.insert_entity_descriptions(entities))
+
+    first, second = collection.inserted
+    assert first[:4] == second[:4] == [["e1"], ["A"], [""], ["A:"]]
+    assert asyncio.run(store.insert("entity_description", [])) == []
+    with pytest.raises(ValueError, match="不支持的集合类型"):
+        asyncio.run(store.insert("unknown", entities))
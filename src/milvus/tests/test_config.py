@@ -0,0 +1,73 @@
+"""
+MilvusConfig 环境变量解析的单元测试。
+"""
+
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from milvus.core.config import MilvusConfig, get_milvus_config
+
+
+@pytest.fixture(autouse=True)
+def _clear_config_cache():
+    MilvusConfig.from_env.cache_clear()
+    yield
+    MilvusConfig.from_env.cache_clear()
+
+
+def test_from_env_reads_both_key_spellings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("milvus_host", "milvus.internal")
+    monkeypatch.setenv("MILVUS_PORT", "29530")
+    monkeypatch.delenv("MILVUS_HOST", raising=False)
+    monkeypatch.delenv("milvus_port", raising=False)
+
+    config = get_milvus_config()
+
+    assert config.host == "milvus.internal"
+    assert config.port == 29530
+    assert config.get_grpc_address() == "milvus.internal:29530"
+
+
+def test_from_env_is_cached_and_frozen(monkeypatch: pytest.MonkeyPatch) -> None:
+    """配置在进程内只解析一次，且实例不可修改。"""
+    config = get_milvus_config()
+    monkeypatch.setenv("MILVUS_COLLECTION_PREFIX", "changed_")
+
+    assert get_milvus_config() is config
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.host = "other"  # type: ignore[misc]
+
+
+def test_invalid_port_is_rejected(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("milvus_port", raising=False)
+    monkeypatch.setenv("MILVUS_PORT", "not-a-port")
+
+    with pytest.raises(ValueError):
+        get_milvus_config()
+
+
+def test_embedding_cache_dir_is_optional(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("milvus_embedding_cache_dir", raising=False)
+    monkeypatch.delenv("MILVUS_EMBEDDING_CACHE_DIR", raising=False)
+    assert get_milvus_config().embedding_cache_dir is None
+
+    MilvusConfig.from_env.cache_clear()
+    monkeypatch.setenv("MILVUS_EMBEDDING_CACHE_DIR", "/tmp/embeddings")
+    assert get_milvus_config().embedding_cache_dir == "/tmp/embeddings"
+
+
+def test_import_concurrency_reads_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("milvus_import_concurrency", raising=False)
+    monkeypatch.setenv("MILVUS_IMPORT_CONCURRENCY", "8")
+
+    assert get_milvus_config().import_concurrency == 8
+
+
+def test_insert_batch_size_reads_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("milvus_insert_batch", raising=False)
+    monkeypatch.setenv("MILVUS_INSERT_BATCH", "5000")
+
+    assert get_milvus_config().insert_batch_size == 5000
@@ -0,0 +1,285 @@
+"""
+QwenEmbeddingGenerator 的单元测试。
+
+这些测试不会访问真实的 Qwen/DashScope 服务，只验证本地的向量构造与回退逻辑。
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from openai import RateLimitError
+
+import milvus.core.embedding_generator as embedding_generator_module
+from milvus.core.constants import EMBEDDING_DIM, EMBEDDING_DTYPE
+from milvus.core.embedding_cache import EmbeddingCache
+from milvus.core.embedding_generator import QwenEmbeddingGenerator
+
+
+def _build_generator(**kwargs) -> QwenEmbeddingGenerator:
+    return QwenEmbeddingGenerator(api_key="dummy-key", **kwargs)
+
+
+def test_zero_vectors_are_contiguous_arrays() -> None:
+    """零向量回退应返回单块 ndarray（精度与向量字段一致），而不是逐条构造的 Python 列表。"""
+    generator = _build_generator()
+
+    vectors = generator.zero_vectors(3)
+    assert isinstance(vectors, np.ndarray)
+    assert vectors.shape == (3, EMBEDDING_DIM)
+    assert vectors.dtype == EMBEDDING_DTYPE
+    assert not vectors.any()
+
+    vector = generator.zero_vector()
+    assert vector.shape == (EMBEDDING_DIM,)
+    assert vector.dtype == EMBEDDING_DTYPE
+    # 单个零向量为共享的只读数组，不重复分配
+    assert generator.zero_vector() is vector
+    assert not vector.flags.writeable
+
+
+class _FakeEmbeddingItem:
+    def __init__(self, embedding: list[float]) -> None:
+        self.embedding = embedding
+
+
+class _FakeEmbeddingResponse:
+    def __init__(self, data: list[_FakeEmbeddingItem]) -> None:
+        self.data = data
+
+
+def _fake_vector(text: str) -> list[float]:
+    """以文本长度填充向量，便于断言结果与输入顺序一致。"""
+    return [float(len(text))] * EMBEDDING_DIM
+
+
+class _FakeEmbeddings:
+    """模拟 OpenAI 客户端的 embeddings 资源，可指定需要失败的输入。"""
+
+    def __init__(self, fail_on: str | None = None) -> None:
+        self.fail_on = fail_on
+        self.calls: list[list[str]] = []
+
+    def create(self, *, model: str, input: list[str]) -> _FakeEmbeddingResponse:  # noqa: A002
+        self.calls.append(list(input))
+        if self.fail_on is not None and self.fail_on in input:
+            raise RuntimeError("boom")
+        return _FakeEmbeddingResponse([_FakeEmbeddingItem(_fake_vector(text)) for text in input])
+
+
+class _FakeAsyncEmbeddings(_FakeEmbeddings):
+    async def create(self, *, model: str, input: list[str]) -> _FakeEmbeddingResponse:  # noqa: A002
+        return _FakeEmbeddings.create(self, model=model, input=input)
+
+
+class _FakeClient:
+    def __init__(self, embeddings: _FakeEmbeddings) -> None:
+        self.embeddings = embeddings
+
+
+def test_embed_batch_keeps_order_and_isolates_failed_texts() -> None:
+    """并发分块请求后结果仍按输入顺序返回，失败分块被二分重试，只有出错的文本回退为零向量。"""
+    generator = _build_generator(batch_size=2, concurrency=4, use_cache=False, normalize=False)
+    fake = _FakeEmbeddings(fail_on="ccc")
+    generator._client = _FakeClient(fake)  # noqa: SLF001
+
+    texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+    vectors = np.asarray(generator.embed_batch(texts))
+
+    assert vectors.shape == (5, EMBEDDING_DIM)
+    # ["ccc", "dddd"] 失败后拆分为两次单条请求
+    assert sorted(len(call) for call in fake.calls) == [1, 1, 1, 2, 2]
+    assert vectors[0, 0] == 1.0 and vectors[1, 0] == 2.0
+    assert not vectors[2].any()
+    assert vectors[3, 0] == 4.0
+    assert vectors[4, 0] == 5.0
+
+
+def test_aembed_batch_matches_sync_result() -> None:
+    """异步接口与同步接口返回相同的结果。"""
+    generator = _build_generator(batch_size=2, use_cache=False)
+    generator._client = _FakeClient(_FakeEmbeddings())  # noqa: SLF001
+    generator._async_client = _FakeClient(_FakeAsyncEmbeddings())  # noqa: SLF001
+
+    texts = ["a", "bb", "ccc"]
+    sync_vectors = np.asarray(generator.embed_batch(texts))
+    async_vectors = np.asarray(asyncio.run(generator.aembed_batch(texts)))
+
+    np.testing.assert_array_equal(sync_vectors, async_vectors)
+
+
+def test_embed_batch_serves_repeated_texts_from_cache(tmp_path) -> None:
+    """已嵌入过的文本命中缓存，磁盘缓存可在新的生成器实例中复用。"""
+    generator = _build_generator(cache_dir=str(tmp_path))
+    fake = _FakeEmbeddings()
+    generator._client = _FakeClient(fake)  # noqa: SLF001
+
+    first = np.asarray(generator.embed_batch(["a", "bb"]))
+    second = np.asarray(generator.embed_batch(["bb", "ccc"]))
+
+    assert fake.calls == [["a", "bb"], ["ccc"]]
+    np.testing.assert_array_equal(first[1], second[0])
+
+    restarted = _build_generator(cache_dir=str(tmp_path))
+    restarted_fake = _FakeEmbeddings()
+    restarted._client = _FakeClient(restarted_fake)  # noqa: SLF001
+    restarted.embed_batch(["a", "ccc"])
+    assert restarted_fake.calls == []
+
+
+def test_disk_cache_writes_batch_in_one_transaction(tmp_path) -> None:
+    """一批嵌入写入磁盘缓存时只提交一次事务。"""
+    cache = EmbeddingCache("m", cache_dir=str(tmp_path))
+    statements: list[str] = []
+    cache._db.set_trace_callback(statements.append)  # noqa: SLF001
+
+    cache.put_many({cache.key(str(i)): np.ones(EMBEDDING_DIM) for i in range(3)})
+
+    assert sum(stmt.startswith("COMMIT") for stmt in statements) == 1
+    cache.close()
+    reopened = EmbeddingCache("m", cache_dir=str(tmp_path))
+    assert len(reopened.get_many([reopened.key(str(i)) for i in range(3)])) == 3
+    reopened.close()
+
+
+def test_failed_chunks_are_not_cached() -> None:
+    """零向量回退结果不能写入缓存，否则后续请求会一直拿到无效向量。"""
+    generator = _build_generator(normalize=False)
+    fake = _FakeEmbeddings(fail_on="a")
+    generator._client = _FakeClient(fake)  # noqa: SLF001
+
+    generator.embed_batch(["a"])
+    fake.fail_on = None
+    vectors = np.asarray(generator.embed_batch(["a"]))
+
+    assert len(fake.calls) == 2
+    assert vectors[0, 0] == 1.0
+
+
+def test_embed_batch_returns_storage_dtype(tmp_path) -> None:
+    """返回的向量与向量字段精度一致，缓存命中与实时请求的结果类型相同。"""
+    generator = _build_generator(cache_dir=str(tmp_path))
+    generator._client = _FakeClient(_FakeEmbeddings())  # noqa: SLF001
+
+    fresh = generator.embed_batch(["a"])
+    cached = generator.embed_batch(["a"])
+
+    assert fresh[0].dtype == EMBEDDING_DTYPE
+    assert cached[0].dtype == EMBEDDING_DTYPE
+    np.testing.assert_array_equal(fresh[0], cached[0])
+
+
+def test_plan_chunks_respects_token_budget() -> None:
+    """分块同时受条数上限与 token 预算约束。"""
+    generator = _build_generator(batch_size=3, max_tokens_per_request=100, use_cache=False)
+    texts = ["短文本"] * 4 + ["长" * 90, "长" * 90, "x" * 1000]
+
+    chunks = generator._plan_chunks(texts, list(range(len(texts))))  # noqa: SLF001
+
+    assert chunks == [[0, 1, 2], [3, 4], [5], [6]]
+
+    # 长短文本交错时先按长度排序再打包，短文本集中到同一请求
+    mixed = ["长" * 90, "短", "长" * 90, "短", "短"]
+    assert generator._plan_chunks(mixed, list(range(len(mixed)))) == [[1, 3, 4], [0], [2]]  # noqa: SLF001
+
+
+def test_embed_batch_returns_single_matrix() -> None:
+    """embed_batch 返回一块连续矩阵，空输入返回 0 行矩阵。"""
+    generator = _build_generator(batch_size=2, use_cache=False)
+    generator._client = _FakeClient(_FakeEmbeddings())  # noqa: SLF001
+
+    vectors = generator.embed_batch(["a", "bb", "ccc"])
+    assert isinstance(vectors, np.ndarray)
+    assert vectors.shape == (3, EMBEDDING_DIM)
+    assert vectors.flags["C_CONTIGUOUS"]
+
+    assert generator.embed_batch([]).shape == (0, EMBEDDING_DIM)
+
+    # 传入 out 时结果写入调用方提供的缓冲区
+    out = np.empty((2, EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
+    assert generator.embed_batch(["a", "bb"], out=out) is out
+    with pytest.raises(ValueError):
+        generator.embed_batch(["a"], out=out)
+
+
+def test_embed_batch_returns_unit_vectors() -> None:
+    """默认返回 L2 归一化后的向量，零向量回退保持为零。"""
+    generator = _build_generator(use_cache=False)
+    generator._client = _FakeClient(_FakeEmbeddings(fail_on="bad"))  # noqa: SLF001
+
+    vectors = generator.embed_batch(["a", "ccc"]).astype(np.float32)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-3)
+
+    assert not generator.embed("bad").any()
+
+
+def _rate_limit_error(retry_after: str) -> RateLimitError:
+    request = httpx.Request("POST", "https://example.com/embeddings")
+    response = httpx.Response(429, headers={"retry-after": retry_after}, request=request)
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def test_rate_limited_chunks_are_retried_after_server_delay(monkeypatch) -> None:
+    """限流错误按 Retry-After 等待后重试，而不是直接回退为零向量。"""
+    generator = _build_generator(use_cache=False, normalize=False)
+    fake = _FakeEmbeddings()
+    errors = [_rate_limit_error("3"), _rate_limit_error("1")]
+    original_create = fake.create
+
+    def flaky_create(**kwargs):
+        if errors:
+            raise errors.pop(0)
+        return original_create(**kwargs)
+
+    fake.create = flaky_create
+    generator._client = _FakeClient(fake)  # noqa: SLF001
+    sleeps: list[float] = []
+    monkeypatch.setattr(embedding_generator_module.time, "sleep", sleeps.append)
+
+    vectors = generator.embed_batch(["ab"])
+
+    assert sleeps == [3.0, 1.0]
+    assert vectors[0, 0] == 2.0
+
+
+def test_close_releases_clients_and_cache(tmp_path) -> None:
+    generator = _build_generator(cache_dir=str(tmp_path))
+
+    asyncio.run(generator.aclose())
+
+    assert generator._client.is_closed()  # noqa: SLF001
+    assert generator._async_client.is_closed()  # noqa: SLF001
+
+
+def test_embed_after_close_reopens_clients_and_cache(tmp_path) -> None:
+    """关闭后再次使用时重建 HTTP 客户端并重新打开磁盘缓存，而不是回退为零向量。"""
+    generator = _build_generator(cache_dir=str(tmp_path))
+    asyncio.run(generator.aclose())
+
+    def fake_chunk(chunk: list[str]) -> list[list[float]]:
+        assert not generator._client.is_closed()  # noqa: SLF001
+        return [_fake_vector(text) for text in chunk]
+
+    generator._embed_chunk = fake_chunk  # noqa: SLF001
+
+    assert generator.embed("abc").any()
+    assert not generator._async_client.is_closed()  # noqa: SLF001
+    assert generator._cache._db is not None  # noqa: SLF001
+    generator.close()
+
+
+def test_memory_cache_keeps_vectors_at_storage_precision() -> None:
+    """进程内缓存以向量字段精度保存，命中结果与实时请求结果在该精度下一致。"""
+    generator = _build_generator()
+    rng = np.random.default_rng(0)
+    raw = rng.standard_normal((2, EMBEDDING_DIM)).astype(np.float32)
+    generator._embed_resilient = lambda chunk: [raw[len(text) - 1] for text in chunk]  # noqa: SLF001
+
+    fresh = generator.embed_batch(["a", "bb"]).copy()
+    cached = generator.embed_batch(["a", "bb"])
+
+    assert all(v.dtype == EMBEDDING_DTYPE for v in generator._cache._memory.values())  # noqa: SLF001
+    np.testing.assert_allclose(cached.astype(np.float32), fresh.astype(np.float32), atol=1e-3)
@@ -0,0 +1,47 @@
+"""
+gzip 请求体压缩传输层的单元测试，使用 httpx.MockTransport 代替真实网络。
+"""
+
+from __future__ import annotations
+
+import gzip
+from typing import List
+
+import httpx
+
+from milvus.core.http_client import GzipRequestTransport
+
+
+def _client(status_for_gzip: int, seen: List[httpx.Request]) -> httpx.Client:
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.headers.get("Content-Encoding") == "gzip":
+            return httpx.Response(status_for_gzip)
+        return httpx.Response(200)
+
+    transport = GzipRequestTransport(transport=httpx.MockTransport(handler), min_size=10)
+    return httpx.Client(transport=transport)
+
+
+def test_large_bodies_are_gzipped() -> None:
+    seen: List[httpx.Request] = []
+    body = b'{"input": "' + b"x" * 2000 + b'"}'
+
+    response = _client(200, seen).post("https://example.com/embeddings", content=body)
+
+    assert response.status_code == 200
+    assert seen[0].headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(seen[0].content) == body
+    assert int(seen[0].headers["Content-Length"]) == len(seen[0].content)
+
+
+def test_falls_back_to_plain_body_on_415() -> None:
+    """服务端返回 415 时改为不压缩重发，之后的请求也不再压缩。"""
+    seen: List[httpx.Request] = []
+    client = _client(415, seen)
+    body = b"y" * 100
+
+    assert client.post("https://example.com/embeddings", content=body).status_code == 200
+    assert client.post("https://example.com/embeddings", content=body).status_code == 200
+
+    assert [r.headers.get("Content-Encoding") for r in seen] == ["gzip", None, None]
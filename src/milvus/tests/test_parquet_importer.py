@@ -0,0 +1,349 @@
+"""
+MilvusParquetImporter 的单元测试。
+
+使用不发起 RPC 的集合替身，只验证导入器构造的插入数据。
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import Future
+from types import SimpleNamespace
+from typing import Any, List
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from pymilvus import CollectionSchema
+from pymilvus.client.types import BulkInsertState
+
+import milvus.core.bulk_import as bulk_mod
+from milvus.core.constants import EMBEDDING_DIM, EMBEDDING_DTYPE
+from milvus.core.parquet_importer import MilvusParquetImporter, _prefetch
+from milvus.core.schema import COLLECTION_CONFIGS
+
+
+class FakeCollection:
+    """记录 insert 调用的 Collection 替身。"""
+
+    def __init__(self, collection_type: str) -> None:
+        self.name = f"graphrag_{collection_type}"
+        self.schema = CollectionSchema(fields=COLLECTION_CONFIGS[collection_type]["fields"])
+        self.inserted: List[List[Any]] = []
+        self.flushes = 0
+
+    def insert(self, data: List[Any], **kwargs: Any) -> Future:
+        self.inserted.append(data)
+        future: Future = Future()
+        future.set_result(None)
+        return future
+
+    def flush(self, **kwargs: Any) -> None:
+        self.flushes += 1
+
+
+def _build_importer() -> MilvusParquetImporter:
+    importer = MilvusParquetImporter(embedding_api_key="dummy-key")
+    importer._generate_embeddings = lambda texts: np.ones((len(texts), EMBEDDING_DIM))  # noqa: SLF001
+    return importer
+
+
+def test_insert_payload_is_columnar_in_schema_order() -> None:
+    """插入数据按 schema 字段顺序组织为列，embedding 列为整块矩阵。"""
+    importer = _build_importer()
+    collection = FakeCollection("entity_description")
+    df = pd.DataFrame({"id": ["e1", "e2"], "title": ["A", "B"], "description": ["da", "db"]})
+
+    columns = importer._prepare_records(df, "entity_description")  # noqa: SLF001
+    count = importer._insert_records(collection, "entity_description", columns)  # noqa: SLF001
+
+    assert count == 2
+    source_ids, titles, descriptions, combined, vectors = collection.inserted[0]
+    assert source_ids == ["e1", "e2"]
+    assert titles == ["A", "B"]
+    assert descriptions == ["da", "db"]
+    assert combined == ["A:da", "B:db"]
+    assert isinstance(vectors, np.ndarray)
+    assert vectors.shape == (2, EMBEDDING_DIM)
+    assert vectors.dtype == EMBEDDING_DTYPE
+
+
+def test_prepare_records_reads_text_column_per_type() -> None:
+    importer = _build_importer()
+    df = pd.DataFrame({"id": [1, 2], "summary": ["s1", "s2"]})
+
+    columns = importer._prepare_records(df, "community_summary")  # noqa: SLF001
+    assert columns["source_id"] == ["1", "2"]
+    assert columns["summary"] == ["s1", "s2"]
+    assert columns["embedding"].shape == (2, EMBEDDING_DIM)
+    assert columns["embedding"].dtype == EMBEDDING_DTYPE
+
+    # entity_description 缺少 description 列时回退到 summary
+    columns = importer._prepare_records(  # noqa: SLF001
+        df.assign(title=["t1", "t2"]), "entity_description"
+    )
+    assert columns["title_description"] == ["t1:s1", "t2:s2"]
+
+    # 与目标集合无关的列不参与 Arrow 转换，混合类型的列不会导致导入失败
+    columns = importer._prepare_records(df.assign(extra=[1, "mixed"]), "community_summary")  # noqa: SLF001
+    assert columns["summary"] == ["s1", "s2"]
+
+    # 缺少源列时不产生记录
+    assert importer._prepare_records(df, "text_unit") == {}  # noqa: SLF001
+
+
+class FakeManager:
+    def __init__(self, collection: FakeCollection) -> None:
+        self.collection = collection
+
+    def collection_exists(self, collection_type: str) -> bool:
+        return True
+
+    def get_collection(self, collection_type: str) -> FakeCollection:
+        return self.collection
+
+
+def test_import_parquet_file_streams_batches(tmp_path) -> None:
+    """parquet 按 batch_size 分批读取，只读取目标集合需要的列。"""
+    path = tmp_path / "text_units.parquet"
+    pd.DataFrame(
+        {"id": [str(i) for i in range(5)], "text": list("abcde"), "unused": range(5)}
+    ).to_parquet(path)
+    collection = FakeCollection("text_unit")
+    importer = MilvusParquetImporter(
+        collection_manager=FakeManager(collection), batch_size=2, embedding_api_key="dummy-key"
+    )
+    seen_columns: List[List[str]] = []
+
+    def fake_embeddings(texts: List[str]) -> np.ndarray:
+        return np.ones((len(texts), EMBEDDING_DIM))
+
+    importer._generate_embeddings = fake_embeddings  # noqa: SLF001
+    original = importer._prepare_records  # noqa: SLF001
+
+    def spy(batch: Any, collection_type: str) -> dict:
+        seen_columns.append(batch.schema.names)
+        return original(batch, collection_type)
+
+    importer._prepare_records = spy  # noqa: SLF001
+
+    assert importer.import_parquet_file(str(path), "text_unit") == 5
+    assert [len(batch[0]) for batch in collection.inserted] == [2, 2, 1]
+    assert seen_columns[0] == ["id", "text"]
+    # 各批异步插入，整个文件只 flush 一次
+    assert collection.flushes == 1
+
+
+def test_bulk_import_uses_one_writer_per_file(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    """BulkInsert 模式下整个文件只 commit 一次，全部任务完成后才创建索引。"""
+    path = tmp_path / "text_units.parquet"
+    pd.DataFrame({"id": [str(i) for i in range(5)], "text": list("abcde")}).to_parquet(path)
+    events: List[str] = []
+    rows: List[dict] = []
+
+    class FakeWriter:
+        batch_files = [["graphrag_bulk/1.parquet"]]
+
+        def append_row(self, row: dict) -> None:
+            rows.append(dict(row))
+
+        def commit(self) -> None:
+            events.append("commit")
+
+    class FakeBulkUtility:
+        def do_bulk_insert(self, collection_name: str, files: List[str], using: str) -> int:
+            events.append(f"submit:{using}")
+            return 1
+
+        def get_bulk_insert_state(self, task_id: int, using: str) -> SimpleNamespace:
+            events.append("wait")
+            return SimpleNamespace(state=BulkInsertState.ImportCompleted, row_count=5)
+
+    monkeypatch.setattr(bulk_mod, "_create_writer", lambda collection, storage: FakeWriter())
+    monkeypatch.setattr(bulk_mod, "utility", FakeBulkUtility())
+
+    manager = FakeManager(FakeCollection("text_unit"))
+    manager.connection_alias = lambda: "pool_0"
+    manager.ensure_index = lambda collection_type: events.append(f"index:{collection_type}")
+    importer = MilvusParquetImporter(
+        collection_manager=manager, batch_size=2, embedding_api_key="dummy-key", bulk_import=True
+    )
+    # 模拟按线程复用的嵌入缓冲区：每批都写入同一块内存
+    shared = np.empty((2, EMBEDDING_DIM))
+
+    def fake_embeddings(texts: List[str]) -> np.ndarray:
+        shared[: len(texts)] = float(texts[0] == "a")
+        return shared[: len(texts)]
+
+    importer._generate_embeddings = fake_embeddings  # noqa: SLF001
+
+    assert importer.import_parquet_file(str(path), "text_unit") == 5
+    assert events == ["commit", "submit:pool_0", "wait", "index:text_unit"]
+    assert [row["source_id"] for row in rows] == ["0", "1", "2", "3", "4"]
+    # 后续批次覆盖缓冲区后，先追加的行仍保留自己的嵌入
+    assert rows[0]["embedding"][0] == 1.0
+    assert rows[2]["embedding"][0] == 0.0
+
+
+def test_import_directory_runs_files_concurrently(tmp_path) -> None:
+    """目录中的文件并发导入，结果按文件名排序返回，无映射或为空的文件被跳过。"""
+    for name in ("text_units.parquet", "relationships.parquet", "unknown.parquet"):
+        pd.DataFrame({"id": ["1"]}).to_parquet(tmp_path / name)
+    # 空文件与子目录同样被跳过
+    (tmp_path / "entities.parquet").touch()
+    (tmp_path / "communities.parquet").mkdir()
+    manager = FakeManager(FakeCollection("text_unit"))
+    manager._connected = True  # noqa: SLF001
+    importer = MilvusParquetImporter(
+        collection_manager=manager, embedding_api_key="dummy-key", file_concurrency=2
+    )
+    calls: List[str] = []
+
+    def fake_import(file_path: str, collection_type: str) -> int:
+        calls.append(collection_type)
+        return len(collection_type)
+
+    importer.import_parquet_file = fake_import
+
+    results = importer.import_directory(str(tmp_path))
+
+    assert results == {"relationships.parquet": len("relationship"), "text_units.parquet": len("text_unit")}
+    assert sorted(calls) == ["relationship", "text_unit"]
+
+
+def test_split_long_text_packs_paragraphs_and_sentences() -> None:
+    importer = _build_importer()
+
+    assert importer._split_long_text("短文本", 10) == ["短文本"]  # noqa: SLF001
+    # 段落合并到上限为止
+    assert importer._split_long_text("aaa\n\nbbb\n\ncccccc", 8) == ["aaa\n\nbbb", "cccccc"]  # noqa: SLF001
+    # 超长段落按句子切分，超长句子按窗口强制切分
+    text = "一二三。四五六！" + "x" * 250
+    chunks = importer._split_long_text(text, 120)  # noqa: SLF001
+    assert chunks[0] == "一二三。四五六！"
+    assert chunks[1:] == ["x" * 20] * 12 + ["x" * 10]
+
+
+def test_generate_embeddings_embeds_duplicates_once() -> None:
+    importer = MilvusParquetImporter(embedding_api_key="dummy-key")
+    requested: List[List[str]] = []
+
+    def fake_embed_batch(texts: List[str], out: Any = None) -> np.ndarray:
+        requested.append(list(texts))
+        return np.arange(len(texts), dtype=np.float32)[:, None].repeat(EMBEDDING_DIM, axis=1)
+
+    importer.embedding_generator.embed_batch = fake_embed_batch
+
+    vectors = importer._generate_embeddings(["a", "b", "a", None, "b "])  # noqa: SLF001
+
+    assert requested == [["a", "b", "空内容"]]
+    assert vectors.shape == (5, EMBEDDING_DIM)
+    assert vectors[:, 0].tolist() == [0, 1, 0, 2, 1]
+
+
+def test_embedding_cache_dir_persists_across_importers(tmp_path) -> None:
+    """指定缓存目录后，新的导入器实例可直接复用之前生成的嵌入。"""
+    first = MilvusParquetImporter(embedding_api_key="dummy-key", embedding_cache_dir=str(tmp_path))
+    first.embedding_generator._embed_resilient = lambda chunk: [[1.0] * EMBEDDING_DIM for _ in chunk]  # noqa: SLF001
+    first._generate_embeddings(["a", "b"])  # noqa: SLF001
+    first.embedding_generator.close()
+
+    second = MilvusParquetImporter(embedding_api_key="dummy-key", embedding_cache_dir=str(tmp_path))
+
+    def fail(chunk: List[str]) -> List[List[float]]:
+        raise AssertionError("应命中磁盘缓存")
+
+    second.embedding_generator._embed_resilient = fail  # noqa: SLF001
+    vectors = second._generate_embeddings(["b", "a"])  # noqa: SLF001
+    assert vectors.shape == (2, EMBEDDING_DIM)
+    assert np.all(vectors > 0)
+    second.embedding_generator.close()
+
+
+def test_prefetch_preserves_order_and_propagates_errors() -> None:
+    assert list(_prefetch(iter(range(10)), depth=2)) == list(range(10))
+
+    def broken():
+        yield 1
+        raise RuntimeError("读取失败")
+
+    items = _prefetch(broken())
+    assert next(items) == 1
+    with pytest.raises(RuntimeError, match="读取失败"):
+        next(items)
+
+    # 调用方提前结束时后台线程退出，不会卡在已满的缓冲区上
+    items = _prefetch(iter(range(100)), depth=1)
+    assert next(items) == 0
+    items.close()
+
+
+def test_import_data_flushes_once_per_file(tmp_path) -> None:
+    path = tmp_path / "relationships.parquet"
+    pd.DataFrame({"id": ["1", "2", "3"], "description": ["a", "b", "c"]}).to_parquet(path)
+    collection = FakeCollection("relationship")
+    importer = MilvusParquetImporter(
+        collection_manager=FakeManager(collection), batch_size=1, embedding_api_key="dummy-key"
+    )
+    importer._generate_embeddings = lambda texts: np.ones((len(texts), EMBEDDING_DIM))  # noqa: SLF001
+
+    assert importer.import_data(str(path), "relationship")
+    assert len(collection.inserted) == 3
+    assert collection.flushes == 1
+
+
+def test_prepare_records_casts_in_arrow_and_fills_nulls() -> None:
+    importer = _build_importer()
+    batch = pa.record_batch({"id": pa.array([7, None]), "title": pa.array(["A", None])})
+
+    columns = importer._prepare_records(batch, "entity_description")  # noqa: SLF001
+
+    assert columns["source_id"] == ["7", ""]
+    assert columns["title"] == ["A", ""]
+    assert columns["description"] == ["", ""]
+    assert columns["title_description"] == ["A:", ":"]
+
+
+def test_generate_embeddings_reuses_buffer_across_batches() -> None:
+    importer = MilvusParquetImporter(embedding_api_key="dummy-key", batch_size=4)
+    importer.embedding_generator._embed_resilient = lambda chunk: [[1.0] * EMBEDDING_DIM for _ in chunk]  # noqa: SLF001
+
+    first = importer._generate_embeddings(["a", "b", "c"])  # noqa: SLF001
+    second = importer._generate_embeddings(["d", "e"])  # noqa: SLF001
+
+    assert first.shape == (3, EMBEDDING_DIM)
+    assert second.shape == (2, EMBEDDING_DIM)
+    assert np.shares_memory(first, second)
+
+
+def test_generate_embeddings_truncates_long_texts() -> None:
+    importer = MilvusParquetImporter(embedding_api_key="dummy-key", max_text_length=5)
+    requested: List[str] = []
+
+    def fake_embed_batch(texts: List[str], out: Any = None) -> np.ndarray:
+        requested.extend(texts)
+        return np.ones((len(texts), EMBEDDING_DIM))
+
+    importer.embedding_generator.embed_batch = fake_embed_batch
+
+    importer._generate_embeddings(["一二三四五六七", " abc "])  # noqa: SLF001
+    assert requested == ["一二三四五", "abc"]
+
+
+def test_import_files_accepts_paths_and_dir_entries(tmp_path) -> None:
+    """import_files 接受文件路径或目录项，与 import_directory 使用相同的映射与过滤规则。"""
+    for name in ("text_units.parquet", "relationships.parquet"):
+        pd.DataFrame({"id": ["1"]}).to_parquet(tmp_path / name)
+    (tmp_path / "entities.parquet").touch()
+    manager = FakeManager(FakeCollection("text_unit"))
+    manager._connected = True  # noqa: SLF001
+    importer = MilvusParquetImporter(collection_manager=manager, embedding_api_key="dummy-key")
+    importer.import_parquet_file = lambda file_path, collection_type: 1
+
+    paths = [str(tmp_path / name) for name in ("text_units.parquet", "entities.parquet", "relationships.parquet")]
+    assert importer.import_files(paths) == {"relationships.parquet": 1, "text_units.parquet": 1}
+
+    with os.scandir(tmp_path) as it:
+        entries = list(it)
+    assert importer.import_files(entries) == importer.import_files(paths)
@@ -0,0 +1,321 @@
+"""
+MilvusQueryManager 的单元测试。
+
+嵌入接口与集合均使用替身，不依赖真实的 Milvus 或 Qwen 服务。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+import numpy as np
+
+from milvus.core.constants import EMBEDDING_DIM, EMBEDDING_DTYPE
+from milvus.core.schema import distances_to_scores
+import milvus.query.query_manager as qm_mod
+from milvus.query.query_manager import MilvusQueryManager, _fields_getter, _format_hits
+
+
+class FakeFuture:
+    """_async 检索返回的 SearchFuture 替身，取结果时记录到事件日志。"""
+
+    def __init__(self, collection: "FakeCollection", result: Any) -> None:
+        self.collection = collection
+        self._result = result
+
+    def result(self) -> Any:
+        self.collection.log.append(f"result:{self.collection.collection_type}")
+        return self._result
+
+
+class FakeCollection:
+    """search 返回固定命中结果的 Collection 替身。"""
+
+    def __init__(
+        self,
+        collection_type: str,
+        barrier: threading.Barrier | None = None,
+        log: List[str] | None = None,
+    ) -> None:
+        self.collection_type = collection_type
+        self.barrier = barrier
+        self.log = log if log is not None else []
+        self.searches = 0
+
+    def load(self) -> None:
+        pass
+
+    def search(self, data: Any, **kwargs: Any) -> List[List[SimpleNamespace]]:
+        self.searches += 1
+        self.log.append(f"search:{self.collection_type}")
+        if self.barrier is not None:
+            # 所有集合的检索同时在途时才能通过屏障
+            self.barrier.wait()
+        entity = SimpleNamespace(**{field: field for field in kwargs["output_fields"]})
+        entity.source_id = f"{self.collection_type}-1"
+        hits = [[SimpleNamespace(id=1, distance=0.9, entity=entity)] for _ in range(len(data))]
+        return FakeFuture(self, hits) if kwargs.get("_async") else hits
+
+
+class FakeCollectionManager:
+    def __init__(self, collections: Dict[str, FakeCollection]) -> None:
+        self.collections = collections
+        self._connected = True
+        self.index_type = "HNSW"
+
+    def collection_exists(self, collection_type: str) -> bool:
+        return collection_type in self.collections
+
+    def get_collection(self, collection_type: str) -> FakeCollection:
+        return self.collections[collection_type]
+
+    def ensure_loaded(self, collection_type: str) -> FakeCollection:
+        return self.collections[collection_type]
+
+
+def _build_manager(collections: Dict[str, FakeCollection] | None = None) -> MilvusQueryManager:
+    manager = MilvusQueryManager(
+        collection_manager=FakeCollectionManager(collections or {}),  # type: ignore[arg-type]
+        embedding_api_key="dummy-key",
+    )
+    manager.embedding_generator._embed_resilient = lambda chunk: [[1.0] * EMBEDDING_DIM for _ in chunk]  # noqa: SLF001
+
+    async def fake_aembed(chunk: List[str], semaphore: Any) -> List[List[float]]:
+        return [[1.0] * EMBEDDING_DIM for _ in chunk]
+
+    manager.embedding_generator._aembed_resilient = fake_aembed  # noqa: SLF001
+    return manager
+
+
+def test_equivalent_queries_share_one_embedding_request() -> None:
+    manager = _build_manager()
+    requested: List[List[str]] = []
+
+    def fake_embed(chunk: List[str]) -> List[List[float]]:
+        requested.append(list(chunk))
+        return [[1.0] * EMBEDDING_DIM for _ in chunk]
+
+    manager.embedding_generator._embed_resilient = fake_embed  # noqa: SLF001
+
+    first = manager._generate_embedding("  人工智能　ＡＩ ")  # noqa: SLF001
+    second = manager._generate_embedding("人工智能 AI")  # noqa: SLF001
+
+    assert requested == [["人工智能 AI"]]
+    assert np.array_equal(first, second)
+    # 空查询使用占位文本
+    manager._generate_embedding("   ")  # noqa: SLF001
+    assert requested[-1] == ["空内容"]
+
+
+def test_search_multiple_collections_submits_all_searches_first() -> None:
+    types = ["text_unit", "entity_title", "relationship"]
+    log: List[str] = []
+    manager = _build_manager({t: FakeCollection(t, log=log) for t in types})
+
+    results = manager.search_multiple_collections("问题", [*types, "missing"], limit_per_collection=1)
+
+    assert list(results) == [*types, "missing"]
+    assert all(results[t][0]["source_id"] == f"{t}-1" for t in types)
+    assert results["missing"] == []
+    # 所有检索提交之后才开始取结果
+    assert log == [f"search:{t}" for t in types] + [f"result:{t}" for t in types]
+
+
+def test_async_search_multiple_collections_isolates_failures() -> None:
+    types = ["text_unit", "entity_title"]
+    barrier = threading.Barrier(len(types), timeout=5)
+    manager = _build_manager({t: FakeCollection(t, barrier) for t in types})
+
+    results = asyncio.run(manager.asearch_multiple_collections("问题", [*types, "missing"]))
+
+    assert results["text_unit"][0]["source_id"] == "text_unit-1"
+    assert results["entity_title"][0]["source_id"] == "entity_title-1"
+    assert results["missing"] == []
+
+
+def test_async_search_by_text_embeds_without_executor() -> None:
+    manager = _build_manager({"text_unit": FakeCollection("text_unit")})
+
+    def fail(chunk: List[str]) -> List[List[float]]:
+        raise AssertionError("异步检索不应走同步嵌入请求")
+
+    manager.embedding_generator._embed_resilient = fail  # noqa: SLF001
+
+    results = asyncio.run(manager.asearch_by_text("问题", "text_unit", limit=1))
+    assert results[0]["source_id"] == "text_unit-1"
+    assert asyncio.run(manager.asearch_by_text("问题", "missing")) == []
+
+
+def test_search_results_include_every_output_field() -> None:
+    manager = _build_manager({"entity_description": FakeCollection("entity_description")})
+
+    hits = manager.search_by_embedding([0.0] * EMBEDDING_DIM, "entity_description", limit=1)
+    batch = manager.batch_search_by_embeddings([[0.0] * EMBEDDING_DIM] * 2, "entity_description", limit=1)
+
+    expected = {
+        "id": 1,
+        "distance": 0.9,
+        "score": hits[0]["score"],
+        "source_id": "entity_description-1",
+        "title": "title",
+        "description": "description",
+        "title_description": "title_description",
+    }
+    assert hits == [expected]
+    assert batch == [[expected], [expected]]
+
+
+def test_format_hits_filters_and_scores_whole_batch() -> None:
+    hits = [
+        SimpleNamespace(id=i, distance=d, entity=SimpleNamespace(source_id=str(i)))
+        for i, d in enumerate([0.9, 0.2, 0.5])
+    ]
+    fields = ("source_id",)
+
+    results = _format_hits(hits, fields, _fields_getter(fields), score_threshold=0.3)
+
+    assert [r["id"] for r in results] == [0, 2]
+    assert [r["score"] for r in results] == [0.9, 0.5]
+    assert results[1]["source_id"] == "2"
+    assert len(_format_hits(hits, fields, _fields_getter(fields))) == 3
+    assert distances_to_scores(np.array([0.0, 1.0]), "L2").tolist() == [1.0, 0.5]
+
+    # L2 下阈值作用于相似度：距离越小越相似，完全匹配（距离 0）不能被过滤掉
+    l2_hits = [
+        SimpleNamespace(id=i, distance=d, entity=SimpleNamespace(source_id=str(i)))
+        for i, d in enumerate([0.0, 1.0, 3.0])
+    ]
+    results = _format_hits(l2_hits, fields, _fields_getter(fields), score_threshold=0.4, metric_type="L2")
+    assert [r["id"] for r in results] == [0, 1]
+    assert [r["score"] for r in results] == [1.0, 0.5]
+
+
+class IndexedCollection(FakeCollection):
+    """带 IVF 索引描述的集合替身，记录检索参数。"""
+
+    def __init__(self) -> None:
+        super().__init__("text_unit")
+        self.index_reads = 0
+        self.params: List[Dict[str, Any]] = []
+
+    def index(self) -> SimpleNamespace:
+        self.index_reads += 1
+        return SimpleNamespace(params={"index_type": "IVF_FLAT", "metric_type": "L2", "params": {"nlist": 256}})
+
+    def search(self, data: Any, **kwargs: Any) -> List[List[SimpleNamespace]]:
+        self.params.append(kwargs["param"])
+        return super().search(data, **kwargs)
+
+
+def test_search_params_follow_collection_index() -> None:
+    collection = IndexedCollection()
+    manager = _build_manager({"text_unit": collection})
+
+    hits = manager.search_by_embedding([0.0] * EMBEDDING_DIM, "text_unit", limit=1)
+    manager.batch_search_by_embeddings([[0.0] * EMBEDDING_DIM], "text_unit", limit=1)
+    manager.search_by_embedding(
+        [0.0] * EMBEDDING_DIM, "text_unit", search_params={"metric_type": "IP", "params": {"nprobe": 4}}
+    )
+
+    assert collection.params[0] == {"metric_type": "L2", "params": {"nprobe": 16}}
+    assert collection.params[1] == collection.params[0]
+    assert collection.params[2]["params"] == {"nprobe": 4}
+    assert collection.index_reads == 1
+    # L2 距离转换为 1/(1+d) 分数
+    assert hits[0]["score"] == 1.0 / 1.9
+
+
+def test_search_params_refresh_after_collection_recreated() -> None:
+    """集合删除重建（新的集合对象）后重新读取索引信息，不沿用旧索引的检索参数。"""
+    manager = _build_manager({"text_unit": IndexedCollection()})
+    manager.search_by_embedding([0.0] * EMBEDDING_DIM, "text_unit", limit=1)
+
+    recreated = FakeCollection("text_unit")
+    recreated.index = lambda: SimpleNamespace(params={"index_type": "HNSW", "metric_type": "IP"})
+    manager.collection_manager.collections["text_unit"] = recreated
+    params = manager._search_params("text_unit", recreated, 1)  # noqa: SLF001
+
+    assert params["metric_type"] == "IP"
+    assert "nprobe" not in params["params"]
+
+
+class VectorCollection(FakeCollection):
+    """返回带向量字段（float16 原始字节）的候选结果。"""
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        super().__init__("text_unit")
+        self.vectors = vectors
+        self.limits: List[int] = []
+
+    def search(self, data: Any, **kwargs: Any) -> List[List[Any]]:
+        self.limits.append(kwargs["limit"])
+        assert "embedding" in kwargs["output_fields"]
+        hits = [
+            SimpleNamespace(
+                id=i,
+                distance=0.5,
+                entity=SimpleNamespace(
+                    source_id=str(i), text="t", embedding=vector.astype(EMBEDDING_DTYPE).tobytes()
+                ),
+            )
+            for i, vector in enumerate(self.vectors)
+        ]
+        return [hits]
+
+
+def test_rerank_orders_candidates_by_exact_cosine(monkeypatch) -> None:
+    monkeypatch.setattr(qm_mod, "RERANK_CANDIDATES_FACTOR", 3)
+    vectors = np.array([[0.0, 1.0], [1.0, 0.0], [0.6, 0.8]], dtype=np.float32)
+    collection = VectorCollection(vectors)
+    manager = _build_manager({"text_unit": collection})
+
+    results = manager.search_by_embedding([1.0, 0.0], "text_unit", limit=2, rerank=True)
+
+    assert collection.limits == [6]
+    assert [r["id"] for r in results] == [1, 2]
+    assert results[0]["score"] == 1.0
+    assert abs(results[1]["score"] - 0.6) < 1e-3
+    assert "embedding" not in results[0]
+
+
+class QueryCollection(FakeCollection):
+    def __init__(self) -> None:
+        super().__init__("text_unit")
+        self.queries: List[Any] = []
+
+    def query(self, expr: str, output_fields: List[str], **kwargs: Any) -> List[Dict[str, Any]]:
+        if "source_id" in kwargs["expr_params"]:
+            self.queries.append((expr, kwargs))
+            return [{"id": 1, "source_id": kwargs["expr_params"]["source_id"]}]
+        ids = kwargs["expr_params"]["ids"]
+        self.queries.append((expr, list(ids)))
+        return [{"id": i, "source_id": str(i)} for i in ids]
+
+
+def test_query_by_ids_chunks_with_template_params(monkeypatch) -> None:
+    monkeypatch.setattr(qm_mod, "QUERY_ID_BATCH_SIZE", 2)
+    collection = QueryCollection()
+    manager = _build_manager({"text_unit": collection})
+
+    rows = manager.query_by_ids("text_unit", [1, 2, 3, 4, 5])
+
+    assert [row["id"] for row in rows] == [1, 2, 3, 4, 5]
+    assert sorted(ids for _, ids in collection.queries) == [[1, 2], [3, 4], [5]]
+    assert {expr for expr, _ in collection.queries} == {"id in {ids}"}
+    assert manager.query_by_ids("text_unit", []) == []
+
+
+def test_query_by_source_id_passes_value_as_template_param() -> None:
+    collection = QueryCollection()
+    manager = _build_manager({"text_unit": collection})
+
+    row = manager.query_by_source_id("text_unit", "it's")
+
+    assert row == {"id": 1, "source_id": "it's"}
+    expr, kwargs = collection.queries[0]
+    assert expr == "source_id == {source_id}"
+    assert kwargs["expr_params"] == {"source_id": "it's"}
+    assert kwargs["limit"] == 1